@@ -52,6 +52,18 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
 ]
 
+# Profiler query SQL per request (core/profiler.py): Server-Timing dan log JSONL untuk
+# `manage.py laporan_profiler`. Opt-in: PROFILER_SQL=1; PROFILER_SQL_SAMPEL = porsi request yang dicatat
+PROFILER_SQL = {
+    'LOG': os.environ.get('PROFILER_SQL_LOG', os.path.join(BASE_DIR, 'log', 'profiler_sql.jsonl')),
+    'SAMPEL': float(os.environ.get('PROFILER_SQL_SAMPEL', 1.0)),
+    # Bentuk query yang sama sebanyak ini dalam satu request dianggap N+1
+    'AMBANG_N1': 5,
+}
+if os.environ.get('PROFILER_SQL') == '1':
+    # Paling luar supaya query sesi dan auth ikut terhitung
+    MIDDLEWARE.insert(0, 'core.profiler.ProfilerQueryMiddleware')
+
 ROOT_URLCONF = 'arlinSkripsi.urls'
 
 TEMPLATES = [
@@ -66,6 +78,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.keranjang',
             ],
         },
     },
@@ -73,17 +86,39 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'arlinSkripsi.wsgi.application'
 
+# Deployment ASGI (view pelanggan async): lihat docstring settings_produksi.py
+ASGI_APPLICATION = 'arlinSkripsi.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# Transaksi SQLite tetap DEFERRED. Jalur tulis yang membaca lebih dulu (checkout, stok, POST admin) memakai
+# core.basisdata.transaksi_tulis (BEGIN IMMEDIATE). transaction_mode IMMEDIATE untuk semua koneksi tidak dipakai:
+# setiap atomic() akan mengambil lock tulis, termasuk blok yang hanya membaca (dari kode ini, Django atau
+# aplikasi pihak ketiga), dan checkout menunggu blok itu selesai sampai busy_timeout
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# PRAGMA per koneksi SQLite (core/basisdata.py); hapus baris untuk memakai default SQLite.
+# Hanya PRAGMA yang berlaku untuk koneksi itu saja: journal_mode=WAL tersimpan di file database,
+# jadi dipasang di settings_produksi, bukan setiap kali manage.py membuka db.sqlite3 pengembangan
+SQLITE_PRAGMA = {
+    # Commit tidak menunggu fsync; dengan WAL (produksi) hanya checkpoint yang menunggu
+    'synchronous': 'NORMAL',
+    # Penulis menunggu lock (ms) alih-alih langsung "database is locked"
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)) * 1000,
+    # File database dibaca lewat mmap (256 MB) dan page cache 20 MB per koneksi
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,6 +160,32 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache
+# Katalog produk (core/katalog.py) memakai alias 'katalog'. LocMem hanya berlaku per proses;
+# untuk beberapa worker pakai KATALOG_CACHE_BACKEND=file supaya invalidasi terlihat oleh semua worker.
+KATALOG_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'katalog': {
+        'BACKEND': KATALOG_CACHE_BACKENDS[os.environ.get('KATALOG_CACHE_BACKEND', 'locmem')],
+        'LOCATION': os.environ.get('KATALOG_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache', 'katalog')),
+        'TIMEOUT': 60 * 60,
+    },
+    # Statistik dashboard per karyawan (core/statistik_karyawan.py) dan analitik penjualan
+    # (core/analitik.py); backend sama dengan katalog
+    # supaya invalidasi dari satu worker terlihat oleh worker lain
+    'statistik': {
+        'BACKEND': KATALOG_CACHE_BACKENDS[os.environ.get('KATALOG_CACHE_BACKEND', 'locmem')],
+        'LOCATION': os.environ.get('STATISTIK_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache', 'statistik')),
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -161,6 +222,11 @@ JAZZMIN_SETTINGS = {
             'url': 'core:filter_produksi',
             'icon': 'fas fa-industry'
         },
+        {
+            'name': 'Analitik Penjualan',
+            'url': 'core:analitik_penjualan',
+            'icon': 'fas fa-chart-line'
+        },
     ],
     'menubar_show': True,
     'menu': [
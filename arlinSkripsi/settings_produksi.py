@@ -0,0 +1,147 @@
+"""
+Production settings for arlinSkripsi, driven by environment variables.
+
+Run with DJANGO_SETTINGS_MODULE=arlinSkripsi.settings_produksi behind a
+multi-process WSGI server, after ``manage.py collectstatic``.
+
+ASGI: the catalog, order history and order detail pages are async views.
+Under WSGI they still work, each on its own short-lived event loop; to
+serve them natively run arlinSkripsi.asgi, e.g.
+
+    pip install uvicorn
+    uvicorn arlinSkripsi.asgi:application --workers 4 --host 127.0.0.1 --port 8000
+
+The remaining sync views run in ASGI's thread pool. Use
+CONN_MAX_AGE=0 (DB_CONN_MAX_AGE=0) under ASGI: persistent connections
+belong to the thread pool threads and are not closed between requests.
+
+Environment:
+    DJANGO_SECRET_KEY           required
+    DJANGO_ALLOWED_HOSTS        comma separated, e.g. "toko.example.com,127.0.0.1"
+    DJANGO_CSRF_TRUSTED_ORIGINS comma separated origins, e.g. "https://toko.example.com"
+    DJANGO_HTTPS                "1" behind TLS: secure cookies and HSTS
+    DJANGO_STATIC_ROOT          collectstatic target (default BASE_DIR/staticfiles)
+    DJANGO_LOG_LEVEL            default WARNING
+    DB_CONN_MAX_AGE             seconds a connection is reused (default 60, 0 = per request)
+    DATABASE_ENGINE             "sqlite" (default) or "postgresql"
+    SQLITE_PATH                 SQLite file (default BASE_DIR/db.sqlite3)
+    SQLITE_BUSY_TIMEOUT         seconds a writer waits for the lock (default 20, see settings.SQLITE_PRAGMA)
+    POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT
+    KATALOG_CACHE_BACKEND       default "file" so every worker sees catalog and statistics invalidations
+    PROFILER_SQL                "1" enables the SQL profiler middleware (see settings.PROFILER_SQL)
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+os.environ.setdefault('KATALOG_CACHE_BACKEND', 'file')
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import BASE_DIR, DATABASES, SQLITE_PRAGMA, TEMPLATES  # noqa: E402
+
+
+def _daftar(nama, default=''):
+    return [bagian.strip() for bagian in os.environ.get(nama, default).split(',') if bagian.strip()]
+
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('DJANGO_SECRET_KEY wajib diisi untuk settings produksi.')
+
+ALLOWED_HOSTS = _daftar('DJANGO_ALLOWED_HOSTS')
+CSRF_TRUSTED_ORIGINS = _daftar('DJANGO_CSRF_TRUSTED_ORIGINS')
+
+
+# Database
+# Koneksi dipakai ulang antar request per worker; health check membuang koneksi yang sudah putus
+
+CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+if os.environ.get('DATABASE_ENGINE', 'sqlite') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'arlin'),
+            'USER': os.environ.get('POSTGRES_USER', 'arlin'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            **DATABASES['default'],
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # synchronous, busy_timeout dll. dipasang per koneksi oleh core/basisdata.py (SQLITE_PRAGMA)
+        }
+    }
+    # Pembaca tidak memblokir penulis. Mode ini tersimpan di file database (dan membuat file -wal/-shm),
+    # jadi hanya dipasang di produksi; di koneksi berikutnya PRAGMA ini tidak mengubah apa pun
+    SQLITE_PRAGMA = {'journal_mode': 'WAL', **SQLITE_PRAGMA}
+
+
+# Templates
+# Template dikompilasi sekali per worker, bukan dibaca ulang dari disk setiap request
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+
+# Static files
+# Nama file memuat hash isi, jadi browser boleh meng-cache selamanya
+
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage',
+    },
+}
+
+
+# Security
+
+if os.environ.get('DJANGO_HTTPS') == '1':
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+    SESSION_COOKIE_SECURE = True
+    CSRF_COOKIE_SECURE = True
+    SECURE_HSTS_SECONDS = 60 * 60 * 24 * 30
+
+
+# Logging
+# Tanpa DEBUG, log debug per request (mis. checkout) tidak ditulis
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': os.environ.get('DJANGO_LOG_LEVEL', 'WARNING'),
+    },
+}
@@ -1,26 +1,33 @@
-from django.contrib import admin
+from functools import wraps
+
+from django.contrib import admin, messages
+from django.db import transaction
 from django.db.models import Sum
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe  # PENTING: Untuk merender HTML
-from django.urls import path
-from django.shortcuts import render
+from django.urls import path, reverse
+from django.shortcuts import render, get_object_or_404
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, FileResponse, Http404
+from django.views.decorators.http import require_POST
 from django.contrib.admin import SimpleListFilter
-from datetime import timedelta, datetime
-from .models import Karyawan, Produk, Produksi, DetailProduksi, Pelanggan, Pemesanan, DetailPemesanan
-
-# Try to import ReportLab
-try:
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
+from django.core.exceptions import ValidationError
+from .models import (
+    Karyawan, Produk, Produksi, DetailProduksi, Pelanggan, Pemesanan, DetailPemesanan,
+    AntrianLaporan, StatistikCacheLaporan, MutasiStok, Resep, DetailResep
+)
+from .basisdata import transaksi_tulis
+from .rekap import rekap_bulanan, awal_bulan_mundur
+from .penghitung import STATUS_PERHATIAN, jumlah_pemesanan_per_status, jumlah_pesanan_perhatian
+from .stok import kurangi_stok, tambah_stok, StokTidakCukup
+from .analitik import analitik_penjualan
+from .antrian import antrikan_laporan
+from .biaya_produksi import ringkasan_biaya
+from .laporan import FILTER_LAPORAN, ambil_filter, dataset_penjualan, dataset_produk, dataset_produksi
+from .laporan_pdf import REPORTLAB_AVAILABLE, NAMA_BERKAS
+from .cache_laporan import buka_laporan
+from .thumbnail import url_thumbnail
 
 
 # Custom Admin Site
@@ -30,6 +37,19 @@ class CustomAdminSite(admin.AdminSite):
     index_title = 'Dashboard'
     index_template = 'admin/index.html'
 
+    def admin_view(self, view, cacheable=False):
+        view = super().admin_view(view, cacheable)
+
+        # Hanya POST yang menulis, jadi hanya POST yang mengambil lock tulis SQLite di awal transaksi
+        # (core/basisdata.py); membuka halaman ubah/hapus tidak menahan checkout
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method == 'POST':
+                with transaksi_tulis():
+                    return view(request, *args, **kwargs)
+            return view(request, *args, **kwargs)
+        return inner
+
 
 # Instantiate the custom admin site
 custom_admin_site = CustomAdminSite(name='custom_admin')
@@ -91,6 +111,28 @@ class ProdukAdmin(admin.ModelAdmin):
         return f"Rp {obj.harga:,}"
     formatted_harga.short_description = 'Harga'
     
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        # Angka stok yang dilihat admin ikut terkirim (initial-stok) untuk menghitung selisih
+        form.base_fields['stok'].show_hidden_initial = True
+        return form
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            # Produk baru: saldo awalnya dicatat oleh signal
+            super().save_model(request, obj, form, change)
+            return
+        # Stok tidak ditimpa dengan angka dari form (bisa basi jika ada checkout sejak halaman dibuka);
+        # selisih terhadap angka yang dilihat admin ditambahkan lewat UPDATE F() sebagai penyesuaian
+        stok_dilihat = form.data.get(form.add_initial_prefix('stok'))
+        stok_dilihat = int(stok_dilihat) if stok_dilihat not in (None, '') else form.initial['stok']
+        selisih = obj.stok - stok_dilihat
+        with transaction.atomic():
+            obj.save(update_fields=[nama for nama in form.changed_data if nama != 'stok'] + ['diubah'])
+            if selisih:
+                tambah_stok({obj.pk: selisih}, 'Penyesuaian', keterangan=f'Diubah di admin oleh {request.user}')
+        obj.refresh_from_db(fields=['stok'])
+    
     @admin.display(description='Aksi')
     def aksi_ikon(self, obj):
         # Asumsi: Menggunakan Font Awesome (fa)
@@ -127,6 +169,17 @@ class ProduksiAdmin(admin.ModelAdmin):
         return mark_safe(f'{edit_btn} {delete_btn}')
 
 
+class DetailResepInline(admin.TabularInline):
+    model = DetailResep
+    extra = 1
+
+
+@admin.register(Resep, site=custom_admin_site)
+class ResepAdmin(admin.ModelAdmin):
+    list_display = ('jenisHasil', 'hasilPerBatch', 'satuanHasil')
+    inlines = [DetailResepInline]
+
+
 class DetailPemesananInline(admin.TabularInline):
     model = DetailPemesanan
     extra = 1
@@ -190,10 +243,11 @@ class PemesananAdmin(admin.ModelAdmin):
     
     def bukti_bayar_thumbnail(self, obj):
         if obj.buktiBayar:
+            # Changelist memuat thumbnail 150px; ukuran asli hanya dibuka lewat tautan
             return format_html(
-                '<a href="{}" target="_blank"><img src="{}" style="width: 150px; height:auto;" /></a>',
+                '<a href="{}" target="_blank"><img src="{}" style="width: 150px; height:auto;" loading="lazy" /></a>',
                 obj.buktiBayar.url,
-                obj.buktiBayar.url
+                url_thumbnail(obj.buktiBayar, 150)
             )
         return "Tidak ada bukti bayar"
     bukti_bayar_thumbnail.short_description = 'Bukti Pembayaran'
@@ -211,43 +265,46 @@ class PemesananAdmin(admin.ModelAdmin):
         # Gunakan mark_safe untuk memastikan Django merender HTML
         return mark_safe(f'{edit_btn} {delete_btn}')
     
+    def _kebutuhan_stok(self, obj):
+        # Kuantiti produk jadi per produk untuk pesanan ini (satu query)
+        return DetailPemesanan.objects.filter(
+            idKoleksiPemesanan=obj,
+            idProduk__jenisProduk='Produk Jadi'
+        ).values_list('idProduk_id', 'kuantiti')
+    
     def save_model(self, request, obj, form, change):
         # Get the old status if this is an update
         old_status = None
         if change:
             old_status = form.initial.get('status')
+        obj._status_lama = old_status
             
         # Save the object first
         super().save_model(request, obj, form, change)
         
-        # Handle stock adjustments based on status changes
-        if change:
-            new_status = obj.status
-            
-            # Reduce stock if status changes from inactive to active
-            if new_status in self.STOCK_REDUCTION_STATUSES and old_status not in self.STOCK_REDUCTION_STATUSES:
-                # When status changes to an active status, reduce stock of finished products
-                details = DetailPemesanan.objects.filter(idKoleksiPemesanan=obj)
-                for detail in details:
-                    if detail.idProduk.jenisProduk == 'Produk Jadi':
-                        detail.idProduk.stok -= detail.kuantiti
-                        detail.idProduk.save()
-            # Restore stock if status changes to 'Dibatalkan'
-            elif new_status == 'Dibatalkan' and old_status in self.STOCK_REDUCTION_STATUSES:
-                # When status changes to 'Dibatalkan', restore stock
-                details = DetailPemesanan.objects.filter(idKoleksiPemesanan=obj)
-                for detail in details:
-                    if detail.idProduk.jenisProduk == 'Produk Jadi':
-                        detail.idProduk.stok += detail.kuantiti
-                        detail.idProduk.save()
-        else:
-            # For new objects, reduce stock if status is active
-            if obj.status in self.STOCK_REDUCTION_STATUSES:
-                details = DetailPemesanan.objects.filter(idKoleksiPemesanan=obj)
-                for detail in details:
-                    if detail.idProduk.jenisProduk == 'Produk Jadi':
-                        detail.idProduk.stok -= detail.kuantiti
-                        detail.idProduk.save()
+        # Restore stock if status changes to 'Dibatalkan' (detail yang dipesan sebelum inline diubah)
+        if change and obj.status == 'Dibatalkan' and old_status in self.STOCK_REDUCTION_STATUSES:
+            tambah_stok(self._kebutuhan_stok(obj), 'Pembatalan', pemesanan=obj)
+    
+    def save_related(self, request, form, formsets, change):
+        # Detail inline baru tersimpan di sini, jadi stok dipesan setelahnya
+        super().save_related(request, form, formsets, change)
+        obj = form.instance
+        old_status = getattr(obj, '_status_lama', None)
+        
+        # Reduce stock if status changes from inactive to active (or a new active order)
+        if obj.status in self.STOCK_REDUCTION_STATUSES and old_status not in self.STOCK_REDUCTION_STATUSES:
+            try:
+                kurangi_stok(self._kebutuhan_stok(obj), 'Penjualan', pemesanan=obj)
+            except StokTidakCukup as e:
+                # Stok tidak dikurangi sama sekali: status lama dikembalikan, pesanan baru dibatalkan
+                obj.status = old_status if change else 'Dibatalkan'
+                obj.save()
+                self.message_user(
+                    request,
+                    f"Stok tidak mencukupi, status menjadi {obj.status}: {e}",
+                    level=messages.ERROR
+                )
     
     def save_formset(self, request, form, formset, change):
         # Save the formset first
@@ -263,35 +320,72 @@ class PemesananAdmin(admin.ModelAdmin):
         formset.instance.save()
 
 
+@admin.register(AntrianLaporan, site=custom_admin_site)
+class AntrianLaporanAdmin(admin.ModelAdmin):
+    list_display = ('idAntrian', 'jenisLaporan', 'parameter', 'status', 'dibuat', 'selesai', 'berkas')
+    list_filter = ('jenisLaporan', 'status')
+    ordering = ('-dibuat',)
+    readonly_fields = ('jenisLaporan', 'parameter', 'kunci', 'status', 'berkas', 'pesanError', 'dibuat', 'dimulai', 'selesai')
+    
+    def has_add_permission(self, request):
+        # Job dibuat dari halaman filter laporan, bukan dari admin
+        return False
+
+
+@admin.register(StatistikCacheLaporan, site=custom_admin_site)
+class StatistikCacheLaporanAdmin(admin.ModelAdmin):
+    list_display = ('jenisLaporan', 'hit', 'miss', 'rasio_hit')
+    readonly_fields = ('jenisLaporan', 'hit', 'miss')
+    
+    def rasio_hit(self, obj):
+        total = obj.hit + obj.miss
+        return f"{obj.hit / total:.0%}" if total else '-'
+    rasio_hit.short_description = 'Rasio Hit'
+    
+    def has_add_permission(self, request):
+        # Baris penghitung diisi oleh cache laporan
+        return False
+
+
+@admin.register(MutasiStok, site=custom_admin_site)
+class MutasiStokAdmin(admin.ModelAdmin):
+    list_display = ('waktu', 'idProduk', 'jenisMutasi', 'jumlah', 'idPemesanan', 'idProduksi', 'keterangan')
+    list_filter = ('jenisMutasi', 'idProduk')
+    search_fields = ('idProduk__namaProduk', 'keterangan')
+    ordering = ('-waktu', '-idMutasi')
+    list_select_related = ('idProduk', 'idPemesanan__idPelanggan', 'idProduksi__idKaryawan')
+    
+    # Jurnal hanya bisa ditambah oleh core/stok.py; koreksi dilakukan dengan baris penyesuaian baru
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 # Filter view functions
+def _filter_tidak_valid(request, template, context, error):
+    # Filter salah (mis. tanggal yang tidak ada) ditampilkan sebagai pesan, bukan error 500
+    messages.error(request, ' '.join(error.messages))
+    return render(request, template, context, status=400)
+
+
 @staff_member_required
 def report_filter_penjualan(request):
     # Logika untuk mendapatkan status choices (dari model Pemesanan) jika perlu
     context = {'title': 'Filter Laporan Penjualan', 'status_choices': Pemesanan.STATUS_CHOICES}
     
-    filtered_data = None
-    
     if request.method == 'POST':
-        # Dapatkan filter dari POST request
-        date_from = request.POST.get('date_from')
-        date_to = request.POST.get('date_to')
-        status = request.POST.get('status')
-        
-        # Lakukan filtering pada model Pemesanan
-        queryset = Pemesanan.objects.all()
-        
-        if date_from:
-            queryset = queryset.filter(tanggalPemesanan__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(tanggalPemesanan__lte=date_to)
-        if status:
-            queryset = queryset.filter(status=status)
-            
-        filtered_data = queryset.order_by('-tanggalPemesanan')
-        
         # Kirim filter yang sudah disubmit kembali ke template untuk mempertahankan nilai form
         context['submitted_filters'] = request.POST
-        context['filtered_data'] = filtered_data
+        try:
+            # Dataset yang sama dengan PDF (core/laporan.py)
+            context['filtered_data'] = dataset_penjualan(**ambil_filter('penjualan', request.POST))
+        except ValidationError as e:
+            return _filter_tidak_valid(request, 'admin/report_filter_penjualan.html', context, e)
     
     return render(request, 'admin/report_filter_penjualan.html', context)
 
@@ -301,26 +395,13 @@ def report_filter_produk(request):
     # Logika untuk mendapatkan jenis produk choices jika perlu
     context = {'title': 'Filter Laporan Produk'}
     
-    filtered_data = None
-    
     if request.method == 'POST':
-        # Dapatkan filter dari POST request
-        jenis_produk = request.POST.get('jenis_produk')
-        stok_menipis = request.POST.get('stok_menipis')
-        
-        # Lakukan filtering pada model Produk
-        queryset = Produk.objects.all()
-        
-        if jenis_produk:
-            queryset = queryset.filter(jenisProduk=jenis_produk)
-        if stok_menipis:
-            queryset = queryset.filter(stok__lt=10)  # Assuming 10 as threshold for low stock
-            
-        filtered_data = queryset.order_by('namaProduk')
-        
         # Kirim filter yang sudah disubmit kembali ke template untuk mempertahankan nilai form
         context['submitted_filters'] = request.POST
-        context['filtered_data'] = filtered_data
+        try:
+            context['filtered_data'] = dataset_produk(**ambil_filter('produk', request.POST))
+        except ValidationError as e:
+            return _filter_tidak_valid(request, 'admin/report_filter_produk.html', context, e)
     
     return render(request, 'admin/report_filter_produk.html', context)
 
@@ -330,313 +411,130 @@ def report_filter_produksi(request):
     # Logika untuk mendapatkan jenis hasil choices (dari model Produksi) jika perlu
     context = {'title': 'Filter Laporan Produksi'}
     
-    filtered_data = None
-    
     if request.method == 'POST':
-        # Dapatkan filter dari POST request
-        date_from = request.POST.get('date_from')
-        date_to = request.POST.get('date_to')
-        jenis_hasil = request.POST.get('jenis_hasil')
-        
-        # Lakukan filtering pada model Produksi
-        queryset = Produksi.objects.all()
-        
-        if date_from:
-            queryset = queryset.filter(tanggalProduksi__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(tanggalProduksi__lte=date_to)
-        if jenis_hasil:
-            queryset = queryset.filter(jenisHasil=jenis_hasil)
-            
-        # PENTING: Gunakan prefetch_related untuk efisiensi
-        queryset = queryset.select_related('idKaryawan').prefetch_related(
-            'detailproduksi_set__idProduk'  # Sesuaikan dengan related_name yang benar
-        ).order_by('-tanggalProduksi')
-
-        # Lakukan perhitungan di Python untuk menambah atribut baru
+        # Biaya dan ringkasan bahan sudah tersimpan di Produksi saat dicatat (core/biaya_produksi.py):
+        # satu query untuk baris, tiga query kecil untuk perbandingan resep vs aktual
+        try:
+            queryset = dataset_produksi(**ambil_filter('produksi', request.POST))
+        except ValidationError as e:
+            context['submitted_filters'] = request.POST
+            return _filter_tidak_valid(request, 'admin/report_filter_produksi.html', context, e)
         produksi_list = list(queryset)
-        for produksi in produksi_list:
-            total_biaya = 0
-            bahan_summary_list = []
+        if produksi_list:
+            context['ringkasan_biaya'] = ringkasan_biaya(queryset)
             
-            # Looping melalui semua detail produksi yang terkait
-            for detail in produksi.detailproduksi_set.all():
-                if detail.idProduk.jenisProduk == 'Bahan Baku':
-                    # 1. Kalkulasi Biaya
-                    biaya_detail = detail.jumlahBahanTerpakai * detail.idProduk.harga
-                    total_biaya += biaya_detail
-                    
-                    # 2. Buat Ringkasan Fisik Bahan
-                    summary = f"{detail.jumlahBahanTerpakai} {detail.idProduk.satuan} {detail.idProduk.namaProduk}"
-                    bahan_summary_list.append(summary)
-
-            # Tambahkan atribut baru ke objek Produksi
-            produksi.total_biaya_bahan = total_biaya 
-            produksi.bahan_terpakai_summary = " + ".join(bahan_summary_list) if bahan_summary_list else "Tidak ada data bahan"
-            
-        filtered_data = produksi_list
-        
         # Kirim filter yang sudah disubmit kembali ke template untuk mempertahankan nilai form
         context['submitted_filters'] = request.POST
-        context['filtered_data'] = filtered_data
+        context['filtered_data'] = produksi_list
     
     return render(request, 'admin/report_filter_produksi.html', context)
 
 
+@staff_member_required
+def report_analitik_penjualan(request):
+    # Tren pendapatan, bauran produk dan pelanggan teratas (core/analitik.py)
+    context = {'title': 'Analitik Penjualan', 'submitted_filters': request.GET}
+    try:
+        context['analitik'] = analitik_penjualan(request.GET.get('date_from'), request.GET.get('date_to'))
+    except ValidationError as e:
+        context['analitik'] = analitik_penjualan()
+        return _filter_tidak_valid(request, 'admin/report_analitik_penjualan.html', context, e)
+    return render(request, 'admin/report_analitik_penjualan.html', context)
+
+
+@staff_member_required
+def report_analitik_penjualan_json(request):
+    try:
+        return JsonResponse(analitik_penjualan(request.GET.get('date_from'), request.GET.get('date_to')))
+    except ValidationError as e:
+        return JsonResponse({'error': ' '.join(e.messages)}, status=400)
+
+
 # Report functions
+def _respons_laporan(jenis, request):
+    # PDF diambil dari cache berbasis konten (core/cache_laporan.py), dirender hanya jika belum ada
+    try:
+        parameter = ambil_filter(jenis, request.GET)
+    except ValidationError as e:
+        return HttpResponseBadRequest(' '.join(e.messages))
+    berkas = buka_laporan(jenis, parameter)
+    return FileResponse(berkas, as_attachment=True, filename=NAMA_BERKAS[jenis], content_type='application/pdf')
+
+
+@staff_member_required
 def report_penjualan_pdf(request):
     if not REPORTLAB_AVAILABLE:
         return HttpResponse("ReportLab is not installed. Please install it to generate PDF reports.")
     
-    # Get filter parameters
-    date_from = request.GET.get('date_from')
-    date_to = request.GET.get('date_to')
-    status = request.GET.get('status')
-    
-    # Build query
-    pemesanan_list = Pemesanan.objects.all()
-    
-    if date_from:
-        pemesanan_list = pemesanan_list.filter(tanggalPemesanan__gte=date_from)
-    if date_to:
-        pemesanan_list = pemesanan_list.filter(tanggalPemesanan__lte=date_to)
-    if status:
-        pemesanan_list = pemesanan_list.filter(status=status)
-    
-    # Create PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="laporan_penjualan.pdf"'
-    
-    doc = SimpleDocTemplate(response, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1  # Center alignment
-    )
-    story.append(Paragraph("Laporan Penjualan", title_style))
-    story.append(Spacer(1, 12))
-    
-    # Filter information
-    filter_text = "Filter: "
-    if date_from and date_to:
-        filter_text += f"Tanggal {date_from} sampai {date_to}"
-    elif date_from:
-        filter_text += f"Tanggal mulai dari {date_from}"
-    elif date_to:
-        filter_text += f"Tanggal sampai {date_to}"
-    else:
-        filter_text += "Semua tanggal"
-    
-    if status:
-        filter_text += f", Status: {status}"
-    
-    story.append(Paragraph(filter_text, styles['Normal']))
-    story.append(Spacer(1, 12))
-    
-    # Table data
-    data = [['ID', 'Tanggal', 'Pelanggan', 'Status', 'Total']]
-    
-    for pemesanan in pemesanan_list:
-        data.append([
-            str(pemesanan.idPemesanan),
-            pemesanan.tanggalPemesanan.strftime('%d/%m/%Y'),
-            pemesanan.idPelanggan.namaPelanggan,
-            pemesanan.status,
-            f"Rp {pemesanan.totalPemesanan:,}"
-        ])
-    
-    # Create table
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(table)
-    
-    # Build PDF
-    doc.build(story)
-    return response
+    return _respons_laporan('penjualan', request)
 
 
+@staff_member_required
 def report_produk_pdf(request):
     if not REPORTLAB_AVAILABLE:
         return HttpResponse("ReportLab is not installed. Please install it to generate PDF reports.")
     
-    # Get filter parameters
-    jenis_produk = request.GET.get('jenis_produk')
-    stok_menipis = request.GET.get('stok_menipis')
-    
-    # Build query
-    produk_list = Produk.objects.all()
-    
-    if jenis_produk:
-        produk_list = produk_list.filter(jenisProduk=jenis_produk)
-    
-    if stok_menipis:
-        produk_list = produk_list.filter(stok__lt=10)  # Assuming 10 as threshold for low stock
-    
-    # Create PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="laporan_produk.pdf"'
-    
-    doc = SimpleDocTemplate(response, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1  # Center alignment
-    )
-    story.append(Paragraph("Laporan Produk", title_style))
-    story.append(Spacer(1, 12))
-    
-    # Filter information
-    filter_text = "Filter: "
-    if jenis_produk:
-        filter_text += f"Jenis Produk: {jenis_produk}"
-    else:
-        filter_text += "Semua jenis produk"
-    
-    if stok_menipis:
-        filter_text += ", Stok Menipis: Ya"
-    
-    story.append(Paragraph(filter_text, styles['Normal']))
-    story.append(Spacer(1, 12))
-    
-    # Table data
-    data = [['Nama Produk', 'Jenis', 'Harga', 'Stok', 'Satuan']]
-    
-    for produk in produk_list:
-        data.append([
-            produk.namaProduk,
-            produk.jenisProduk,
-            f"Rp {produk.harga:,}",
-            str(produk.stok),
-            produk.satuan
-        ])
-    
-    # Create table
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(table)
-    
-    # Build PDF
-    doc.build(story)
-    return response
+    return _respons_laporan('produk', request)
 
 
+@staff_member_required
 def report_produksi_pdf(request):
     if not REPORTLAB_AVAILABLE:
         return HttpResponse("ReportLab is not installed. Please install it to generate PDF reports.")
     
-    # Get filter parameters
-    date_from = request.GET.get('date_from')
-    date_to = request.GET.get('date_to')
-    jenis_hasil = request.GET.get('jenis_hasil')
-    
-    # Build query
-    produksi_list = Produksi.objects.all()
-    
-    if date_from:
-        produksi_list = produksi_list.filter(tanggalProduksi__gte=date_from)
-    if date_to:
-        produksi_list = produksi_list.filter(tanggalProduksi__lte=date_to)
-    if jenis_hasil:
-        produksi_list = produksi_list.filter(jenisHasil=jenis_hasil)
-    
-    # Create PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="laporan_produksi.pdf"'
-    
-    doc = SimpleDocTemplate(response, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1  # Center alignment
+    return _respons_laporan('produksi', request)
+
+
+# Background report queue (core/antrian.py, worker: jalankan_antrian_laporan)
+def _status_antrian(job):
+    data = {
+        'id': job.idAntrian,
+        'status': job.status,
+        'url_status': reverse('core:report_antrian_status', args=[job.idAntrian]),
+    }
+    if job.status == 'Selesai':
+        data['url_unduh'] = reverse('core:report_antrian_unduh', args=[job.idAntrian])
+    elif job.status == 'Gagal':
+        data['pesan'] = job.pesanError
+    return data
+
+
+@staff_member_required
+@require_POST
+def report_antrian_tambah(request, jenis):
+    if jenis not in FILTER_LAPORAN:
+        raise Http404("Jenis laporan tidak dikenal.")
+    try:
+        ambil_filter(jenis, request.POST)
+    except ValidationError as e:
+        return JsonResponse({'status': 'Gagal', 'pesan': ' '.join(e.messages)}, status=400)
+    # Filter yang sama dengan job lain akan memakai job/berkas yang sudah ada
+    job = antrikan_laporan(jenis, request.POST)
+    return JsonResponse(_status_antrian(job))
+
+
+@staff_member_required
+def report_antrian_status(request, antrian_id):
+    job = get_object_or_404(AntrianLaporan, idAntrian=antrian_id)
+    return JsonResponse(_status_antrian(job))
+
+
+@staff_member_required
+def report_antrian_unduh(request, antrian_id):
+    job = get_object_or_404(AntrianLaporan, idAntrian=antrian_id, status='Selesai')
+    if not job.berkas:
+        raise Http404("Berkas laporan tidak ditemukan.")
+    try:
+        berkas = job.berkas.open('rb')
+    except FileNotFoundError:
+        # Sudah dibersihkan oleh worker (core/antrian.py: bersihkan_antrian)
+        raise Http404("Berkas laporan tidak ditemukan.")
+    return FileResponse(
+        berkas,
+        as_attachment=True,
+        filename=NAMA_BERKAS[job.jenisLaporan],
+        content_type='application/pdf'
     )
-    story.append(Paragraph("Laporan Produksi", title_style))
-    story.append(Spacer(1, 12))
-    
-    # Filter information
-    filter_text = "Filter: "
-    if date_from and date_to:
-        filter_text += f"Tanggal {date_from} sampai {date_to}"
-    elif date_from:
-        filter_text += f"Tanggal mulai dari {date_from}"
-    elif date_to:
-        filter_text += f"Tanggal sampai {date_to}"
-    else:
-        filter_text += "Semua tanggal"
-    
-    if jenis_hasil:
-        filter_text += f", Jenis Hasil: {jenis_hasil}"
-    
-    story.append(Paragraph(filter_text, styles['Normal']))
-    story.append(Spacer(1, 12))
-    
-    # Table data
-    data = [['ID', 'Tanggal Produksi', 'Jenis Hasil', 'Jumlah Hasil', 'Karyawan']]
-    
-    for produksi in produksi_list:
-        data.append([
-            str(produksi.idProduksi),
-            produksi.tanggalProduksi.strftime('%d/%m/%Y'),
-            produksi.jenisHasil,
-            str(produksi.jumlahHasil),
-            produksi.idKaryawan.nama
-        ])
-    
-    # Create table
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(table)
-    
-    # Build PDF
-    doc.build(story)
-    return response
 
 
 # Dashboard context function
@@ -648,38 +546,31 @@ def admin_dashboard_context():
     
     total_pelanggan = Pelanggan.objects.count()
     
-    total_pemesanan = Pemesanan.objects.count()
+    # Jumlah pemesanan per status dibaca dari penghitung (core/penghitung.py), O(1)
+    jumlah_per_status = jumlah_pemesanan_per_status()
+    total_pemesanan = sum(jumlah_per_status.values())
+    pesanan_perhatian_count = sum(jumlah_per_status[status] for status in STATUS_PERHATIAN)
     
-    # Calculate total revenue only from completed orders
-    total_pendapatan = Pemesanan.objects.filter(status='Selesai').aggregate(
-        total=Sum('totalPemesanan')
-    )['total'] or 0
+    # Pendapatan dibaca dari rekap harian (core/rekap.py) dalam satu query
+    total_pendapatan = 0  # Hanya dari pemesanan Selesai
+    pendapatan_per_bulan = {}
     
-    # 1. Hitung Pesanan yang Membutuhkan Perhatian:
-    # Status yang dihitung: 'Diproses' dan 'Dikirim'
-    ATTENTION_STATUSES = ['Diproses', 'Dikirim']
-    pesanan_perhatian_count = Pemesanan.objects.filter(status__in=ATTENTION_STATUSES).count()
+    for baris in rekap_bulanan().filter(status='Selesai'):
+        total_pendapatan += baris['total'] or 0
+        pendapatan_per_bulan[baris['bulan']] = baris['total'] or 0
     
     # 2.1 Logika Stok Menipis
     STOK_AMAN_THRESHOLD = 10 
     produk_stok_menipis = Produk.objects.filter(stok__lt=STOK_AMAN_THRESHOLD).order_by('namaProduk')
     
-    # Calculate monthly revenue for the last 6 months (only completed orders)
+    # Monthly revenue for the last 6 calendar months (only completed orders)
     today = timezone.now().date()
     monthly_revenue = []
     labels = []
     
     for i in range(5, -1, -1):
-        month_start = today.replace(day=1) - timedelta(days=30*i)
-        month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
-        
-        revenue = Pemesanan.objects.filter(
-            tanggalPemesanan__gte=month_start,
-            tanggalPemesanan__lte=month_end,
-            status='Selesai'
-        ).aggregate(total=Sum('totalPemesanan'))['total'] or 0
-        
-        monthly_revenue.append(int(revenue))
+        month_start = awal_bulan_mundur(today, i)
+        monthly_revenue.append(int(pendapatan_per_bulan.get(month_start, 0)))
         labels.append(month_start.strftime('%B %Y'))
     
     context = {
@@ -715,7 +606,6 @@ CustomAdminSite.index = custom_index
 
 # Jazzmin Customization
 def get_pesanan_perhatian_count(request):
-    ATTENTION_STATUSES = ['Diproses', 'Dikirim']
-    # Memastikan fungsi dapat diakses oleh Jazzmin
-    return Pemesanan.objects.filter(status__in=ATTENTION_STATUSES).count()
+    # Memastikan fungsi dapat diakses oleh Jazzmin; dibaca dari penghitung, bukan COUNT(*)
+    return jumlah_pesanan_perhatian()
 
@@ -0,0 +1,223 @@
+from array import array
+from collections import defaultdict
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Sum
+from django.utils import timezone
+from .laporan import baca_tanggal
+from .models import Pelanggan, Pemesanan, RekapPelangganBulanan, RekapPenjualanHarian, RekapProdukHarian
+from .rekap import STATUS_PENDAPATAN, awal_bulan_mundur
+from .versi_cache import naikkan_versi, versi
+
+
+# Rentang default halaman analitik, dalam hari termasuk hari ini
+RENTANG_DEFAULT = 90
+
+# Rentang terpanjang yang diterima; deret harian dan bauran produk dibaca dari rekap, tetap tumbuh sebanding dengan rentang
+RENTANG_MAKSIMUM = 366
+
+# Jendela rata-rata bergerak pendapatan harian (hari)
+JENDELA_RATA_RATA = (7, 30)
+
+JUMLAH_PELANGGAN_TERATAS = 10
+
+# Kunci cache memuat nomor versi data penjualan, jadi TTL hanya untuk membuang entri lama
+TTL = 60 * 60
+
+KUNCI_VERSI = 'analitik_penjualan:versi'
+
+def _cache():
+    return caches['statistik']
+
+
+def _versi():
+    return versi(_cache(), KUNCI_VERSI)
+
+
+def invalidasi_analitik():
+    """Drop every cached analytics result once the current transaction commits"""
+    naikkan_versi(_cache(), KUNCI_VERSI)
+
+
+def rentang_tanggal(date_from=None, date_to=None):
+    """Parse the report range; defaults to the last RENTANG_DEFAULT days, at most RENTANG_MAKSIMUM"""
+    akhir = baca_tanggal(date_to) if date_to else timezone.localdate()
+    awal = baca_tanggal(date_from) if date_from else akhir - timedelta(days=RENTANG_DEFAULT - 1)
+    if awal > akhir:
+        raise ValidationError('Tanggal mulai harus sebelum tanggal selesai.')
+    if (akhir - awal).days >= RENTANG_MAKSIMUM:
+        raise ValidationError(f'Rentang analitik paling panjang {RENTANG_MAKSIMUM} hari.')
+    return awal, akhir
+
+
+def _nol(n):
+    return array('q', bytes(8 * n))
+
+
+def _deret_harian(awal, akhir):
+    # Satu baris rekap per hari (tanggal, status unik), ditulis ke kolom padat berindeks hari
+    n = (akhir - awal).days + 1
+    pendapatan, pesanan = _nol(n), _nol(n)
+    nol = awal.toordinal()
+    baris = RekapPenjualanHarian.objects.filter(
+        status=STATUS_PENDAPATAN, tanggal__range=(awal, akhir)
+    ).values_list('tanggal', 'jumlahPemesanan', 'totalPendapatan')
+    for tanggal, jumlah, total in baris:
+        i = tanggal.toordinal() - nol
+        pesanan[i] = jumlah
+        pendapatan[i] = total
+    return pendapatan, pesanan
+
+
+def _kelompokkan(awal, kolom, awal_periode):
+    """Sum daily columns into consecutive periods; ``awal_periode`` maps a date to its period start"""
+    label, hasil = [], [[] for _ in kolom]
+    for i in range(len(kolom[0])):
+        periode = awal_periode(awal + timedelta(days=i))
+        if not label or label[-1] != periode:
+            label.append(periode)
+            for deret in hasil:
+                deret.append(0)
+        for deret, nilai in zip(hasil, kolom):
+            deret[-1] += nilai[i]
+    return [tanggal.isoformat() for tanggal in label], hasil
+
+
+def rata_bergerak(nilai, jendela):
+    """Trailing moving average from prefix sums; the first days average over what is available"""
+    kumulatif = [0, *accumulate(nilai)]
+    return [
+        round((kumulatif[i + 1] - kumulatif[max(0, i + 1 - jendela)]) / min(jendela, i + 1), 2)
+        for i in range(len(nilai))
+    ]
+
+
+def _bauran_produk(awal, akhir):
+    # Dari rekap harian per produk: satu baris per hari per produk, bukan seluruh baris detail pesanan
+    baris = list(
+        RekapProdukHarian.objects
+        .filter(tanggal__range=(awal, akhir))
+        .values('idProduk', 'idProduk__namaProduk')
+        .annotate(kuantiti=Sum('kuantiti'), pendapatan=Sum('totalPendapatan'))
+        .exclude(kuantiti=0, pendapatan=0)
+        .order_by('-pendapatan', 'idProduk__namaProduk')
+    )
+    total = sum(b['pendapatan'] for b in baris)
+    return [
+        {'produk_id': b['idProduk'], 'nama': b['idProduk__namaProduk'], 'kuantiti': b['kuantiti'],
+         'pendapatan': b['pendapatan'], 'porsi': round(b['pendapatan'] / total, 4) if total else 0}
+        for b in baris
+    ]
+
+
+def _belanja_pelanggan(awal, akhir):
+    """{pelanggan_id: [pesanan, pendapatan]}: whole months from the monthly rollup, partial edge months from the orders"""
+    bulan_awal = awal if awal.day == 1 else awal_bulan_mundur(awal, -1)
+    bulan_akhir = (akhir + timedelta(days=1)).replace(day=1)  # Eksklusif
+    bagian = []
+    if bulan_awal < bulan_akhir:
+        bagian.append(
+            RekapPelangganBulanan.objects
+            .filter(bulan__gte=bulan_awal, bulan__lt=bulan_akhir)
+            .values_list('idPelanggan')
+            .annotate(Sum('jumlahPemesanan'), Sum('totalPendapatan'))
+        )
+        tepi = [(awal, bulan_awal - timedelta(days=1)), (bulan_akhir, akhir)]
+    else:
+        tepi = [(awal, akhir)]
+    for dari, sampai in tepi:
+        if dari <= sampai:
+            bagian.append(
+                Pemesanan.objects
+                .filter(status=STATUS_PENDAPATAN, tanggalPemesanan__range=(dari, sampai))
+                .values_list('idPelanggan')
+                .annotate(Count('pk'), Sum('totalPemesanan'))
+                .order_by()
+            )
+
+    belanja = defaultdict(lambda: [0, 0])
+    for queryset in bagian:
+        for pelanggan_id, pesanan, pendapatan in queryset:
+            belanja[pelanggan_id][0] += pesanan
+            belanja[pelanggan_id][1] += pendapatan
+    return belanja
+
+
+def _pelanggan_teratas(awal, akhir):
+    # Dikelompokkan per id saja; nama hanya diambil untuk pelanggan teratas
+    baris = sorted(
+        ((pelanggan_id, pesanan, pendapatan)
+         for pelanggan_id, (pesanan, pendapatan) in _belanja_pelanggan(awal, akhir).items() if pesanan),
+        key=lambda b: (-b[2], b[0]),
+    )[:JUMLAH_PELANGGAN_TERATAS]
+    nama = dict(
+        Pelanggan.objects.filter(pk__in=[b[0] for b in baris]).values_list('idPelanggan', 'namaPelanggan')
+    )
+    return [
+        {'pelanggan_id': pelanggan_id, 'nama': nama.get(pelanggan_id), 'pesanan': pesanan, 'pendapatan': pendapatan}
+        for pelanggan_id, pesanan, pendapatan in baris
+    ]
+
+
+def hitung_analitik(awal, akhir):
+    """
+    Sales trend and product-mix analytics of completed orders between two dates.
+
+    Revenue comes from the daily rollup (one small query) laid out as dense
+    per-day columns, from which the weekly and monthly buckets and the
+    moving averages are derived. The product mix is grouped from the daily
+    per-product rollup and the top customers from the monthly per-customer
+    rollup plus the partial months at both ends, so no query reads more
+    than about two months of orders. Everything is plain JSON data: dates are ISO strings
+    and the series are column lists aligned on their ``tanggal`` list.
+    """
+    pendapatan, pesanan = _deret_harian(awal, akhir)
+    harian = {
+        'tanggal': [(awal + timedelta(days=i)).isoformat() for i in range(len(pendapatan))],
+        'pendapatan': pendapatan.tolist(),
+        'pesanan': pesanan.tolist(),
+    }
+    for jendela in JENDELA_RATA_RATA:
+        harian[f'rata_rata_{jendela}'] = rata_bergerak(pendapatan, jendela)
+
+    deret = {'harian': harian}
+    periode = {
+        'mingguan': lambda tanggal: tanggal - timedelta(days=tanggal.weekday()),
+        'bulanan': lambda tanggal: tanggal.replace(day=1),
+    }
+    for nama, awal_periode in periode.items():
+        label, (per_pendapatan, per_pesanan) = _kelompokkan(awal, (pendapatan, pesanan), awal_periode)
+        deret[nama] = {'tanggal': label, 'pendapatan': per_pendapatan, 'pesanan': per_pesanan}
+
+    total_pendapatan, total_pesanan = sum(pendapatan), sum(pesanan)
+    return {
+        'rentang': {'awal': awal.isoformat(), 'akhir': akhir.isoformat()},
+        'ringkasan': {
+            'pendapatan': total_pendapatan,
+            'pesanan': total_pesanan,
+            'rata_rata_pesanan': round(total_pendapatan / total_pesanan, 2) if total_pesanan else 0,
+        },
+        **deret,
+        'produk': _bauran_produk(awal, akhir),
+        'pelanggan_teratas': _pelanggan_teratas(awal, akhir),
+    }
+
+
+def analitik_penjualan(date_from=None, date_to=None):
+    """
+    Sales analytics for a date range, served from the 'statistik' cache.
+
+    Entries are stored under a version number that the Pemesanan and
+    DetailPemesanan signals bump on commit, so a cache hit costs no query
+    at all. Raises ValidationError for an invalid range.
+    """
+    awal, akhir = rentang_tanggal(date_from, date_to)
+    kunci = f'analitik_penjualan:{_versi()}:{awal.isoformat()}:{akhir.isoformat()}'
+    data = _cache().get(kunci)
+    if data is None:
+        data = hitung_analitik(awal, akhir)
+        _cache().set(kunci, data, TTL)
+    return data
@@ -0,0 +1,134 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .laporan import DATASET_LAPORAN, FILTER_LAPORAN, versi_data
+from .laporan_pdf import TULIS_LAPORAN
+from .models import AntrianLaporan
+
+
+# Berapa lama PDF yang sudah jadi boleh dipakai ulang untuk filter yang sama (detik)
+ARTEFAK_TTL = getattr(settings, 'ANTRIAN_LAPORAN_TTL', 15 * 60)
+
+# Job 'Diproses' lebih lama dari ini dianggap ditinggal worker yang mati (detik)
+BATAS_PROSES = getattr(settings, 'ANTRIAN_LAPORAN_BATAS_PROSES', 30 * 60)
+
+# Job selesai/gagal beserta PDF-nya dihapus setelah umur ini (detik)
+BATAS_SIMPAN = getattr(settings, 'ANTRIAN_LAPORAN_SIMPAN', 24 * 60 * 60)
+
+
+def normalisasi_parameter(jenis, parameter):
+    """Keep only the known, non-empty filters of a report, as strings"""
+    return {
+        nama: str(parameter[nama]).strip()
+        for nama in FILTER_LAPORAN[jenis]
+        if parameter.get(nama) not in (None, '') and str(parameter[nama]).strip()
+    }
+
+
+def kunci_laporan(jenis, parameter, versi=''):
+    """Stable key for a report type, its normalized filters and a data version"""
+    data = json.dumps([jenis, normalisasi_parameter(jenis, parameter), versi], sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def antrikan_laporan(jenis, parameter):
+    """
+    Queue a report, or return the job that already covers the same filters.
+
+    A waiting or running job with the same key is reused, and so is a
+    finished job whose file is younger than ANTRIAN_LAPORAN_TTL. The key
+    includes the data version, so a finished file is never reused once
+    the underlying rows have changed. Two simultaneous requests cannot
+    both queue a job: the unique constraint on active keys rejects the
+    second insert, which then returns the winner's job.
+    """
+    parameter = normalisasi_parameter(jenis, parameter)
+    kunci = kunci_laporan(jenis, parameter, versi_data(jenis))
+
+    aktif = AntrianLaporan.objects.filter(kunci=kunci, status__in=AntrianLaporan.STATUS_AKTIF).first()
+    if aktif:
+        return aktif
+
+    selesai = AntrianLaporan.objects.filter(
+        kunci=kunci,
+        status='Selesai',
+        selesai__gte=timezone.now() - timedelta(seconds=ARTEFAK_TTL)
+    ).order_by('-selesai').first()
+    if selesai and selesai.berkas and selesai.berkas.storage.exists(selesai.berkas.name):
+        return selesai
+
+    try:
+        with transaction.atomic():
+            return AntrianLaporan.objects.create(jenisLaporan=jenis, parameter=parameter, kunci=kunci)
+    except IntegrityError:
+        # Request lain mengantrikan filter yang sama di antara cek dan insert
+        return AntrianLaporan.objects.filter(kunci=kunci).order_by('-dibuat', '-idAntrian').first()
+
+
+def _ambil_job_berikutnya():
+    # Klaim job dengan UPDATE bersyarat supaya dua worker tidak mengambil job yang sama
+    while True:
+        job = AntrianLaporan.objects.filter(status='Menunggu').order_by('dibuat').first()
+        if job is None:
+            return None
+        diklaim = AntrianLaporan.objects.filter(pk=job.pk, status='Menunggu').update(
+            status='Diproses', dimulai=timezone.now()
+        )
+        if diklaim:
+            job.status = 'Diproses'
+            return job
+
+
+def render_laporan(jenis, parameter, berkas):
+    """Render one report into an open binary file"""
+    queryset = DATASET_LAPORAN[jenis](**parameter)
+    TULIS_LAPORAN[jenis](berkas, queryset, **parameter)
+
+
+def proses_job(job):
+    """Render a claimed job into the private report store and mark it done or failed"""
+    # Import lokal: cache_laporan memakai render_laporan dari modul ini
+    from .cache_laporan import buka_laporan
+
+    try:
+        # Render lewat cache PDF, jadi filter + data yang sama tidak dirender dua kali
+        with buka_laporan(job.jenisLaporan, job.parameter) as berkas:
+            job.berkas.save(f'laporan_{job.jenisLaporan}_{job.idAntrian}.pdf', File(berkas), save=False)
+        job.status = 'Selesai'
+        job.pesanError = None
+    except Exception as e:
+        job.status = 'Gagal'
+        job.pesanError = str(e)
+    job.selesai = timezone.now()
+    job.save(update_fields=['berkas', 'status', 'pesanError', 'selesai'])
+    return job
+
+
+def proses_job_berikutnya():
+    """Claim and render the oldest waiting job; returns it, or None if the queue is empty"""
+    job = _ambil_job_berikutnya()
+    if job is None:
+        return None
+    return proses_job(job)
+
+
+def pulihkan_job_macet():
+    """Put jobs left 'Diproses' by a dead worker back in the queue"""
+    batas = timezone.now() - timedelta(seconds=BATAS_PROSES)
+    return AntrianLaporan.objects.filter(status='Diproses', dimulai__lt=batas).update(status='Menunggu', dimulai=None)
+
+
+def bersihkan_antrian(batas=None):
+    """Delete finished and failed jobs older than ``batas`` seconds with their PDFs; returns jobs removed"""
+    batas = BATAS_SIMPAN if batas is None else batas
+    lama = AntrianLaporan.objects.filter(
+        status__in=['Selesai', 'Gagal'], dibuat__lt=timezone.now() - timedelta(seconds=batas)
+    )
+    for job in lama.exclude(berkas='').exclude(berkas=None).only('idAntrian', 'berkas'):
+        job.berkas.delete(save=False)
+    return lama.delete()[0]
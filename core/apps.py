@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Daftarkan signal handler (rekap penjualan, dll.) dan PRAGMA koneksi SQLite
+        from . import basisdata, signals  # noqa: F401
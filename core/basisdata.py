@@ -0,0 +1,50 @@
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+# PRAGMA yang dipasang pada setiap koneksi SQLite baru (lihat SQLITE_PRAGMA di settings)
+PRAGMA_SQLITE = getattr(settings, 'SQLITE_PRAGMA', {})
+
+# Mode BEGIN untuk transaksi_tulis; None = BEGIN biasa (DEFERRED), seperti atomic()
+MODE_TRANSAKSI_TULIS = getattr(settings, 'SQLITE_MODE_TRANSAKSI_TULIS', 'IMMEDIATE')
+
+
+@receiver(connection_created)
+def atur_pragma_sqlite(sender, connection, **kwargs):
+    """Apply PRAGMA_SQLITE to every new SQLite connection"""
+    if connection.vendor != 'sqlite' or not PRAGMA_SQLITE:
+        return
+    with connection.cursor() as cursor:
+        for nama, nilai in PRAGMA_SQLITE.items():
+            cursor.execute(f'PRAGMA {nama} = {nilai}')
+
+
+@contextmanager
+def transaksi_tulis(using=None):
+    """
+    atomic() for write paths that read before they write.
+
+    On SQLite the outermost block starts with BEGIN IMMEDIATE, so it waits
+    busy_timeout for the write lock up front instead of failing with
+    "database is locked" when its read transaction has to be upgraded.
+    Plain atomic() blocks stay DEFERRED, so read-only transactions (in this
+    code, Django or third-party apps) never hold the write lock. Nested
+    blocks are ordinary savepoints; other databases get a plain atomic().
+    """
+    koneksi = transaction.get_connection(using)
+    with ExitStack() as tumpukan:
+        if koneksi.vendor == 'sqlite' and MODE_TRANSAKSI_TULIS and not koneksi.in_atomic_block:
+            koneksi.ensure_connection()
+            mode = koneksi.transaction_mode
+            koneksi.transaction_mode = MODE_TRANSAKSI_TULIS
+            try:
+                tumpukan.enter_context(transaction.atomic(using=using))
+            finally:
+                koneksi.transaction_mode = mode
+        else:
+            tumpukan.enter_context(transaction.atomic(using=using))
+        yield
@@ -0,0 +1,138 @@
+import math
+from collections import defaultdict
+
+from django.db.models import F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+from .models import DetailProduksi, DetailResep, Produksi, Resep
+
+
+# Jumlah produksi per UPDATE saat menghitung ulang banyak baris sekaligus
+BATCH = 500
+
+
+def kebutuhan_resep(jenis_hasil, jumlah_hasil):
+    """
+    Raw material needed for ``jumlah_hasil`` units according to the recipe (one query).
+
+    Returns [(produk_id, jumlah)] rounded up to whole units, or [] when the
+    product has no recipe.
+    """
+    baris = DetailResep.objects.filter(idResep__jenisHasil=jenis_hasil).values_list(
+        'idProduk', 'jumlahBahan', 'idResep__hasilPerBatch'
+    )
+    return [
+        (produk_id, math.ceil(jumlah * int(jumlah_hasil) / hasil_per_batch))
+        for produk_id, jumlah, hasil_per_batch in baris
+    ]
+
+
+def _biaya_aktual():
+    # Biaya bahan baku yang benar-benar tercatat untuk satu produksi
+    return Coalesce(Subquery(
+        DetailProduksi.objects
+        .filter(idProduksi=OuterRef('pk'), idProduk__jenisProduk='Bahan Baku')
+        .order_by()
+        .values('idProduksi')
+        .annotate(total=Sum(F('jumlahBahanTerpakai') * F('idProduk__harga')))
+        .values('total'),
+        output_field=IntegerField()
+    ), Value(0))
+
+
+def _biaya_standar():
+    # Biaya resep per takaran x jumlah takaran; NULL bila jenis hasil belum punya resep
+    per_batch = Subquery(
+        DetailResep.objects
+        .filter(idResep__jenisHasil=OuterRef('jenisHasil'))
+        .order_by()
+        .values('idResep')
+        .annotate(total=Sum(Cast('jumlahBahan', FloatField()) * F('idProduk__harga')))
+        .values('total'),
+        output_field=FloatField()
+    )
+    hasil_per_batch = Subquery(
+        Resep.objects.filter(jenisHasil=OuterRef('jenisHasil')).values('hasilPerBatch'),
+        output_field=FloatField()
+    )
+    return Round(per_batch * F('jumlahHasil') / hasil_per_batch)
+
+
+def _ringkasan(produksi_ids):
+    # "2 kg Kedelai + 1 bungkus Ragi" per produksi, dari satu query
+    ringkasan = defaultdict(list)
+    baris = (
+        DetailProduksi.objects
+        .filter(idProduksi__in=produksi_ids, idProduk__jenisProduk='Bahan Baku')
+        .order_by('idProduksi', 'idDetail')
+        .values_list('idProduksi', 'jumlahBahanTerpakai', 'idProduk__satuan', 'idProduk__namaProduk')
+    )
+    for produksi_id, jumlah, satuan, nama in baris:
+        ringkasan[produksi_id].append(f"{jumlah} {satuan} {nama}")
+    return {produksi_id: ' + '.join(bagian) for produksi_id, bagian in ringkasan.items()}
+
+
+def perbarui_biaya(produksi_ids):
+    """
+    Store material cost, recipe cost, unit cost and material summary on Produksi rows.
+
+    Costs are aggregated by the database in one UPDATE per batch of rows,
+    using the current raw material prices, so a stored cost keeps the
+    prices of the moment the production was recorded or last edited.
+    """
+    produksi_ids = list(produksi_ids)
+    for awal in range(0, len(produksi_ids), BATCH):
+        ids = produksi_ids[awal:awal + BATCH]
+        Produksi.objects.filter(pk__in=ids).update(
+            biayaBahan=_biaya_aktual(),
+            biayaStandar=_biaya_standar(),
+            biayaPerUnit=Coalesce(
+                Round(Cast(_biaya_aktual(), FloatField()) / NullIf(F('jumlahHasil'), 0), 2), Value(0.0)
+            ),
+        )
+        ringkasan = _ringkasan(ids)
+        Produksi.objects.bulk_update(
+            [Produksi(pk=produksi_id, ringkasanBahan=ringkasan.get(produksi_id, '')) for produksi_id in ids],
+            ['ringkasanBahan']
+        )
+
+
+def ringkasan_biaya(queryset):
+    """
+    Cost and material usage of a set of productions, expected (recipe) versus actual.
+
+    ``per_jenis`` aggregates the stored cost columns per jenisHasil;
+    ``bahan`` compares the recorded raw material usage with what the
+    recipes call for, given the total output per jenisHasil.
+    """
+    queryset = queryset.order_by()
+    per_jenis = list(
+        queryset.values('jenisHasil')
+        .annotate(jumlah=Sum('jumlahHasil'), biaya=Sum('biayaBahan'), standar=Sum('biayaStandar'))
+        .order_by('jenisHasil')
+    )
+    for baris in per_jenis:
+        baris['biaya_per_unit'] = baris['biaya'] / baris['jumlah'] if baris['jumlah'] else 0
+
+    bahan = {
+        b['idProduk']: {'nama': b['idProduk__namaProduk'], 'satuan': b['idProduk__satuan'],
+                        'aktual': b['jumlah'], 'standar': 0}
+        for b in DetailProduksi.objects
+        .filter(idProduksi__in=queryset.values('pk'), idProduk__jenisProduk='Bahan Baku')
+        .values('idProduk', 'idProduk__namaProduk', 'idProduk__satuan')
+        .annotate(jumlah=Sum('jumlahBahanTerpakai'))
+        .order_by()
+    }
+    hasil_per_jenis = {baris['jenisHasil']: baris['jumlah'] for baris in per_jenis}
+    resep = DetailResep.objects.filter(idResep__jenisHasil__in=hasil_per_jenis).values(
+        'idResep__jenisHasil', 'idResep__hasilPerBatch', 'idProduk', 'idProduk__namaProduk', 'idProduk__satuan', 'jumlahBahan'
+    )
+    for r in resep:
+        baris = bahan.setdefault(r['idProduk'], {
+            'nama': r['idProduk__namaProduk'], 'satuan': r['idProduk__satuan'], 'aktual': 0, 'standar': 0
+        })
+        baris['standar'] += float(r['jumlahBahan']) * hasil_per_jenis[r['idResep__jenisHasil']] / r['idResep__hasilPerBatch']
+    for baris in bahan.values():
+        baris['standar'] = round(baris['standar'], 2)
+        baris['selisih'] = round(baris['aktual'] - baris['standar'], 2)
+
+    return {'per_jenis': per_jenis, 'bahan': sorted(bahan.values(), key=lambda b: b['nama'])}
@@ -0,0 +1,96 @@
+import os
+import tempfile
+
+from django.conf import settings
+from .antrian import kunci_laporan, normalisasi_parameter, render_laporan
+from .laporan import versi_data
+from .models import StatistikCacheLaporan
+from .penghitung import tambah_atomik
+
+
+# Folder PDF cache; sengaja di luar MEDIA_ROOT supaya laporan tidak bisa diunduh langsung
+CACHE_DIR = getattr(settings, 'LAPORAN_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'laporan'))
+
+# Batas total ukuran cache; file yang paling lama tidak dipakai dihapus lebih dulu
+CACHE_MAX_BYTES = getattr(settings, 'LAPORAN_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+
+
+def _path(kunci):
+    return os.path.join(CACHE_DIR, f'{kunci}.pdf')
+
+
+def _catat(jenis, kolom):
+    # Penghitung hit/miss dengan F() supaya request paralel tidak saling menimpa
+    tambah_atomik(StatistikCacheLaporan, {'jenisLaporan': jenis}, **{kolom: 1})
+
+
+def bersihkan_cache(batas=None):
+    """Evict least recently used PDFs until the cache fits in ``batas`` bytes; returns files removed"""
+    batas = CACHE_MAX_BYTES if batas is None else batas
+    try:
+        entri = [e for e in os.scandir(CACHE_DIR) if e.is_file() and e.name.endswith('.pdf')]
+    except FileNotFoundError:
+        return 0
+
+    berkas = []
+    for e in entri:
+        try:
+            info = e.stat()
+        except FileNotFoundError:
+            continue
+        berkas.append((info.st_mtime, info.st_size, e.path))
+
+    total = sum(ukuran for _, ukuran, _ in berkas)
+    dihapus = 0
+    for _, ukuran, path in sorted(berkas):
+        if total <= batas:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= ukuran
+        dihapus += 1
+    return dihapus
+
+
+def buka_laporan(jenis, parameter):
+    """
+    Open the rendered PDF of a report for reading, rendering it on a cache miss.
+
+    The key covers the report type, its normalized filters and the current
+    data version, so any change to the underlying rows yields a new file
+    and stale entries simply age out of the LRU. The file is opened before
+    eviction runs, so a concurrent cleanup cannot pull it from under the caller.
+    """
+    parameter = normalisasi_parameter(jenis, parameter)
+    path = _path(kunci_laporan(jenis, parameter, versi_data(jenis)))
+
+    try:
+        berkas = open(path, 'rb')
+    except FileNotFoundError:
+        pass
+    else:
+        try:
+            # mtime dipakai sebagai waktu akses terakhir untuk LRU
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        _catat(jenis, 'hit')
+        return berkas
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, sementara = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tulis:
+            render_laporan(jenis, parameter, tulis)
+        # Rename atomik: pembaca lain tidak pernah melihat PDF setengah jadi
+        os.replace(sementara, path)
+    except BaseException:
+        os.unlink(sementara)
+        raise
+    berkas = open(path, 'rb')
+
+    _catat(jenis, 'miss')
+    bersihkan_cache()
+    return berkas
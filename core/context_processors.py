@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+from .keranjang import jumlah_item
+
+
+def keranjang(request):
+    """Cart line count for the customer navbar, only queried when a template uses it"""
+    pelanggan_id = request.session.get('pelanggan_id') if hasattr(request, 'session') else None
+    if not pelanggan_id:
+        return {'jumlah_item_keranjang': 0}
+    return {'jumlah_item_keranjang': SimpleLazyObject(lambda: jumlah_item(pelanggan_id))}
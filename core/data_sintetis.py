@@ -0,0 +1,141 @@
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from .analitik import invalidasi_analitik
+from .biaya_produksi import perbarui_biaya
+from .katalog import invalidasi_katalog
+from .models import (
+    DetailPemesanan, DetailProduksi, Karyawan, MutasiStok, Pelanggan, Pemesanan, Produk, Produksi
+)
+from .penghitung import rekonsiliasi_penghitung
+from .rekap import rebuild_rekap
+
+
+# Awalan username data sintetis, dipakai juga untuk mengenali data yang sudah ada
+AWALAN = 'sintetis'
+
+BATCH = 2000
+
+PRODUK_JADI = [('Tahu', 2000), ('Tempe', 2500), ('Tahu Goreng', 3000), ('Tempe Goreng', 3500), ('Tahu Isi', 4000)]
+BAHAN_BAKU = [('Kedelai', 12000, 'kg'), ('Ragi Tempe', 5000, 'bungkus'), ('Cuka', 8000, 'liter'),
+              ('Garam', 3000, 'kg'), ('Minyak Goreng', 18000, 'liter'), ('Plastik Kemasan', 1000, 'pak')]
+
+# Bobot status pesanan: sebagian besar pesanan lama sudah selesai
+BOBOT_STATUS = {'Diproses': 5, 'Dikirim': 3, 'Selesai': 85, 'Dibatalkan': 7}
+
+
+def ukuran_default(pemesanan):
+    """Sizes of the other tables that keep a dataset of ``pemesanan`` orders realistic"""
+    return {
+        'pelanggan': max(20, pemesanan // 200),
+        'produk': len(PRODUK_JADI) + len(BAHAN_BAKU),
+        'produksi': max(10, pemesanan // 5),
+        'karyawan': 5,
+    }
+
+
+def _produk(jumlah, acak, sekarang):
+    dasar = [(nama, 'Produk Jadi', harga, 'buah') for nama, harga in PRODUK_JADI]
+    dasar += [(nama, 'Bahan Baku', harga, satuan) for nama, harga, satuan in BAHAN_BAKU]
+    daftar = []
+    for i in range(jumlah):
+        nama, jenis, harga, satuan = dasar[i % len(dasar)]
+        # Setelah daftar dasar habis, varian bernomor supaya katalog bisa diperbesar
+        putaran = i // len(dasar)
+        daftar.append(Produk(
+            namaProduk=f'{nama} {putaran + 1}' if putaran else nama, jenisProduk=jenis,
+            harga=harga, stok=acak.randint(500, 5000), satuan=satuan, diubah=sekarang
+        ))
+    return Produk.objects.bulk_create(daftar, batch_size=BATCH)
+
+
+def buat_data_sintetis(pemesanan, pelanggan, produk, produksi, karyawan, benih=42, hari=3 * 365, progres=None):
+    """
+    Seed a synthetic tofu/tempe shop with bulk_create across every core table.
+
+    Orders and production batches are spread over the last ``hari`` days,
+    each with one to four detail lines whose subtotals add up to the order
+    total. Bulk inserts skip the signals, so the stock ledger opening
+    balances, the daily rollup and the status counters are rebuilt at the
+    end, and production costs are computed batch by batch. ``progres`` is called with (tabel, jumlah) after every batch.
+    Returns {tabel: jumlah baris}.
+    """
+    acak = random.Random(benih)
+    sekarang = timezone.now()
+    hari_ini = timezone.localdate()
+    progres = progres or (lambda tabel, jumlah: None)
+    status = list(BOBOT_STATUS)
+    bobot = list(BOBOT_STATUS.values())
+    hasil = {}
+
+    with transaction.atomic():
+        karyawan_list = Karyawan.objects.bulk_create([
+            Karyawan(nama=f'Karyawan {i + 1}', username=f'{AWALAN}_kry_{i}', password='pbkdf2_sintetis')
+            for i in range(karyawan)
+        ], batch_size=BATCH)
+        pelanggan_list = Pelanggan.objects.bulk_create([
+            Pelanggan(namaPelanggan=f'Pelanggan {i + 1}', alamat=f'Jl. Sintetis {i + 1}, Kupang', noTelp='081200000000',
+                      username=f'{AWALAN}_plg_{i}', password='pbkdf2_sintetis')
+            for i in range(pelanggan)
+        ], batch_size=BATCH)
+        produk_list = _produk(produk, acak, sekarang)
+        hasil.update(karyawan=len(karyawan_list), pelanggan=len(pelanggan_list), produk=len(produk_list))
+
+        MutasiStok.objects.bulk_create([
+            MutasiStok(idProduk=item, jenisMutasi='Saldo Awal', jumlah=item.stok, keterangan='Data sintetis')
+            for item in produk_list
+        ], batch_size=BATCH)
+
+        jadi = [item for item in produk_list if item.jenisProduk == 'Produk Jadi']
+        bahan = [item for item in produk_list if item.jenisProduk == 'Bahan Baku']
+
+        hasil['pemesanan'] = hasil['detail_pemesanan'] = 0
+        for awal in range(0, pemesanan, BATCH):
+            baris = []
+            for _ in range(min(BATCH, pemesanan - awal)):
+                detail = [(item, acak.randint(1, 20)) for item in acak.sample(jadi, min(len(jadi), acak.randint(1, 4)))]
+                baris.append((Pemesanan(
+                    tanggalPemesanan=hari_ini - timedelta(days=acak.randint(0, hari)),
+                    totalPemesanan=sum(item.harga * n for item, n in detail),
+                    idPelanggan=acak.choice(pelanggan_list),
+                    status=acak.choices(status, weights=bobot)[0],
+                    alamatPengiriman='Kupang',
+                    ongkosKirim=acak.choice([0, 0, 5000, 10000]),
+                    diubah=sekarang,
+                ), detail))
+            dibuat = Pemesanan.objects.bulk_create([p for p, _ in baris])
+            details = DetailPemesanan.objects.bulk_create([
+                DetailPemesanan(idProduk=item, kuantiti=n, subTotal=item.harga * n, idKoleksiPemesanan=p)
+                for p, (_, detail) in zip(dibuat, baris) for item, n in detail
+            ])
+            hasil['pemesanan'] += len(dibuat)
+            hasil['detail_pemesanan'] += len(details)
+            progres('pemesanan', hasil['pemesanan'])
+
+        hasil['produksi'] = hasil['detail_produksi'] = 0
+        for awal in range(0, produksi, BATCH):
+            dibuat = Produksi.objects.bulk_create([
+                Produksi(
+                    tanggalProduksi=hari_ini - timedelta(days=acak.randint(0, hari)),
+                    jenisHasil=acak.choice(['Tahu', 'Tempe']), jumlahHasil=acak.randint(50, 500), satuanHasil='buah',
+                    idKaryawan=acak.choice(karyawan_list), diubah=sekarang,
+                )
+                for _ in range(min(BATCH, produksi - awal))
+            ])
+            details = DetailProduksi.objects.bulk_create([
+                DetailProduksi(idProduksi=p, idProduk=item, jumlahBahanTerpakai=acak.randint(1, 30))
+                for p in dibuat for item in acak.sample(bahan, min(len(bahan), acak.randint(1, 3)))
+            ])
+            perbarui_biaya([p.pk for p in dibuat])
+            hasil['produksi'] += len(dibuat)
+            hasil['detail_produksi'] += len(details)
+            progres('produksi', hasil['produksi'])
+
+        # bulk_create tidak memicu signal: rekap harian, penghitung status, katalog dan analitik disusun ulang di sini
+        rebuild_rekap()
+        rekonsiliasi_penghitung()
+        invalidasi_katalog()
+        invalidasi_analitik()
+    return hasil
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from .models import Produk
+from .versi_cache import aversi, naikkan_versi, versi
+
+
+# Berapa lama worker lain menunggu pembangun cache sebelum membaca database sendiri (detik)
+TUNGGU_BANGUN = 2.0
+
+# Kunci pembangun otomatis lepas setelah ini, untuk worker yang mati di tengah jalan (detik)
+BATAS_KUNCI = 30
+
+KUNCI_VERSI = 'katalog:versi'
+
+
+def _cache():
+    return caches['katalog']
+
+
+def _versi():
+    return versi(_cache(), KUNCI_VERSI)
+
+
+def invalidasi_katalog():
+    """
+    Drop every cached catalog list, once the current transaction commits.
+
+    Lists are stored under a version number, so bumping it also discards a
+    rebuild that was still running against the old data.
+    """
+    naikkan_versi(_cache(), KUNCI_VERSI)
+
+
+def _ambil_atau_bangun(kunci, bangun):
+    cache = _cache()
+    data = cache.get(kunci)
+    if data is not None:
+        return data
+
+    # Penjaga stampede: hanya pemegang kunci yang membangun ulang, yang lain menunggu hasilnya
+    kunci_bangun = f'{kunci}:bangun'
+    if cache.add(kunci_bangun, 1, timeout=BATAS_KUNCI):
+        try:
+            data = bangun()
+            cache.set(kunci, data)
+        finally:
+            cache.delete(kunci_bangun)
+        return data
+
+    batas = time.monotonic() + TUNGGU_BANGUN
+    while time.monotonic() < batas:
+        time.sleep(0.05)
+        data = cache.get(kunci)
+        if data is not None:
+            return data
+    return bangun()
+
+
+async def _aambil_atau_bangun(kunci, bangun):
+    # Sama dengan _ambil_atau_bangun, tetapi menunggu pembangun lain di event loop;
+    # hanya bangun() (query ORM) yang dijalankan di thread sinkron bersama
+    cache = _cache()
+    data = await cache.aget(kunci)
+    if data is not None:
+        return data
+
+    kunci_bangun = f'{kunci}:bangun'
+    if await cache.aadd(kunci_bangun, 1, timeout=BATAS_KUNCI):
+        try:
+            data = await sync_to_async(bangun)()
+            await cache.aset(kunci, data)
+        finally:
+            await cache.adelete(kunci_bangun)
+        return data
+
+    batas = time.monotonic() + TUNGGU_BANGUN
+    while time.monotonic() < batas:
+        await asyncio.sleep(0.05)
+        data = await cache.aget(kunci)
+        if data is not None:
+            return data
+    return await sync_to_async(bangun)()
+
+
+def _kunci_katalog(nomor, jenis):
+    return f"katalog:{nomor}:{jenis.replace(' ', '_')}"  # Spasi tidak aman untuk memcached
+
+
+def _query_tersedia(jenis):
+    return list(Produk.objects.filter(jenisProduk=jenis, stok__gt=0).order_by('namaProduk'))
+
+
+def produk_tersedia(jenis):
+    """Products of a type that are in stock, ordered by name, served from the catalog cache"""
+    kunci = _kunci_katalog(_versi(), jenis)
+    return _ambil_atau_bangun(kunci, lambda: _query_tersedia(jenis))
+
+
+async def aproduk_tersedia(jenis):
+    """Async variant of produk_tersedia; only the database query of a cache miss leaves the event loop"""
+    kunci = _kunci_katalog(await aversi(_cache(), KUNCI_VERSI), jenis)
+    return await _aambil_atau_bangun(kunci, lambda: _query_tersedia(jenis))
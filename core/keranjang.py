@@ -0,0 +1,155 @@
+from django.db.models import IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import Keranjang, KeranjangItem, Produk
+
+
+def pastikan_keranjang(pelanggan_id):
+    """Create the customer's cart header if it does not exist yet"""
+    Keranjang.objects.get_or_create(idPelanggan_id=pelanggan_id)
+
+
+def _upsert(pelanggan_id, baris, update_fields):
+    # Satu INSERT ... ON CONFLICT (keranjang, produk) DO UPDATE untuk semua baris
+    item = [
+        KeranjangItem(idKeranjang_id=pelanggan_id, idProduk_id=produk_id, kuantiti=kuantiti, hargaSnapshot=harga)
+        for produk_id, kuantiti, harga in baris
+    ]
+    KeranjangItem.objects.bulk_create(
+        item,
+        update_conflicts=True,
+        unique_fields=['idKeranjang', 'idProduk'],
+        update_fields=update_fields,
+    )
+
+
+def simpan_item(pelanggan_id, produk_id, kuantiti, harga):
+    """
+    Set the quantity of one cart line with a single upsert.
+
+    A new line snapshots ``harga``; an existing line keeps its original
+    snapshot and only gets the new quantity. The cart header must exist
+    (see pastikan_keranjang).
+    """
+    _upsert(pelanggan_id, [(produk_id, kuantiti, harga)], ['kuantiti'])
+
+
+def ubah_kuantiti(pelanggan_id, produk_id, kuantiti):
+    """Change the quantity of an existing line (one UPDATE); returns False if the line is missing"""
+    return bool(KeranjangItem.objects.filter(idKeranjang_id=pelanggan_id, idProduk_id=produk_id).update(kuantiti=kuantiti))
+
+
+def hapus_item(pelanggan_id, produk_id):
+    """Remove one line (one DELETE); returns False if the line is missing"""
+    dihapus, _ = KeranjangItem.objects.filter(idKeranjang_id=pelanggan_id, idProduk_id=produk_id).delete()
+    return bool(dihapus)
+
+
+def kosongkan_keranjang(pelanggan_id):
+    """Remove every line of the cart (one DELETE)"""
+    KeranjangItem.objects.filter(idKeranjang_id=pelanggan_id).delete()
+
+
+def produk_untuk_keranjang(pelanggan_id, produk_id):
+    """
+    A sellable product with ``di_keranjang`` (quantity already in the cart) annotated (one query).
+
+    Returns None if the product does not exist or is not a 'Produk Jadi'.
+    """
+    di_keranjang = KeranjangItem.objects.filter(
+        idKeranjang_id=pelanggan_id, idProduk=OuterRef('pk')
+    ).values('kuantiti')[:1]
+    return (
+        Produk.objects
+        .filter(idProduk=produk_id, jenisProduk='Produk Jadi')
+        .annotate(di_keranjang=Coalesce(Subquery(di_keranjang, output_field=IntegerField()), Value(0)))
+        .first()
+    )
+
+
+def item_keranjang(pelanggan_id):
+    """Cart lines with their products joined in (one query)"""
+    return (
+        KeranjangItem.objects
+        .filter(idKeranjang_id=pelanggan_id)
+        .select_related('idProduk')
+        .order_by('ditambahkan', 'idItem')
+    )
+
+
+def hitung_keranjang(pelanggan_id):
+    """
+    Price the whole cart against current product data (one query).
+
+    Every line is charged at the current price; lines whose price moved
+    since it was snapshotted, that exceed the current stock or whose
+    product is no longer sold are flagged so the views can warn before
+    checkout.
+    """
+    items = []
+    for item in item_keranjang(pelanggan_id):
+        produk = item.idProduk
+        items.append({
+            'produk_id': produk.idProduk,
+            'nama': produk.namaProduk,
+            'harga': produk.harga,
+            'harga_snapshot': item.hargaSnapshot,
+            'kuantiti': item.kuantiti,
+            'stok': produk.stok,
+            'subtotal': item.kuantiti * produk.harga,
+            'produk_obj': produk,
+            'harga_berubah': produk.harga != item.hargaSnapshot,
+            'stok_kurang': item.kuantiti > produk.stok,
+            'tidak_tersedia': produk.jenisProduk != 'Produk Jadi',
+        })
+
+    return {
+        'items': items,
+        'total': sum(item['subtotal'] for item in items),
+        'total_snapshot': sum(item['kuantiti'] * item['harga_snapshot'] for item in items),
+        'harga_berubah': any(item['harga_berubah'] for item in items),
+        'bisa_checkout': bool(items) and not any(item['stok_kurang'] or item['tidak_tersedia'] for item in items),
+    }
+
+
+def jumlah_item(pelanggan_id):
+    """Number of lines in the cart"""
+    return KeranjangItem.objects.filter(idKeranjang_id=pelanggan_id).count()
+
+
+async def ajumlah_item(pelanggan_id):
+    """Async variant of jumlah_item"""
+    return await KeranjangItem.objects.filter(idKeranjang_id=pelanggan_id).acount()
+
+
+def gabungkan_keranjang_sesi(pelanggan_id, cart_sesi):
+    """
+    Move a legacy session cart ({produk_id: {'kuantiti', 'harga', ...}}) into the database cart.
+
+    Quantities are added to lines already in the database and capped at the
+    current stock; products that no longer exist are dropped.
+    """
+    pastikan_keranjang(pelanggan_id)
+    if not cart_sesi:
+        return
+
+    kuantiti_sesi = {}
+    for produk_id, item in cart_sesi.items():
+        try:
+            kuantiti_sesi[int(produk_id)] = (int(item['kuantiti']), int(item['harga']))
+        except (KeyError, TypeError, ValueError):
+            continue
+
+    produk = Produk.objects.filter(idProduk__in=kuantiti_sesi, jenisProduk='Produk Jadi').only('idProduk', 'stok').in_bulk()
+    sudah_ada = dict(
+        KeranjangItem.objects.filter(idKeranjang_id=pelanggan_id, idProduk__in=produk).values_list('idProduk', 'kuantiti')
+    )
+
+    baris = []
+    for produk_id, (kuantiti, harga) in kuantiti_sesi.items():
+        if produk_id not in produk:
+            continue
+        total = min(kuantiti + sudah_ada.get(produk_id, 0), produk[produk_id].stok)
+        if total > 0:
+            baris.append((produk_id, total, harga))
+    if baris:
+        _upsert(pelanggan_id, baris, ['kuantiti'])
@@ -0,0 +1,152 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, Max, Prefetch, Subquery
+from django.utils.dateparse import parse_date
+from .models import Karyawan, Pelanggan, Produk, Produksi, DetailProduksi, Pemesanan
+from .snapshot import stok_per_tanggal
+
+
+# Ambang batas stok menipis untuk laporan produk
+STOK_MENIPIS_THRESHOLD = 10
+
+# Parameter filter yang dikenal per jenis laporan
+FILTER_LAPORAN = {
+    'penjualan': ('date_from', 'date_to', 'status'),
+    'produk': ('jenis_produk', 'stok_menipis', 'per_tanggal'),
+    'produksi': ('date_from', 'date_to', 'jenis_hasil'),
+}
+
+
+# Parameter filter bertipe tanggal, divalidasi sebelum sampai ke query
+FILTER_TANGGAL = ('date_from', 'date_to', 'per_tanggal')
+
+
+def baca_tanggal(nilai):
+    """Parse a YYYY-MM-DD filter value; ValidationError for malformed or impossible dates"""
+    if isinstance(nilai, date):
+        return nilai
+    try:
+        tanggal = parse_date(str(nilai).strip())
+    except ValueError:
+        # Format benar tapi tanggalnya tidak ada, mis. 2024-13-45
+        tanggal = None
+    if tanggal is None:
+        raise ValidationError(f'Format tanggal tidak valid: {nilai}')
+    return tanggal
+
+
+def ambil_filter(jenis, data):
+    """
+    Pick the known, non-empty filter parameters of a report from a QueryDict.
+
+    Date parameters are checked here, so a bad date surfaces as a
+    ValidationError the views turn into a 400 instead of failing mid-query.
+    """
+    filter_ = {nama: data.get(nama) for nama in FILTER_LAPORAN[jenis] if data.get(nama)}
+    for nama in FILTER_TANGGAL:
+        if nama in filter_:
+            baca_tanggal(filter_[nama])
+    return filter_
+
+
+def dataset_penjualan(date_from=None, date_to=None, status=None):
+    """Filtered Pemesanan rows with the customer name joined in (one query)"""
+    queryset = Pemesanan.objects.select_related('idPelanggan').only(
+        'idPemesanan', 'tanggalPemesanan', 'status', 'totalPemesanan',
+        'idPelanggan', 'idPelanggan__namaPelanggan'
+    )
+    if date_from:
+        queryset = queryset.filter(tanggalPemesanan__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(tanggalPemesanan__lte=date_to)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset.order_by('-tanggalPemesanan', '-idPemesanan')
+
+
+def dataset_produk(jenis_produk=None, stok_menipis=None, per_tanggal=None):
+    """
+    Filtered Produk rows with the reported stock as ``stok_laporan`` (one query).
+
+    Without ``per_tanggal`` that is the current stock; with it, the stock at
+    the end of that day, read from the daily snapshots (core/snapshot.py).
+    """
+    queryset = Produk.objects.only('idProduk', 'namaProduk', 'jenisProduk', 'harga', 'stok', 'satuan')
+    if jenis_produk:
+        queryset = queryset.filter(jenisProduk=jenis_produk)
+    if per_tanggal:
+        queryset = stok_per_tanggal(queryset, baca_tanggal(per_tanggal))
+    else:
+        queryset = queryset.annotate(stok_laporan=F('stok'))
+    if stok_menipis:
+        queryset = queryset.filter(stok_laporan__lt=STOK_MENIPIS_THRESHOLD)
+    return queryset.order_by('namaProduk')
+
+
+def dataset_produksi(date_from=None, date_to=None, jenis_hasil=None, dengan_bahan=False):
+    """
+    Filtered Produksi rows with the employee name joined in (one query).
+
+    With ``dengan_bahan`` the raw material lines and their products are
+    prefetched in one extra query.
+    """
+    queryset = Produksi.objects.select_related('idKaryawan').only(
+        'idProduksi', 'tanggalProduksi', 'jenisHasil', 'jumlahHasil', 'satuanHasil',
+        'biayaBahan', 'ringkasanBahan', 'idKaryawan', 'idKaryawan__nama'
+    )
+    if date_from:
+        queryset = queryset.filter(tanggalProduksi__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(tanggalProduksi__lte=date_to)
+    if jenis_hasil:
+        queryset = queryset.filter(jenisHasil=jenis_hasil)
+    if dengan_bahan:
+        queryset = queryset.prefetch_related(Prefetch(
+            'detailproduksi_set',
+            queryset=DetailProduksi.objects.select_related('idProduk').only(
+                'idDetail', 'idProduksi', 'jumlahBahanTerpakai',
+                'idProduk', 'idProduk__namaProduk', 'idProduk__jenisProduk',
+                'idProduk__harga', 'idProduk__satuan'
+            )
+        ))
+    return queryset.order_by('-tanggalProduksi', '-idProduksi')
+
+
+DATASET_LAPORAN = {
+    'penjualan': dataset_penjualan,
+    'produk': dataset_produk,
+    'produksi': dataset_produksi,
+}
+
+
+# Tabel sumber per jenis laporan, dipakai untuk stempel versi data
+MODEL_LAPORAN = {
+    'penjualan': Pemesanan,
+    'produk': Produk,
+    'produksi': Produksi,
+}
+
+# Tabel yang namanya ikut tercetak di laporan: mengganti nama juga harus mengganti versi
+MODEL_TERKAIT = {
+    'penjualan': (Pelanggan,),
+    'produk': (),
+    'produksi': (Karyawan,),
+}
+
+
+def versi_data(jenis):
+    """
+    Data version of a report (one query).
+
+    Latest ``diubah`` plus row count of its table, and the latest ``diubah``
+    of every table whose names the report prints, read as subqueries.
+    """
+    terkait = {
+        f'terkait_{i}': Max(Subquery(model.objects.order_by('-diubah').values('diubah')[:1]))
+        for i, model in enumerate(MODEL_TERKAIT[jenis])
+    }
+    hasil = MODEL_LAPORAN[jenis].objects.aggregate(terakhir=Max('diubah'), jumlah=Count('pk'), **terkait)
+    stempel = [hasil['terakhir']] + [hasil[nama] for nama in terkait]
+    # Jumlah baris ikut dihitung karena penghapusan tidak menaikkan Max('diubah')
+    return '/'.join([*(waktu.isoformat() if waktu else '' for waktu in stempel), str(hasil['jumlah'])])
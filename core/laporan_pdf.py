@@ -0,0 +1,183 @@
+# Try to import ReportLab
+try:
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+
+# Jumlah baris per tabel; satu tabel kira-kira muat satu halaman A4
+BARIS_PER_TABEL = 35
+
+# Lebar kolom tetap supaya semua potongan tabel sejajar (total 451pt = A4 - margin)
+KOLOM_PENJUALAN = [40, 75, 146, 80, 110]
+KOLOM_PRODUK = [140, 90, 90, 56, 75]
+KOLOM_PRODUKSI = [40, 100, 80, 90, 141]
+
+
+class _StoryBertahap(list):
+    """
+    Flowable list that is refilled from a generator while ReportLab consumes it.
+
+    doc.build() pops flowables from the front of the list, so only a small
+    lookahead of table chunks is ever held in memory.
+    """
+
+    def __init__(self, sumber):
+        super().__init__()
+        self._sumber = iter(sumber)
+
+    def _isi(self):
+        while self._sumber is not None and list.__len__(self) < 2:
+            try:
+                self.append(next(self._sumber))
+            except StopIteration:
+                self._sumber = None
+
+    def __len__(self):
+        self._isi()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._isi()
+        return list.__getitem__(self, index)
+
+
+def _tabel(header, baris, lebar_kolom):
+    table = Table([header] + baris, colWidths=lebar_kolom, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    return table
+
+
+def _flowables(judul, filter_text, header, baris, lebar_kolom):
+    styles = getSampleStyleSheet()
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=1  # Center alignment
+    )
+    yield Paragraph(judul, title_style)
+    yield Spacer(1, 12)
+    yield Paragraph(filter_text, styles['Normal'])
+    yield Spacer(1, 12)
+
+    # Table data, dipotong per halaman
+    potongan = []
+    ada_tabel = False
+    for row in baris:
+        potongan.append(row)
+        if len(potongan) == BARIS_PER_TABEL:
+            yield _tabel(header, potongan, lebar_kolom)
+            ada_tabel = True
+            potongan = []
+    if potongan or not ada_tabel:
+        yield _tabel(header, potongan, lebar_kolom)
+
+
+def tulis_pdf(berkas, judul, filter_text, header, baris, lebar_kolom):
+    """Write a report to a file-like object, consuming ``baris`` lazily"""
+    doc = SimpleDocTemplate(berkas, pagesize=A4, pageCompression=1)
+    doc.build(_StoryBertahap(_flowables(judul, filter_text, header, baris, lebar_kolom)))
+
+
+def _filter_tanggal(date_from, date_to):
+    if date_from and date_to:
+        return f"Tanggal {date_from} sampai {date_to}"
+    elif date_from:
+        return f"Tanggal mulai dari {date_from}"
+    elif date_to:
+        return f"Tanggal sampai {date_to}"
+    return "Semua tanggal"
+
+
+def tulis_laporan_penjualan(berkas, pemesanan_list, date_from=None, date_to=None, status=None):
+    filter_text = "Filter: " + _filter_tanggal(date_from, date_to)
+    if status:
+        filter_text += f", Status: {status}"
+
+    baris = (
+        [
+            str(pemesanan.idPemesanan),
+            pemesanan.tanggalPemesanan.strftime('%d/%m/%Y'),
+            pemesanan.idPelanggan.namaPelanggan,
+            pemesanan.status,
+            f"Rp {pemesanan.totalPemesanan:,}"
+        ]
+        for pemesanan in pemesanan_list.iterator(chunk_size=2000)
+    )
+    tulis_pdf(berkas, "Laporan Penjualan", filter_text,
+              ['ID', 'Tanggal', 'Pelanggan', 'Status', 'Total'], baris, KOLOM_PENJUALAN)
+
+
+def tulis_laporan_produk(berkas, produk_list, jenis_produk=None, stok_menipis=None, per_tanggal=None):
+    filter_text = "Filter: "
+    if jenis_produk:
+        filter_text += f"Jenis Produk: {jenis_produk}"
+    else:
+        filter_text += "Semua jenis produk"
+    if stok_menipis:
+        filter_text += ", Stok Menipis: Ya"
+    if per_tanggal:
+        filter_text += f", Stok per Tanggal: {per_tanggal}"
+
+    baris = (
+        [
+            produk.namaProduk,
+            produk.jenisProduk,
+            f"Rp {produk.harga:,}",
+            str(produk.stok_laporan),
+            produk.satuan
+        ]
+        for produk in produk_list.iterator(chunk_size=2000)
+    )
+    tulis_pdf(berkas, "Laporan Produk", filter_text,
+              ['Nama Produk', 'Jenis', 'Harga', 'Stok', 'Satuan'], baris, KOLOM_PRODUK)
+
+
+def tulis_laporan_produksi(berkas, produksi_list, date_from=None, date_to=None, jenis_hasil=None):
+    filter_text = "Filter: " + _filter_tanggal(date_from, date_to)
+    if jenis_hasil:
+        filter_text += f", Jenis Hasil: {jenis_hasil}"
+
+    baris = (
+        [
+            str(produksi.idProduksi),
+            produksi.tanggalProduksi.strftime('%d/%m/%Y'),
+            produksi.jenisHasil,
+            str(produksi.jumlahHasil),
+            produksi.idKaryawan.nama
+        ]
+        for produksi in produksi_list.iterator(chunk_size=2000)
+    )
+    tulis_pdf(berkas, "Laporan Produksi", filter_text,
+              ['ID', 'Tanggal Produksi', 'Jenis Hasil', 'Jumlah Hasil', 'Karyawan'], baris, KOLOM_PRODUKSI)
+
+
+# Fungsi render dan nama file per jenis laporan (dipakai view PDF dan antrian)
+TULIS_LAPORAN = {
+    'penjualan': tulis_laporan_penjualan,
+    'produk': tulis_laporan_produk,
+    'produksi': tulis_laporan_produksi,
+}
+
+NAMA_BERKAS = {
+    'penjualan': 'laporan_penjualan.pdf',
+    'produk': 'laporan_produk.pdf',
+    'produksi': 'laporan_produksi.pdf',
+}
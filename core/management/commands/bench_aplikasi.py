@@ -0,0 +1,256 @@
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from core.analitik import RENTANG_MAKSIMUM
+from core.antrian import render_laporan
+from core.keranjang import kosongkan_keranjang, pastikan_keranjang, simpan_item
+from core.models import Karyawan, Pelanggan, Produk
+
+
+SKALA = [10_000, 100_000, 1_000_000]
+
+# Selisih median yang masih dianggap noise saat membandingkan dengan hasil sebelumnya
+TOLERANSI = 0.25
+
+
+def _png():
+    isi = io.BytesIO()
+    Image.new('RGB', (400, 300), (200, 180, 120)).save(isi, 'PNG')
+    return isi.getvalue()
+
+
+class _Skenario:
+    """Logged-in clients and fixtures shared by every scenario of one run"""
+
+    def __init__(self, hari_laporan):
+        hari_ini = timezone.localdate()
+        self.rentang = {'date_from': str(hari_ini - timedelta(days=hari_laporan)), 'date_to': str(hari_ini)}
+        # Rentang terpanjang halaman analitik (RENTANG_MAKSIMUM), diukur tanpa cache
+        self.rentang_tahun = {'date_from': str(hari_ini - timedelta(days=RENTANG_MAKSIMUM - 1)), 'date_to': str(hari_ini)}
+        self.png = _png()
+
+        admin = User.objects.filter(username='bench_admin').first() or User.objects.create_superuser(
+            'bench_admin', 'bench@example.com', 'bench'
+        )
+        self.admin = Client()
+        self.admin.force_login(admin)
+
+        self.pelanggan = Pelanggan.objects.order_by('pk').first()
+        pastikan_keranjang(self.pelanggan.pk)
+        self.klien = Client()
+        session = self.klien.session
+        session.update({'pelanggan_id': self.pelanggan.pk, 'keranjang_siap': True})
+        session.save()
+
+        self.karyawan = Karyawan.objects.order_by('pk').first()
+        self.staf = Client()
+        session = self.staf.session
+        session['karyawan_id'] = self.karyawan.pk
+        session.save()
+
+        # Produk dengan stok terbanyak supaya checkout dan produksi berulang tidak kehabisan stok
+        self.jadi = list(Produk.objects.filter(jenisProduk='Produk Jadi').order_by('-stok')[:3])
+        self.bahan = list(Produk.objects.filter(jenisProduk='Bahan Baku').order_by('-stok')[:2])
+        Produk.objects.filter(pk__in=[p.pk for p in self.jadi + self.bahan]).update(stok=10_000_000)
+
+    def _isi_keranjang(self):
+        kosongkan_keranjang(self.pelanggan.pk)
+        for produk in self.jadi:
+            simpan_item(self.pelanggan.pk, produk.pk, 1, produk.harga)
+
+    def _kosongkan_cache(self):
+        caches['statistik'].clear()
+
+    def daftar(self):
+        """(nama, persiapan, aksi); persiapan tidak ikut diukur"""
+        tanpa = lambda: None  # noqa: E731
+        total = sum(p.harga for p in self.jadi)
+        return [
+            ('dashboard admin', tanpa, lambda: self.admin.get(reverse('core:admin_dashboard'))),
+            ('dashboard karyawan', tanpa, lambda: self.staf.get(reverse('core:karyawan_dashboard'))),
+            ('laporan penjualan', tanpa, lambda: render_laporan('penjualan', self.rentang, io.BytesIO())),
+            ('laporan produk', tanpa, lambda: render_laporan('produk', {}, io.BytesIO())),
+            ('laporan produksi', tanpa, lambda: render_laporan('produksi', self.rentang, io.BytesIO())),
+            ('analitik', self._kosongkan_cache, lambda: self.admin.get(
+                reverse('core:analitik_penjualan_json'), self.rentang)),
+            ('analitik 1 tahun', self._kosongkan_cache, lambda: self.admin.get(
+                reverse('core:analitik_penjualan_json'), self.rentang_tahun)),
+            ('analitik (cache)', tanpa, lambda: self.admin.get(reverse('core:analitik_penjualan_json'), self.rentang)),
+            ('keranjang lihat', self._isi_keranjang, lambda: self.klien.get(reverse('pelanggan_keranjang_view'))),
+            ('keranjang tambah', tanpa, lambda: self.klien.post(
+                reverse('pelanggan_keranjang_add'), {'produk_id': self.jadi[0].pk, 'kuantiti': 1})),
+            ('keranjang ubah', self._isi_keranjang, lambda: self.klien.post(
+                reverse('pelanggan_keranjang_update'), {'produk_id': self.jadi[0].pk, 'kuantiti': 2})),
+            ('checkout', self._isi_keranjang, lambda: self.klien.post(reverse('pelanggan_checkout'), {
+                'alamat_pengiriman': 'Kupang', 'total_dikonfirmasi': str(total),
+                'bukti_bayar': SimpleUploadedFile('bukti.png', self.png),
+            })),
+            ('input produksi', tanpa, lambda: self.staf.post(reverse('core:karyawan_produksi_input'), {
+                'tanggalProduksi': str(timezone.localdate()), 'jenisHasil': 'Tahu', 'jumlahHasil': 100,
+                'satuanHasil': 'buah', 'keterangan': 'bench',
+                'idProduk[]': [p.pk for p in self.bahan], 'jumlahBahanTerpakai[]': [1] * len(self.bahan),
+            })),
+        ]
+
+
+def _ukur(persiapan, aksi, ulang):
+    query = []
+
+    def hitung(execute, sql, params, many, context):
+        query.append(sql)
+        return execute(sql, params, many, context)
+
+    # execute_wrapper, bukan CaptureQueriesContext: request_started mengosongkan connection.queries
+    persiapan()
+    with connection.execute_wrapper(hitung):
+        respons = aksi()  # Pemanasan, sekaligus jumlah query
+    status = getattr(respons, 'status_code', None)
+    if status is not None and status >= 400:
+        raise CommandError(f'Respons {status}')
+
+    durasi = []
+    for _ in range(ulang):
+        persiapan()
+        mulai = time.perf_counter()
+        aksi()
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    durasi.sort()
+    return {
+        'median_ms': round(statistics.median(durasi), 3),
+        'p95_ms': round(durasi[min(len(durasi) - 1, int(len(durasi) * 0.95))], 3),
+        'min_ms': round(durasi[0], 3),
+        'query': len(query),
+    }
+
+
+def _jalankan_skenario(ulang, hari_laporan, pilihan):
+    with tempfile.TemporaryDirectory() as media, override_settings(
+        MEDIA_ROOT=media, ALLOWED_HOSTS=['testserver'], DEBUG=False
+    ):
+        skenario = _Skenario(hari_laporan)
+        return {
+            nama: _ukur(persiapan, aksi, ulang)
+            for nama, persiapan, aksi in skenario.daftar()
+            if not pilihan or nama in pilihan
+        }
+
+
+def _versi_kode():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark dashboard, laporan, keranjang, checkout dan input produksi pada beberapa skala data sintetis '
+        '(default 10 ribu / 100 ribu / 1 juta pemesanan). Tiap skala memakai database sementara; hasil ditulis '
+        'sebagai JSON dan bisa dibandingkan dengan hasil sebelumnya (--banding).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skala', type=int, nargs='+', default=SKALA, help='Jumlah pemesanan per skala')
+        parser.add_argument('--ulang', type=int, default=10, help='Pengulangan per skenario')
+        parser.add_argument('--hari-laporan', type=int, default=30, help='Rentang tanggal laporan penjualan/produksi')
+        parser.add_argument('--skenario', nargs='+', help='Hanya jalankan skenario ini (nama seperti di output)')
+        parser.add_argument('--keluaran', default=os.path.join(settings.BASE_DIR, 'cache', 'bench', 'bench_aplikasi.json'))
+        parser.add_argument('--banding', help='File hasil sebelumnya; gagal bila ada skenario yang lebih lambat')
+        parser.add_argument('--toleransi', type=float, default=TOLERANSI)
+        parser.add_argument('--ukur', action='store_true', help='(internal) ukur database saat ini, JSON ke stdout')
+
+    def handle(self, *args, **options):
+        if options['ukur']:
+            hasil = _jalankan_skenario(options['ulang'], options['hari_laporan'], options['skenario'])
+            self.stdout.write(json.dumps(hasil))
+            return
+
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        hasil = {
+            'meta': {
+                'waktu': timezone.now().isoformat(),
+                'commit': _versi_kode(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'ulang': options['ulang'],
+                'hari_laporan': options['hari_laporan'],
+            },
+            'skala': {},
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            for skala in options['skala']:
+                db = os.path.join(folder, f'{skala}.sqlite3')
+                env = {
+                    **os.environ, 'SQLITE_PATH': db, 'KATALOG_CACHE_LOCATION': os.path.join(folder, f'katalog_{skala}'),
+                }
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{skala} pemesanan'))
+                subprocess.run([sys.executable, manage, 'migrate', '-v0'], env=env, check=True)
+                mulai = time.perf_counter()
+                subprocess.run([sys.executable, manage, 'buat_data_sintetis', '--pemesanan', str(skala)],
+                               env=env, check=True, stdout=subprocess.DEVNULL)
+                self.stdout.write(f'  seed {time.perf_counter() - mulai:.1f} detik')
+
+                perintah = [sys.executable, manage, 'bench_aplikasi', '--ukur', '--ulang', str(options['ulang']),
+                            '--hari-laporan', str(options['hari_laporan'])]
+                if options['skenario']:
+                    perintah += ['--skenario', *options['skenario']]
+                keluaran = subprocess.run(perintah, env=env, check=True, capture_output=True, text=True).stdout
+                hasil['skala'][str(skala)] = per_skenario = json.loads(keluaran.strip().splitlines()[-1])
+                for nama, data in per_skenario.items():
+                    self.stdout.write(
+                        f"  {nama:<20} median {data['median_ms']:9.2f} ms  p95 {data['p95_ms']:9.2f} ms  "
+                        f"{data['query']:4} query"
+                    )
+                os.remove(db)
+
+        os.makedirs(os.path.dirname(os.path.abspath(options['keluaran'])), exist_ok=True)
+        with open(options['keluaran'], 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Hasil ditulis ke {options['keluaran']}"))
+
+        if options['banding']:
+            self._banding(options['banding'], hasil, options['toleransi'])
+
+    def _banding(self, path, hasil, toleransi):
+        with open(path, encoding='utf-8') as f:
+            lama = json.load(f)
+
+        regresi = []
+        for skala, per_skenario in hasil['skala'].items():
+            for nama, data in per_skenario.items():
+                sebelum = lama.get('skala', {}).get(skala, {}).get(nama)
+                if not sebelum:
+                    continue
+                rasio = data['median_ms'] / sebelum['median_ms'] if sebelum['median_ms'] else 1
+                baris = f"{skala:>8} {nama:<20} {rasio:5.2f}x  query {sebelum['query']} -> {data['query']}"
+                if rasio > 1 + toleransi or data['query'] > sebelum['query']:
+                    regresi.append(baris)
+                    self.stdout.write(self.style.ERROR(baris))
+                else:
+                    self.stdout.write(baris)
+        if regresi:
+            raise CommandError(f'{len(regresi)} skenario lebih lambat dari {path} (toleransi {toleransi:.0%}).')
+        self.stdout.write(self.style.SUCCESS(f'Tidak ada regresi dibanding {path}.'))
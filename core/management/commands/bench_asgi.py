@@ -0,0 +1,127 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import shutil
+import time
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from .bench_wsgi import PROFIL, _klien, _port_bebas, sesi_bench
+
+
+HALAMAN = ['/produk/', '/beranda/', '/pesanan/riwayat/']
+
+
+def _layani_asgi(port, worker):
+    # uvicorn dengan N proses worker, masing-masing menjalankan asgi.py
+    import uvicorn
+
+    session_key = sesi_bench()
+    connections.close_all()
+    print(f'SIAP {session_key}', flush=True)
+    uvicorn.run(
+        'arlinSkripsi.asgi:application', host='127.0.0.1', port=port, workers=worker,
+        lifespan='off', log_level='warning', access_log=False, backlog=512,
+    )
+
+
+def _tunggu_port(port, batas=30):
+    # uvicorn baru membuka port setelah semua worker selesai import
+    sampai = time.monotonic() + batas
+    while time.monotonic() < sampai:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError('Server bench tidak membuka port.')
+
+
+class Command(BaseCommand):
+    help = (
+        'Bandingkan latensi halaman pelanggan (view async) di bawah WSGI (worker pre-fork, bench_wsgi) dan '
+        'ASGI (uvicorn) dengan jumlah worker dan klien bersamaan yang sama. Membutuhkan uvicorn.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker', type=int, default=2, help='Jumlah proses worker per server')
+        parser.add_argument('--klien', type=int, default=32, help='Jumlah proses klien bersamaan')
+        parser.add_argument('--durasi', type=float, default=8, help='Lama pengukuran per halaman (detik)')
+        parser.add_argument('--path', nargs='+', default=HALAMAN, help='URL yang diuji')
+        parser.add_argument('--profil', choices=sorted(PROFIL), default='produksi')
+        parser.add_argument('--layani', type=int, help='(internal) jalankan uvicorn pada port ini')
+
+    def handle(self, *args, **options):
+        if options['layani']:
+            _layani_asgi(options['layani'], options['worker'])
+            return
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise CommandError('uvicorn belum terpasang: pip install uvicorn')
+
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        with tempfile.TemporaryDirectory() as folder:
+            db = os.path.join(folder, 'db.sqlite3')
+            shutil.copyfile(settings.DATABASES['default']['NAME'], db)
+            env = {
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': PROFIL[options['profil']],
+                'SQLITE_PATH': db,
+                'DJANGO_SECRET_KEY': 'bench-asgi',
+                'DJANGO_ALLOWED_HOSTS': '127.0.0.1,localhost',
+                'DJANGO_STATIC_ROOT': os.path.join(folder, 'static'),
+                'KATALOG_CACHE_LOCATION': os.path.join(folder, 'katalog'),
+                # Koneksi persisten tidak ditutup oleh thread pool ASGI (lihat settings_produksi)
+                'DB_CONN_MAX_AGE': '0',
+            }
+            subprocess.run([sys.executable, manage, 'migrate', '-v0'], env=env, check=True)
+            if options['profil'] == 'produksi':
+                subprocess.run([sys.executable, manage, 'collectstatic', '--noinput', '-v0'], env=env, check=True)
+
+            server = {
+                'wsgi': ['bench_wsgi', '--layani'],
+                'asgi': ['bench_asgi', '--layani'],
+            }
+            for path in options['path']:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{path} ({options['klien']} klien, {options['worker']} worker)"))
+                for nama, perintah in server.items():
+                    rps, p50, p95, gagal = self._ukur(manage, perintah, env, path, options)
+                    self.stdout.write(
+                        f'  {nama}: {rps:7.1f} req/detik, p50 {p50:7.1f} ms, p95 {p95:7.1f} ms, gagal {gagal}'
+                    )
+
+    def _ukur(self, manage, perintah, env, path, options):
+        port = _port_bebas()
+        server = subprocess.Popen(
+            [sys.executable, manage, *perintah, str(port), '--worker', str(options['worker'])],
+            env=env, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            baris = server.stdout.readline().split()
+            if not baris or baris[0] != 'SIAP':
+                raise CommandError('Server bench gagal dijalankan.')
+            cookie = baris[1]
+            _tunggu_port(port)
+
+            with Pool(options['klien']) as pool:
+                # Pemanasan: template, cache katalog dan koneksi pertama tiap worker tidak ikut diukur
+                pool.map(_klien, [(port, path, cookie, time.monotonic() + 1)] * options['klien'])
+                mulai = time.monotonic()
+                per_klien = pool.map(_klien, [(port, path, cookie, mulai + options['durasi'])] * options['klien'])
+                durasi = time.monotonic() - mulai
+        finally:
+            server.terminate()
+            server.wait()
+
+        latensi = sorted(d for hasil, _ in per_klien for d in hasil)
+        gagal = sum(g for _, g in per_klien)
+        if not latensi:
+            return 0, 0, 0, gagal
+        p50 = latensi[len(latensi) // 2]
+        p95 = latensi[min(len(latensi) - 1, int(len(latensi) * 0.95))]
+        return len(latensi) / durasi, p50 * 1000, p95 * 1000, gagal
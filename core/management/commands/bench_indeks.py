@@ -0,0 +1,144 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from core.laporan import dataset_penjualan, dataset_produksi
+from core.models import Karyawan, Pelanggan, Pemesanan, Produk, Produksi
+
+
+MODEL_BERINDEKS = (Pemesanan, Produk, Produksi)
+
+BATCH = 5000
+
+
+def _seed(pemesanan, pelanggan, produk, produksi, karyawan, stdout):
+    # Data sintetis; dipanggil di dalam transaksi yang akhirnya di-rollback
+    acak = random.Random(42)
+    sekarang = timezone.now()
+    hari_ini = date.today()
+    status = [s for s, _ in Pemesanan.STATUS_CHOICES]
+
+    pelanggan_list = Pelanggan.objects.bulk_create([
+        Pelanggan(namaPelanggan=f'Bench {i}', alamat='Kupang', noTelp='0812', username=f'bench_plg_{i}', password='pbkdf2_x')
+        for i in range(pelanggan)
+    ], batch_size=BATCH)
+    karyawan_list = Karyawan.objects.bulk_create([
+        Karyawan(nama=f'Bench {i}', username=f'bench_kry_{i}', password='pbkdf2_x')
+        for i in range(karyawan)
+    ], batch_size=BATCH)
+    Produk.objects.bulk_create([
+        Produk(namaProduk=f'Bench {i}', jenisProduk=acak.choice(['Bahan Baku', 'Produk Jadi']),
+               harga=acak.randrange(1000, 50000, 500), stok=acak.randint(0, 500), satuan='buah', diubah=sekarang)
+        for i in range(produk)
+    ], batch_size=BATCH)
+
+    for awal in range(0, produksi, BATCH):
+        Produksi.objects.bulk_create([
+            Produksi(tanggalProduksi=hari_ini - timedelta(days=acak.randint(0, 1095)),
+                     jenisHasil=acak.choice(['Tahu', 'Tempe']), jumlahHasil=acak.randint(10, 200), satuanHasil='buah',
+                     idKaryawan=acak.choice(karyawan_list), diubah=sekarang)
+            for _ in range(min(BATCH, produksi - awal))
+        ])
+
+    for awal in range(0, pemesanan, BATCH):
+        Pemesanan.objects.bulk_create([
+            Pemesanan(tanggalPemesanan=hari_ini - timedelta(days=acak.randint(0, 1095)),
+                      totalPemesanan=acak.randrange(5000, 500000, 500), idPelanggan=acak.choice(pelanggan_list),
+                      status=acak.choices(status, weights=[5, 3, 85, 7])[0], diubah=sekarang)
+            for _ in range(min(BATCH, pemesanan - awal))
+        ])
+        if (awal // BATCH) % 20 == 19:
+            stdout.write(f'  {awal + BATCH} pemesanan...')
+
+    return pelanggan_list[len(pelanggan_list) // 2], karyawan_list[0]
+
+
+def _query_panas(pelanggan, karyawan):
+    # Pola akses yang dipakai view (nama, queryset)
+    hari_ini = date.today()
+    return [
+        ('badge pesanan perhatian', Pemesanan.objects.filter(status__in=['Diproses', 'Dikirim']).values('pk')),
+        ('laporan penjualan 30 hari', dataset_penjualan(date_from=hari_ini - timedelta(days=30), date_to=hari_ini)[:200]),
+        ('laporan penjualan status', dataset_penjualan(date_from=hari_ini - timedelta(days=90), status='Dibatalkan')[:200]),
+        ('riwayat pelanggan', Pemesanan.objects.filter(idPelanggan=pelanggan).order_by('-tanggalPemesanan', '-idPemesanan')[:20]),
+        ('notifikasi pelanggan', Pemesanan.objects.filter(
+            idPelanggan=pelanggan, ongkosKirim__gt=0, status__in=['Diproses', 'Menunggu Pembayaran'])),
+        ('katalog produk jadi', Produk.objects.filter(jenisProduk='Produk Jadi', stok__gt=0).order_by('namaProduk')),
+        ('stok menipis', Produk.objects.filter(stok__lt=10).order_by('namaProduk')),
+        ('produksi terbaru karyawan', Produksi.objects.filter(idKaryawan=karyawan).order_by('-tanggalProduksi')[:10]),
+        ('produksi tahu karyawan', Produksi.objects.filter(idKaryawan=karyawan, jenisHasil='Tahu').values('pk')),
+        ('laporan produksi tempe', dataset_produksi(date_from=hari_ini - timedelta(days=30), jenis_hasil='Tempe')[:200]),
+    ]
+
+
+def _ukur(queryset, ulang):
+    durasi = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        list(queryset.all())
+        durasi.append(time.perf_counter() - mulai)
+    return statistics.median(durasi) * 1000
+
+
+def _rencana(queryset):
+    # Satu baris ringkas per langkah rencana
+    return ' | '.join(baris.strip() for baris in queryset.explain().splitlines() if baris.strip())
+
+
+def _atur_indeks(aktif):
+    # Schema editor hanya dipakai untuk membangun SQL; __enter__ SQLite menolak dipakai di dalam transaksi
+    editor = connection.schema_editor(collect_sql=True)
+    editor.deferred_sql = []
+    with connection.cursor() as cursor:
+        for model in MODEL_BERINDEKS:
+            for index in model._meta.indexes:
+                sql = index.create_sql(model, editor) if aktif else index.remove_sql(model, editor)
+                cursor.execute(str(sql))
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed data sintetis (default 1 juta pemesanan), lalu bandingkan rencana query dan waktu query '
+        'panas tanpa dan dengan indeks komposit. Semua perubahan di-rollback.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pemesanan', type=int, default=1_000_000)
+        parser.add_argument('--pelanggan', type=int, default=5000)
+        parser.add_argument('--produk', type=int, default=20000)
+        parser.add_argument('--produksi', type=int, default=200_000)
+        parser.add_argument('--karyawan', type=int, default=20)
+        parser.add_argument('--ulang', type=int, default=5, help='Jumlah pengulangan per query (median)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['pemesanan']} pemesanan...")
+            mulai = time.perf_counter()
+            pelanggan, karyawan = _seed(
+                options['pemesanan'], options['pelanggan'], options['produk'],
+                options['produksi'], options['karyawan'], self.stdout
+            )
+            self.stdout.write(f'Seed selesai dalam {time.perf_counter() - mulai:.1f} detik.')
+
+            hasil = {}
+            # Indeks dari migrasi dilepas dulu, lalu dipasang lagi
+            for aktif, label in ((False, 'tanpa indeks'), (True, 'dengan indeks')):
+                _atur_indeks(aktif)
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+                for nama, queryset in _query_panas(pelanggan, karyawan):
+                    hasil.setdefault(nama, {})[label] = (_ukur(queryset, options['ulang']), _rencana(queryset))
+
+            for nama, per_label in hasil.items():
+                sebelum, rencana_sebelum = per_label['tanpa indeks']
+                sesudah, rencana_sesudah = per_label['dengan indeks']
+                self.stdout.write(self.style.MIGRATE_HEADING(nama))
+                self.stdout.write(f'  tanpa indeks : {sebelum:9.2f} ms  {rencana_sebelum}')
+                self.stdout.write(f'  dengan indeks: {sesudah:9.2f} ms  {rencana_sesudah}')
+
+            # Data seed dan perubahan indeks dibuang
+            transaction.set_rollback(True)
@@ -0,0 +1,67 @@
+import io
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from core.laporan_pdf import REPORTLAB_AVAILABLE, KOLOM_PENJUALAN, tulis_pdf
+
+
+HEADER = ['ID', 'Tanggal', 'Pelanggan', 'Status', 'Total']
+
+
+def _baris_sintetis(n):
+    for i in range(n):
+        yield [str(i + 1), '03/12/2025', f'Pelanggan {i % 500}', 'Selesai', f"Rp {(i % 97) * 2500:,}"]
+
+
+def _tulis_satu_tabel(berkas, n):
+    # Cara lama: seluruh story dan satu Table raksasa dibangun di memori
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+
+    doc = SimpleDocTemplate(berkas, pagesize=A4)
+    table = Table([HEADER] + list(_baris_sintetis(n)))
+    table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 1, colors.black)]))
+    doc.build([Paragraph("Laporan Penjualan", getSampleStyleSheet()['Heading1']), table])
+
+
+def _tulis_bertahap(berkas, n):
+    tulis_pdf(berkas, "Laporan Penjualan", "Filter: Semua tanggal", HEADER, _baris_sintetis(n), KOLOM_PENJUALAN)
+
+
+def _ukur(fungsi, n):
+    berkas = io.BytesIO()
+    tracemalloc.start()
+    mulai = time.perf_counter()
+    fungsi(berkas, n)
+    durasi = time.perf_counter() - mulai
+    _, puncak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Ukuran PDF jadi tidak dihitung sebagai memori render
+    return durasi, puncak - berkas.getbuffer().nbytes, berkas.getbuffer().nbytes
+
+
+class Command(BaseCommand):
+    help = 'Ukur waktu dan puncak memori render PDF laporan untuk beberapa jumlah baris'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baris', type=int, nargs='+', default=[1000, 5000, 20000, 100000])
+        parser.add_argument('--bandingkan', action='store_true',
+                            help='Ikut ukur cara lama (satu Table raksasa), lambat untuk baris besar')
+
+    def handle(self, *args, **options):
+        if not REPORTLAB_AVAILABLE:
+            raise CommandError('ReportLab is not installed.')
+
+        self.stdout.write(f"{'metode':<12}{'baris':>10}{'detik':>10}{'puncak MB':>12}{'PDF MB':>10}")
+        for n in options['baris']:
+            metode = [('bertahap', _tulis_bertahap)]
+            if options['bandingkan']:
+                metode.insert(0, ('satu tabel', _tulis_satu_tabel))
+            for nama, fungsi in metode:
+                durasi, puncak, ukuran = _ukur(fungsi, n)
+                self.stdout.write(
+                    f"{nama:<12}{n:>10}{durasi:>10.2f}{puncak / 2**20:>12.1f}{ukuran / 2**20:>10.1f}"
+                )
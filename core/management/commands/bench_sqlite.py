@@ -0,0 +1,178 @@
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.utils import timezone
+from core import basisdata
+from core.models import Karyawan, Pelanggan, Pemesanan, Produk
+from core.penghitung import jumlah_pemesanan_per_status
+from core.stok import StokTidakCukup, tambah_stok
+from core.transaksi import simpan_pemesanan
+
+
+PRODUK_BENCH = 'Bench SQLite'
+
+
+def _atur_mode(mode):
+    # 'bawaan': koneksi SQLite tanpa PRAGMA tambahan dan transaksi DEFERRED (perilaku Django default)
+    koneksi = connections['default']
+    koneksi.close()
+    if mode == 'bawaan':
+        basisdata.PRAGMA_SQLITE = {}
+        basisdata.MODE_TRANSAKSI_TULIS = None
+
+
+def _siapkan():
+    pelanggan = Pelanggan.objects.create(
+        namaPelanggan='Bench', alamat='Kupang', noTelp='0812', username='bench_sqlite', password='pbkdf2_x'
+    )
+    Karyawan.objects.get_or_create(username='bench_sqlite', defaults={'nama': 'Bench', 'password': 'pbkdf2_x'})
+    for i in range(20):
+        Produk.objects.create(
+            namaProduk=f'{PRODUK_BENCH} {i}', jenisProduk='Produk Jadi', harga=2000, stok=1_000_000, satuan='buah'
+        )
+    for _ in range(200):
+        Pemesanan.objects.create(idPelanggan=pelanggan, tanggalPemesanan=timezone.localdate(), totalPemesanan=2000)
+
+
+def _checkout(acak, pelanggan, produk):
+    with basisdata.transaksi_tulis():
+        simpan_pemesanan(
+            Pemesanan(idPelanggan=pelanggan, tanggalPemesanan=timezone.localdate(), alamatPengiriman='Kupang'),
+            [(produk_id, acak.randint(1, 3), harga) for produk_id, harga in acak.sample(produk, 2)]
+        )
+
+
+def _admin(acak, pelanggan, produk):
+    # Pola POST PemesananAdmin (dibungkus transaksi_tulis oleh CustomAdminSite): baca dulu, lalu tulis
+    with basisdata.transaksi_tulis():
+        jumlah_pemesanan_per_status()
+        pemesanan = (
+            Pemesanan.objects.filter(idPelanggan=pelanggan, status='Diproses')
+            .order_by('-idPemesanan')[acak.randint(0, 20):][:1].first()
+        )
+        if pemesanan:
+            pemesanan.status = acak.choice(['Dikirim', 'Selesai'])
+            pemesanan.save()
+        if acak.random() < 0.2:
+            tambah_stok({acak.choice(produk)[0]: 5}, 'Penyesuaian', keterangan='bench')
+
+
+PERAN = {'checkout': _checkout, 'admin': _admin}
+
+
+def _jalankan_peran(peran, mode, mulai, durasi, benih):
+    _atur_mode(mode)
+    acak = random.Random(benih)
+    pelanggan = Pelanggan.objects.get(username='bench_sqlite')
+    produk = list(Produk.objects.filter(namaProduk__startswith=PRODUK_BENCH).values_list('idProduk', 'harga'))
+    connections['default'].close()
+
+    time.sleep(max(0, mulai - time.time()))
+    sampai = mulai + durasi
+    latensi, terkunci, gagal = [], 0, 0
+    while time.time() < sampai:
+        t0 = time.perf_counter()
+        try:
+            PERAN[peran](acak, pelanggan, produk)
+        except OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                terkunci += 1
+            else:
+                gagal += 1
+            continue
+        except StokTidakCukup:
+            gagal += 1
+            continue
+        latensi.append(time.perf_counter() - t0)
+    return {'latensi': latensi, 'terkunci': terkunci, 'gagal': gagal}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark konkurensi SQLite: proses checkout dan admin bersamaan, membandingkan koneksi bawaan '
+        '(DEFERRED, tanpa PRAGMA) dengan tuning (WAL, busy_timeout, BEGIN IMMEDIATE). Memakai salinan database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkout', type=int, default=8, help='Jumlah proses checkout')
+        parser.add_argument('--admin', type=int, default=4, help='Jumlah proses admin')
+        parser.add_argument('--durasi', type=float, default=10, help='Lama pengukuran per mode (detik)')
+        parser.add_argument('--mode', nargs='+', choices=['bawaan', 'tuning'], default=['bawaan', 'tuning'])
+        # Dipakai proses anak
+        parser.add_argument('--peran', choices=['siapkan', *PERAN], help='(internal)')
+        parser.add_argument('--mulai', type=float, help='(internal)')
+        parser.add_argument('--benih', type=int, default=0, help='(internal)')
+
+    def handle(self, *args, **options):
+        if options['peran'] == 'siapkan':
+            _siapkan()
+            return
+        if options['peran']:
+            mode = options['mode'][0]
+            hasil = _jalankan_peran(options['peran'], mode, options['mulai'], options['durasi'], options['benih'])
+            self.stdout.write(json.dumps(hasil))
+            return
+
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        with tempfile.TemporaryDirectory() as folder:
+            # Database template: salinan yang sudah dimigrasi dan diisi, dikembalikan ke journal DELETE
+            template = os.path.join(folder, 'template.sqlite3')
+            shutil.copyfile(settings.DATABASES['default']['NAME'], template)
+            env = {**os.environ, 'SQLITE_PATH': template}
+            subprocess.run([sys.executable, manage, 'migrate', '-v0'], env=env, check=True)
+            subprocess.run([sys.executable, manage, 'bench_sqlite', '--peran', 'siapkan'], env=env, check=True)
+            with sqlite3.connect(template) as koneksi:
+                koneksi.execute('PRAGMA journal_mode=DELETE')
+
+            for mode in options['mode']:
+                db = os.path.join(folder, f'{mode}.sqlite3')
+                shutil.copyfile(template, db)
+                if mode == 'tuning':
+                    # journal_mode tersimpan di file database; settings_produksi memasangnya, settings dev tidak
+                    with sqlite3.connect(db) as koneksi:
+                        koneksi.execute('PRAGMA journal_mode=WAL')
+                self._tulis(mode, self._ukur_mode(manage, db, mode, options))
+
+    def _ukur_mode(self, manage, db, mode, options):
+        env = {**os.environ, 'SQLITE_PATH': db}
+        mulai = time.time() + 3  # Waktu untuk semua proses selesai start-up
+        proses = []
+        for peran in PERAN:
+            for i in range(options[peran]):
+                proses.append((peran, subprocess.Popen([
+                    sys.executable, manage, 'bench_sqlite', '--peran', peran, '--mode', mode,
+                    '--mulai', str(mulai), '--durasi', str(options['durasi']), '--benih', str(i),
+                ], env=env, stdout=subprocess.PIPE, text=True)))
+
+        hasil = {peran: {'latensi': [], 'terkunci': 0, 'gagal': 0} for peran in PERAN}
+        for peran, p in proses:
+            keluaran, _ = p.communicate()
+            data = json.loads(keluaran.strip().splitlines()[-1])
+            hasil[peran]['latensi'] += data['latensi']
+            hasil[peran]['terkunci'] += data['terkunci']
+            hasil[peran]['gagal'] += data['gagal']
+        for data in hasil.values():
+            data['durasi'] = options['durasi']
+        return hasil
+
+    def _tulis(self, mode, hasil):
+        self.stdout.write(self.style.MIGRATE_HEADING(mode))
+        for peran, data in hasil.items():
+            latensi = sorted(data['latensi'])
+            p50 = statistics.median(latensi) * 1000 if latensi else 0
+            p95 = latensi[int(len(latensi) * 0.95)] * 1000 if latensi else 0
+            self.stdout.write(
+                f"  {peran:8}: {len(latensi) / data['durasi']:7.1f} transaksi/detik, "
+                f"p50 {p50:6.1f} ms, p95 {p95:7.1f} ms, database is locked: {data['terkunci']}, gagal lain: {data['gagal']}"
+            )
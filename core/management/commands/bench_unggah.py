@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import load_handler
+from django.core.management.base import BaseCommand
+from django.http.multipartparser import MultiPartParser
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+from core.unggah import handler_bukti_bayar, proses_bukti_bayar
+
+
+def _foto_sintetis(lebar, tinggi):
+    # Noise + gradien supaya ukuran JPEG mendekati foto ponsel asli
+    noise = Image.effect_noise((lebar, tinggi), 40)
+    gradien = Image.linear_gradient('L').resize((lebar, tinggi))
+    gambar = Image.merge('RGB', (noise, gradien, noise.transpose(Image.FLIP_LEFT_RIGHT)))
+    isi = BytesIO()
+    gambar.save(isi, 'JPEG', quality=95)
+    return isi.getvalue()
+
+
+def _rss():
+    # Resident set size proses ini (byte); Linux
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class _PemantauMemori(threading.Thread):
+    """Sample RSS every few milliseconds and keep the peak"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.awal = self.puncak = _rss()
+        self._berhenti = threading.Event()
+
+    def run(self):
+        while not self._berhenti.wait(0.005):
+            self.puncak = max(self.puncak, _rss())
+
+    def stop(self):
+        self._berhenti.set()
+        self.join()
+        return self.puncak - self.awal
+
+
+class Command(BaseCommand):
+    help = (
+        'Ukur memori dan waktu saat banyak bukti pembayaran diunggah bersamaan: parsing multipart '
+        'lewat upload handler lalu kompresi ulang gambar. Jalankan tiap --mode di proses terpisah.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paralel', type=int, default=20, help='Jumlah unggahan bersamaan')
+        parser.add_argument('--lebar', type=int, default=4032)
+        parser.add_argument('--tinggi', type=int, default=3024)
+        parser.add_argument(
+            '--mode', choices=['baru', 'bawaan'], default='baru',
+            help="'baru': handler bukti bayar + kompresi ulang; 'bawaan': FILE_UPLOAD_HANDLERS Django, file disimpan apa adanya"
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists('/proc/self/statm'):
+            self.stderr.write('Benchmark ini membaca /proc/self/statm (Linux).')
+            return
+
+        foto = _foto_sintetis(options['lebar'], options['tinggi'])
+        body = encode_multipart(BOUNDARY, {
+            'alamat_pengiriman': 'Kupang',
+            'bukti_bayar': SimpleUploadedFile('foto.jpg', foto, content_type='image/jpeg'),
+        })
+        meta = {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': str(len(body))}
+        self.stdout.write(
+            f"Foto {options['lebar']}x{options['tinggi']}: {len(foto) / 1e6:.1f} MB, "
+            f"{options['paralel']} unggahan bersamaan, mode {options['mode']}"
+        )
+
+        def unggah(_):
+            if options['mode'] == 'baru':
+                handlers = handler_bukti_bayar()
+            else:
+                handlers = [load_handler(path) for path in settings.FILE_UPLOAD_HANDLERS]
+            mulai = time.perf_counter()
+            _, files = MultiPartParser(meta, BytesIO(body), handlers).parse()
+            berkas = files['bukti_bayar']
+            try:
+                if options['mode'] == 'baru':
+                    hasil = len(proses_bukti_bayar(berkas))
+                else:
+                    hasil = berkas.size
+            finally:
+                berkas.close()
+            return time.perf_counter() - mulai, hasil
+
+        pemantau = _PemantauMemori()
+        pemantau.start()
+        mulai = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['paralel']) as executor:
+            hasil = list(executor.map(unggah, range(options['paralel'])))
+        total = time.perf_counter() - mulai
+        puncak = pemantau.stop()
+
+        durasi = sorted(d for d, _ in hasil)
+        disimpan = hasil[0][1]
+        self.stdout.write(f'  puncak memori tambahan : {puncak / 1e6:8.1f} MB')
+        self.stdout.write(f'  waktu total            : {total * 1000:8.0f} ms')
+        self.stdout.write(f'  waktu per unggahan p50 : {durasi[len(durasi) // 2] * 1000:8.0f} ms')
+        self.stdout.write(f'  ukuran disimpan        : {disimpan / 1e6:8.2f} MB per file ({len(foto) / max(disimpan, 1):.0f}x lebih kecil)')
@@ -0,0 +1,197 @@
+import http.client
+import os
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import import_module
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+PROFIL = {
+    'dev': 'arlinSkripsi.settings',
+    'produksi': 'arlinSkripsi.settings_produksi',
+}
+
+
+def sesi_bench():
+    """Create a logged-in customer session for the benchmark clients; returns its key"""
+    from core.models import Pelanggan
+
+    pelanggan = Pelanggan.objects.order_by('pk').first() or Pelanggan.objects.create(
+        namaPelanggan='Bench', alamat='Kupang', noTelp='0812', username='bench_wsgi', password='pbkdf2_x'
+    )
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session['pelanggan_id'] = pelanggan.pk
+    session['pelanggan_nama'] = pelanggan.namaPelanggan
+    session['keranjang_siap'] = True
+    session.create()
+    return session.session_key
+
+
+def _layani(port, worker):
+    # Server pre-fork sederhana: satu socket, N proses worker yang masing-masing menjalankan wsgi.py
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+    from arlinSkripsi.wsgi import application
+
+    class _TanpaLog(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    class _Server(WSGIServer):
+        # listen() dipanggil di __init__, jadi antrean harus diatur di level kelas
+        request_queue_size = 512
+
+    # Sesi pelanggan untuk halaman yang butuh login
+    session_key = sesi_bench()
+
+    server = _Server(('127.0.0.1', port), _TanpaLog)
+    server.set_app(application)
+    # Koneksi yang dibuka sebelum fork tidak boleh dipakai bersama oleh worker
+    connections.close_all()
+
+    anak = []
+    for _ in range(worker):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        anak.append(pid)
+
+    def berhenti(*args):
+        for pid in anak:
+            os.kill(pid, signal.SIGTERM)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, berhenti)
+    print(f'SIAP {session_key}', flush=True)
+    while True:
+        os.wait()
+
+
+def _klien(argumen):
+    # Satu proses klien: request berurutan sampai waktu habis; wsgiref menutup koneksi tiap request
+    port, path, cookie, sampai = argumen
+    latensi, gagal = [], 0
+    while time.monotonic() < sampai:
+        mulai = time.perf_counter()
+        try:
+            koneksi = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            koneksi.request('GET', path, headers={'Cookie': f'sessionid={cookie}', 'Host': '127.0.0.1'})
+            respons = koneksi.getresponse()
+            respons.read()
+            koneksi.close()
+            if respons.status != 200:
+                gagal += 1
+                continue
+        except OSError:
+            gagal += 1
+            continue
+        latensi.append(time.perf_counter() - mulai)
+    return latensi, gagal
+
+
+def _port_bebas():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Uji beban wsgi.py dengan beberapa proses worker, membandingkan settings dev dan settings_produksi. '
+        'Memakai salinan database di folder sementara.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker', type=int, default=4, help='Jumlah proses worker WSGI')
+        parser.add_argument('--klien', type=int, default=16, help='Jumlah proses klien bersamaan')
+        parser.add_argument('--durasi', type=float, default=10, help='Lama pengukuran per profil (detik)')
+        parser.add_argument('--path', default='/produk/', help='URL yang diuji')
+        parser.add_argument('--profil', nargs='+', choices=sorted(PROFIL), default=['dev', 'produksi'])
+        parser.add_argument('--layani', type=int, help='(internal) jalankan server worker pada port ini')
+
+    def handle(self, *args, **options):
+        if options['layani']:
+            _layani(options['layani'], options['worker'])
+            return
+        if not hasattr(os, 'fork'):
+            raise CommandError('Benchmark ini membutuhkan os.fork (Linux/macOS).')
+
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        with tempfile.TemporaryDirectory() as folder:
+            # Database asli tidak disentuh: WAL dan sesi bench hanya mengenai salinan
+            db = os.path.join(folder, 'db.sqlite3')
+            shutil.copyfile(settings.DATABASES['default']['NAME'], db)
+            env_dasar = {
+                **os.environ,
+                'SQLITE_PATH': db,
+                'DJANGO_SECRET_KEY': 'bench-wsgi',
+                'DJANGO_ALLOWED_HOSTS': '127.0.0.1,localhost',
+                'DJANGO_STATIC_ROOT': os.path.join(folder, 'static'),
+                'KATALOG_CACHE_LOCATION': os.path.join(folder, 'katalog'),
+            }
+            subprocess.run([sys.executable, manage, 'migrate', '-v0'], env={
+                **env_dasar, 'DJANGO_SETTINGS_MODULE': PROFIL['dev']
+            }, check=True)
+
+            hasil = {}
+            for profil in options['profil']:
+                env = {**env_dasar, 'DJANGO_SETTINGS_MODULE': PROFIL[profil]}
+                if profil == 'produksi':
+                    subprocess.run([sys.executable, manage, 'collectstatic', '--noinput', '-v0'], env=env, check=True)
+                hasil[profil] = self._ukur_profil(manage, env, options)
+                self._tulis(profil, hasil[profil])
+
+            if 'dev' in hasil and 'produksi' in hasil and hasil['dev'][0]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Throughput produksi {hasil['produksi'][0] / hasil['dev'][0]:.2f}x dev"
+                ))
+
+    def _ukur_profil(self, manage, env, options):
+        port = _port_bebas()
+        server = subprocess.Popen(
+            [sys.executable, manage, 'bench_wsgi', '--layani', str(port), '--worker', str(options['worker'])],
+            env=env, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            baris = server.stdout.readline().split()
+            if not baris or baris[0] != 'SIAP':
+                raise CommandError('Server bench gagal dijalankan.')
+            cookie = baris[1]
+
+            with Pool(options['klien']) as pool:
+                # Pemanasan: template dan koneksi pertama tiap worker tidak ikut diukur
+                pool.map(_klien, [(port, options['path'], cookie, time.monotonic() + 1)] * options['klien'])
+                mulai = time.monotonic()
+                per_klien = pool.map(
+                    _klien, [(port, options['path'], cookie, mulai + options['durasi'])] * options['klien']
+                )
+                durasi = time.monotonic() - mulai
+        finally:
+            server.terminate()
+            server.wait()
+
+        latensi = sorted(d for hasil, _ in per_klien for d in hasil)
+        gagal = sum(g for _, g in per_klien)
+        if not latensi:
+            return 0, 0, 0, gagal
+        p95 = latensi[min(len(latensi) - 1, int(len(latensi) * 0.95))]
+        return len(latensi) / durasi, statistics.median(latensi) * 1000, p95 * 1000, gagal
+
+    def _tulis(self, profil, hasil):
+        rps, p50, p95, gagal = hasil
+        self.stdout.write(self.style.MIGRATE_HEADING(profil))
+        self.stdout.write(f'  throughput : {rps:8.1f} req/detik')
+        self.stdout.write(f'  latensi p50: {p50:8.1f} ms   p95: {p95:8.1f} ms')
+        self.stdout.write(f'  gagal      : {gagal}')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from core.models import Pemesanan, Produk
+from core.thumbnail import buat_thumbnail
+
+
+class Command(BaseCommand):
+    help = 'Buat thumbnail WebP/JPEG untuk foto produk dan bukti bayar yang sudah ada (backfill)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paksa', action='store_true', help='Tulis ulang thumbnail yang sudah ada')
+
+    def handle(self, *args, **options):
+        sumber = (
+            ('foto produk', Produk.objects.exclude(foto='').exclude(foto__isnull=True), 'foto'),
+            ('bukti bayar', Pemesanan.objects.exclude(buktiBayar='').exclude(buktiBayar__isnull=True), 'buktiBayar'),
+        )
+        for label, queryset, nama_field in sumber:
+            gambar = ditulis = 0
+            for obj in queryset.only('pk', nama_field).iterator():
+                gambar += 1
+                ditulis += buat_thumbnail(getattr(obj, nama_field), paksa=options['paksa'])
+            self.stdout.write(f'{label}: {gambar} gambar, {ditulis} thumbnail ditulis')
+        self.stdout.write(self.style.SUCCESS('Selesai.'))
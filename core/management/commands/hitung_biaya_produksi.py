@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from core.biaya_produksi import perbarui_biaya
+from core.models import Produksi
+
+
+class Command(BaseCommand):
+    help = (
+        'Hitung ulang biaya bahan, biaya resep dan ringkasan bahan yang tersimpan di Produksi '
+        '(mis. setelah resep diubah atau untuk memakai harga bahan terbaru)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jenis-hasil', help='Hanya produksi dengan jenis hasil ini')
+        parser.add_argument('--sejak', help='Hanya produksi sejak tanggal ini (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        queryset = Produksi.objects.order_by('pk')
+        if options['jenis_hasil']:
+            queryset = queryset.filter(jenisHasil=options['jenis_hasil'])
+        if options['sejak']:
+            queryset = queryset.filter(tanggalProduksi__gte=options['sejak'])
+        produksi_ids = list(queryset.values_list('pk', flat=True))
+        perbarui_biaya(produksi_ids)
+        self.stdout.write(self.style.SUCCESS(f'Biaya {len(produksi_ids)} produksi dihitung ulang.'))
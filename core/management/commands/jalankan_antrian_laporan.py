@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.antrian import bersihkan_antrian, proses_job_berikutnya, pulihkan_job_macet
+
+
+class Command(BaseCommand):
+    help = 'Worker antrian laporan PDF: ambil job dari tabel antrian_laporan dan render ke folder privat ANTRIAN_LAPORAN_DIR; job lama dibersihkan berkala'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sekali', action='store_true', help='Proses semua job yang menunggu lalu berhenti')
+        parser.add_argument('--interval', type=float, default=2.0, help='Jeda polling saat antrian kosong (detik)')
+        parser.add_argument('--interval-bersih', type=float, default=60 * 60,
+                            help='Jeda antar pembersihan job selesai/gagal yang lama (detik)')
+
+    def handle(self, *args, **options):
+        dipulihkan = pulihkan_job_macet()
+        if dipulihkan:
+            self.stdout.write(f'{dipulihkan} job macet dikembalikan ke antrian.')
+
+        dibersihkan = None
+        while True:
+            close_old_connections()
+            if dibersihkan is None or time.monotonic() - dibersihkan >= options['interval_bersih']:
+                dihapus = bersihkan_antrian()
+                dibersihkan = time.monotonic()
+                if dihapus:
+                    self.stdout.write(f'{dihapus} job lama dihapus.')
+            job = proses_job_berikutnya()
+            if job is not None:
+                pesan = f'Job #{job.idAntrian} {job.jenisLaporan}: {job.status}'
+                if job.status == 'Gagal':
+                    self.stderr.write(f'{pesan} - {job.pesanError}')
+                else:
+                    self.stdout.write(pesan)
+                continue
+
+            if options['sekali']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,67 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from core.profiler import PENGATURAN, baca_log
+
+
+def _p95(nilai):
+    nilai = sorted(nilai)
+    return nilai[min(len(nilai) - 1, int(len(nilai) * 0.95))]
+
+
+def ringkas_log(rekaman):
+    """Aggregate profiler records per view, hottest (most total SQL time) first"""
+    per_view = defaultdict(lambda: {
+        'request': 0, 'durasi': [], 'query': [], 'sql_ms': 0.0, 'n_plus_1': 0, 'sidik': Counter(),
+    })
+    for data in rekaman:
+        view = per_view[data['view']]
+        view['request'] += 1
+        view['durasi'].append(data['durasi_ms'])
+        view['query'].append(data['jumlah_query'])
+        view['sql_ms'] += data['sql_ms']
+        if data['n_plus_1']:
+            view['n_plus_1'] += 1
+        for q in data['n_plus_1'] + data['duplikat']:
+            view['sidik'][q['sql']] += q['jumlah']
+
+    hasil = []
+    for nama, view in per_view.items():
+        total_ms = sum(view['durasi'])
+        hasil.append({
+            'view': nama,
+            'request': view['request'],
+            'query_rata': sum(view['query']) / view['request'],
+            'query_maks': max(view['query']),
+            'sql_ms': view['sql_ms'],
+            'porsi_sql': view['sql_ms'] / total_ms if total_ms else 0,
+            'p95_ms': _p95(view['durasi']),
+            'n_plus_1': view['n_plus_1'],
+            'sidik': view['sidik'].most_common(),
+        })
+    return sorted(hasil, key=lambda v: v['sql_ms'], reverse=True)
+
+
+class Command(BaseCommand):
+    help = 'Ringkas log profiler SQL (PROFILER_SQL=1) per view: jumlah query, waktu SQL, p95 dan pola N+1'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=PENGATURAN['LOG'], help='File log JSONL (backup rotasi ikut dibaca)')
+        parser.add_argument('--top', type=int, default=10, help='Jumlah view yang ditampilkan')
+        parser.add_argument('--query', type=int, default=3, help='Query berulang yang ditampilkan per view')
+
+    def handle(self, *args, **options):
+        ringkasan = ringkas_log(baca_log(options['log']))
+        if not ringkasan:
+            raise CommandError(f"Log profiler kosong atau tidak ada: {options['log']}")
+
+        for view in ringkasan[:options['top']]:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{view['view']} ({view['request']} request)"))
+            self.stdout.write(
+                f"  query rata-rata {view['query_rata']:.1f}, maks {view['query_maks']}, "
+                f"total SQL {view['sql_ms']:.1f} ms ({view['porsi_sql']:.0%} waktu request), p95 {view['p95_ms']:.1f} ms"
+            )
+            if view['n_plus_1']:
+                self.stdout.write(self.style.WARNING(f"  N+1 pada {view['n_plus_1']} request"))
+            for sql, jumlah in view['sidik'][:options['query']]:
+                self.stdout.write(f'    {jumlah}x {sql[:120]}')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.rekap import rebuild_rekap
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang tabel rekap_penjualan_harian, rekap_produk_harian dan rekap_pelanggan_bulanan dari seluruh data pemesanan'
+
+    def handle(self, *args, **options):
+        jumlah = rebuild_rekap()
+        self.stdout.write(self.style.SUCCESS(f'Rekap penjualan dibangun ulang: {jumlah} bucket.'))
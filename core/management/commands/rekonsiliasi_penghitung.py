@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from core.penghitung import rekonsiliasi_penghitung
+
+
+class Command(BaseCommand):
+    help = 'Samakan tabel penghitung dengan jumlah pemesanan per status (jalankan berkala, mis. via cron)'
+
+    def handle(self, *args, **options):
+        selisih = rekonsiliasi_penghitung()
+        if not selisih:
+            self.stdout.write(self.style.SUCCESS('Penghitung sudah sesuai.'))
+            return
+        for nama, (tercatat, seharusnya) in sorted(selisih.items()):
+            self.stdout.write(self.style.WARNING(f'{nama}: {tercatat} -> {seharusnya}'))
+        self.stdout.write(self.style.SUCCESS(f'{len(selisih)} penghitung dikoreksi.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from core.stok import rekonsiliasi_stok
+
+
+class Command(BaseCommand):
+    help = 'Bandingkan stok produk dengan saldo jurnal mutasi stok; --perbaiki menyamakan stok dengan jurnal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--perbaiki', action='store_true', help='Setel Produk.stok ke saldo jurnal')
+
+    def handle(self, *args, **options):
+        selisih = rekonsiliasi_stok(perbaiki=options['perbaiki'])
+        if not selisih:
+            self.stdout.write(self.style.SUCCESS('Stok sudah sesuai dengan jurnal.'))
+            return
+        for produk_id, (nama, stok, saldo) in sorted(selisih.items()):
+            self.stdout.write(self.style.WARNING(f'{nama} (#{produk_id}): stok {stok}, jurnal {saldo}'))
+        if options['perbaiki']:
+            self.stdout.write(self.style.SUCCESS(f'{len(selisih)} produk disamakan dengan jurnal.'))
+        else:
+            self.stdout.write(f'{len(selisih)} produk berbeda. Jalankan dengan --perbaiki untuk mengoreksi.')
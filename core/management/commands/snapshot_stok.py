@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from core.snapshot import buat_snapshot
+
+
+def _tanggal(teks):
+    tanggal = parse_date(teks)
+    if tanggal is None:
+        raise CommandError(f'Tanggal tidak valid: {teks} (format YYYY-MM-DD)')
+    return tanggal
+
+
+class Command(BaseCommand):
+    help = 'Simpan saldo stok akhir hari per produk (default: kemarin). Jalankan harian setelah tengah malam, mis. via cron'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tanggal', type=_tanggal, help='Hari yang di-snapshot (default: kemarin)')
+        parser.add_argument('--dari', type=_tanggal, help='Isi mundur setiap hari dari tanggal ini sampai --tanggal')
+
+    def handle(self, *args, **options):
+        sampai = options['tanggal'] or timezone.localdate() - timedelta(days=1)
+        tanggal = options['dari'] or sampai
+        if tanggal > sampai:
+            raise CommandError('--dari harus sebelum --tanggal.')
+
+        # Urut maju: tiap snapshot dihitung dari snapshot hari sebelumnya
+        while tanggal <= sampai:
+            try:
+                jumlah = buat_snapshot(tanggal)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'{tanggal}: {jumlah} produk')
+            tanggal += timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS('Snapshot stok selesai.'))
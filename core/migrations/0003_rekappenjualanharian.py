@@ -0,0 +1,49 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:52
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def isi_rekap_awal(apps, schema_editor):
+    Pemesanan = apps.get_model('core', 'Pemesanan')
+    RekapPenjualanHarian = apps.get_model('core', 'RekapPenjualanHarian')
+    buckets = (
+        Pemesanan.objects
+        .values('tanggalPemesanan', 'status')
+        .annotate(jumlah=Count('idPemesanan'), total=Sum('totalPemesanan'))
+        .order_by()
+    )
+    RekapPenjualanHarian.objects.bulk_create([
+        RekapPenjualanHarian(
+            tanggal=bucket['tanggalPemesanan'],
+            status=bucket['status'],
+            jumlahPemesanan=bucket['jumlah'],
+            totalPendapatan=bucket['total'] or 0,
+        )
+        for bucket in buckets
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_pemesanan_alamatpengiriman_pemesanan_buktibayar_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RekapPenjualanHarian',
+            fields=[
+                ('idRekap', models.AutoField(primary_key=True, serialize=False)),
+                ('tanggal', models.DateField()),
+                ('status', models.CharField(choices=[('Diproses', 'Diproses'), ('Dikirim', 'Dikirim'), ('Selesai', 'Selesai'), ('Dibatalkan', 'Dibatalkan')], max_length=50)),
+                ('jumlahPemesanan', models.IntegerField(default=0)),
+                ('totalPendapatan', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'rekap_penjualan_harian',
+                'constraints': [models.UniqueConstraint(fields=('tanggal', 'status'), name='rekap_tanggal_status_unik')],
+            },
+        ),
+        migrations.RunPython(isi_rekap_awal, migrations.RunPython.noop),
+    ]
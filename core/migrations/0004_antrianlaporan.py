@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_rekappenjualanharian'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AntrianLaporan',
+            fields=[
+                ('idAntrian', models.AutoField(primary_key=True, serialize=False)),
+                ('jenisLaporan', models.CharField(choices=[('penjualan', 'Laporan Penjualan'), ('produk', 'Laporan Produk'), ('produksi', 'Laporan Produksi')], max_length=20)),
+                ('parameter', models.JSONField(blank=True, default=dict)),
+                ('kunci', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('Menunggu', 'Menunggu'), ('Diproses', 'Diproses'), ('Selesai', 'Selesai'), ('Gagal', 'Gagal')], default='Menunggu', max_length=20)),
+                ('berkas', models.FileField(blank=True, null=True, upload_to='laporan/')),
+                ('pesanError', models.TextField(blank=True, null=True)),
+                ('dibuat', models.DateTimeField(auto_now_add=True)),
+                ('dimulai', models.DateTimeField(blank=True, null=True)),
+                ('selesai', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'antrian_laporan',
+                'indexes': [models.Index(fields=['status', 'dibuat'], name='antrian_status_dibuat_idx'), models.Index(fields=['kunci', 'status'], name='antrian_kunci_status_idx')],
+            },
+        ),
+    ]
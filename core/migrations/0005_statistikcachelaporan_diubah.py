@@ -0,0 +1,53 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def isi_statistik_awal(apps, schema_editor):
+    # Satu baris penghitung per jenis laporan, supaya cache cukup melakukan UPDATE
+    StatistikCacheLaporan = apps.get_model('core', 'StatistikCacheLaporan')
+    StatistikCacheLaporan.objects.bulk_create(
+        [StatistikCacheLaporan(jenisLaporan=jenis) for jenis in ('penjualan', 'produk', 'produksi')],
+        ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_antrianlaporan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pemesanan',
+            name='diubah',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='produk',
+            name='diubah',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='produksi',
+            name='diubah',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='StatistikCacheLaporan',
+            fields=[
+                ('jenisLaporan', models.CharField(choices=[('penjualan', 'Laporan Penjualan'), ('produk', 'Laporan Produk'), ('produksi', 'Laporan Produksi')], max_length=20, primary_key=True, serialize=False)),
+                ('hit', models.BigIntegerField(default=0)),
+                ('miss', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'statistik_cache_laporan',
+            },
+        ),
+        migrations.RunPython(isi_statistik_awal, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_statistikcachelaporan_diubah'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pemesanan',
+            index=models.Index(fields=['idPelanggan', '-tanggalPemesanan', '-idPemesanan'], name='pemesanan_plg_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pemesanan',
+            index=models.Index(fields=['status', 'tanggalPemesanan'], name='pemesanan_status_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pemesanan',
+            index=models.Index(fields=['-tanggalPemesanan', '-idPemesanan'], name='pemesanan_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produk',
+            index=models.Index(fields=['jenisProduk', 'stok'], name='produk_jenis_stok_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produk',
+            index=models.Index(fields=['stok'], name='produk_stok_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produksi',
+            index=models.Index(fields=['idKaryawan', '-tanggalProduksi'], name='produksi_karyawan_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produksi',
+            index=models.Index(fields=['idKaryawan', 'jenisHasil'], name='produksi_karyawan_jenis_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produksi',
+            index=models.Index(fields=['jenisHasil', 'tanggalProduksi'], name='produksi_jenis_tgl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produksi',
+            index=models.Index(fields=['-tanggalProduksi', '-idProduksi'], name='produksi_tgl_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:14
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def isi_penghitung_awal(apps, schema_editor):
+    Pemesanan = apps.get_model('core', 'Pemesanan')
+    Penghitung = apps.get_model('core', 'Penghitung')
+    jumlah = dict(Pemesanan.objects.values_list('status').annotate(n=Count('pk')).order_by())
+    Penghitung.objects.bulk_create([
+        Penghitung(nama=f'pemesanan:{status}', nilai=jumlah.get(status, 0))
+        for status in ('Diproses', 'Dikirim', 'Selesai', 'Dibatalkan')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_indeks_filter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Penghitung',
+            fields=[
+                ('nama', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('nilai', models.BigIntegerField(default=0)),
+                ('diperbarui', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'penghitung',
+            },
+        ),
+        migrations.RunPython(isi_penghitung_awal, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_penghitung'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Keranjang',
+            fields=[
+                ('idPelanggan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='core.pelanggan')),
+                ('dibuat', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'keranjang',
+            },
+        ),
+        migrations.CreateModel(
+            name='KeranjangItem',
+            fields=[
+                ('idItem', models.AutoField(primary_key=True, serialize=False)),
+                ('kuantiti', models.IntegerField()),
+                ('hargaSnapshot', models.IntegerField()),
+                ('ditambahkan', models.DateTimeField(auto_now_add=True)),
+                ('idKeranjang', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.keranjang')),
+                ('idProduk', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.produk')),
+            ],
+            options={
+                'db_table': 'keranjang_item',
+                'constraints': [models.UniqueConstraint(fields=('idKeranjang', 'idProduk'), name='keranjang_item_produk_unik')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def isi_saldo_awal(apps, schema_editor):
+    # Stok yang sudah ada menjadi saldo awal jurnal, jadi saldo = SUM(jumlah) sejak awal
+    Produk = apps.get_model('core', 'Produk')
+    MutasiStok = apps.get_model('core', 'MutasiStok')
+    MutasiStok.objects.bulk_create([
+        MutasiStok(idProduk_id=produk_id, jenisMutasi='Saldo Awal', jumlah=stok, keterangan='Stok saat jurnal dimulai')
+        for produk_id, stok in Produk.objects.exclude(stok=0).values_list('idProduk', 'stok')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_keranjang'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MutasiStok',
+            fields=[
+                ('idMutasi', models.AutoField(primary_key=True, serialize=False)),
+                ('jenisMutasi', models.CharField(choices=[('Saldo Awal', 'Saldo Awal'), ('Produksi Masuk', 'Produksi Masuk'), ('Bahan Keluar', 'Bahan Keluar'), ('Penjualan', 'Penjualan'), ('Pembatalan', 'Pembatalan'), ('Penyesuaian', 'Penyesuaian')], max_length=20)),
+                ('jumlah', models.IntegerField()),
+                ('waktu', models.DateTimeField(auto_now_add=True)),
+                ('keterangan', models.CharField(blank=True, max_length=255, null=True)),
+                ('idPemesanan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.pemesanan')),
+                ('idProduk', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.produk')),
+                ('idProduksi', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.produksi')),
+            ],
+            options={
+                'db_table': 'mutasi_stok',
+                'indexes': [models.Index(fields=['idProduk', 'waktu'], name='mutasi_produk_waktu_idx')],
+            },
+        ),
+        migrations.RunPython(isi_saldo_awal, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_mutasistok'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotStok',
+            fields=[
+                ('idSnapshot', models.AutoField(primary_key=True, serialize=False)),
+                ('tanggal', models.DateField()),
+                ('stok', models.IntegerField()),
+                ('idProduk', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.produk')),
+            ],
+            options={
+                'db_table': 'snapshot_stok',
+                'constraints': [models.UniqueConstraint(fields=('tanggal', 'idProduk'), name='snapshot_stok_tanggal_produk_unik')],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:16
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def isi_biaya_produksi(apps, schema_editor):
+    # Produksi lama dihitung dengan harga bahan saat migrasi; belum ada resep, jadi biayaStandar tetap NULL
+    Produksi = apps.get_model('core', 'Produksi')
+    DetailProduksi = apps.get_model('core', 'DetailProduksi')
+    biaya = defaultdict(int)
+    ringkasan = defaultdict(list)
+    baris = (
+        DetailProduksi.objects
+        .filter(idProduk__jenisProduk='Bahan Baku')
+        .order_by('idProduksi', 'idDetail')
+        .values_list('idProduksi', 'jumlahBahanTerpakai', 'idProduk__harga', 'idProduk__satuan', 'idProduk__namaProduk')
+    )
+    for produksi_id, jumlah, harga, satuan, nama in baris.iterator():
+        biaya[produksi_id] += jumlah * harga
+        ringkasan[produksi_id].append(f"{jumlah} {satuan} {nama}")
+
+    diubah = []
+    for produksi in Produksi.objects.filter(pk__in=list(biaya)).only('pk', 'jumlahHasil').iterator():
+        produksi.biayaBahan = biaya[produksi.pk]
+        produksi.biayaPerUnit = round(biaya[produksi.pk] / produksi.jumlahHasil, 2) if produksi.jumlahHasil else 0
+        produksi.ringkasanBahan = ' + '.join(ringkasan[produksi.pk])
+        diubah.append(produksi)
+    Produksi.objects.bulk_update(diubah, ['biayaBahan', 'biayaPerUnit', 'ringkasanBahan'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_snapshotstok'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Resep',
+            fields=[
+                ('idResep', models.AutoField(primary_key=True, serialize=False)),
+                ('jenisHasil', models.CharField(choices=[('Tahu', 'Tahu'), ('Tempe', 'Tempe')], max_length=50, unique=True)),
+                ('hasilPerBatch', models.PositiveIntegerField()),
+                ('satuanHasil', models.CharField(max_length=20)),
+            ],
+            options={
+                'db_table': 'resep',
+            },
+        ),
+        migrations.AddField(
+            model_name='produksi',
+            name='biayaBahan',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='produksi',
+            name='biayaPerUnit',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='produksi',
+            name='biayaStandar',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='produksi',
+            name='ringkasanBahan',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.CreateModel(
+            name='DetailResep',
+            fields=[
+                ('idDetailResep', models.AutoField(primary_key=True, serialize=False)),
+                ('jumlahBahan', models.DecimalField(decimal_places=3, max_digits=10)),
+                ('idProduk', models.ForeignKey(limit_choices_to={'jenisProduk': 'Bahan Baku'}, on_delete=django.db.models.deletion.CASCADE, to='core.produk')),
+                ('idResep', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.resep')),
+            ],
+            options={
+                'db_table': 'detail_resep',
+                'constraints': [models.UniqueConstraint(fields=('idResep', 'idProduk'), name='detail_resep_produk_unik')],
+            },
+        ),
+        migrations.RunPython(isi_biaya_produksi, migrations.RunPython.noop),
+    ]
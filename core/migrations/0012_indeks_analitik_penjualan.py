@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_resep_biaya_produksi'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='pemesanan',
+            name='pemesanan_status_tgl_idx',
+        ),
+        migrations.AddIndex(
+            model_name='detailpemesanan',
+            index=models.Index(fields=['idKoleksiPemesanan', 'idProduk', 'kuantiti', 'subTotal'], name='detail_pesanan_produk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pemesanan',
+            index=models.Index(fields=['status', 'tanggalPemesanan', 'idPelanggan', 'totalPemesanan'], name='pemesanan_status_tgl_cover_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:38
+
+import os
+
+import core.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def rapikan_antrian(apps, schema_editor):
+    AntrianLaporan = apps.get_model('core', 'AntrianLaporan')
+
+    # PDF lama ada di MEDIA_ROOT/laporan/ yang bisa diunduh tanpa login: hapus, job perlu diantrikan ulang
+    lama = AntrianLaporan.objects.exclude(berkas='').exclude(berkas=None)
+    for nama in lama.values_list('berkas', flat=True):
+        try:
+            os.remove(os.path.join(settings.MEDIA_ROOT, nama))
+        except FileNotFoundError:
+            pass
+    lama.update(berkas=None, status='Gagal', pesanError='Berkas dihapus, antrikan ulang laporan.')
+
+    # Sisakan job aktif terbaru per kunci supaya constraint unik bisa dibuat
+    terlihat = set()
+    for job in AntrianLaporan.objects.filter(status__in=['Menunggu', 'Diproses']).order_by('-dibuat', '-idAntrian'):
+        if job.kunci in terlihat:
+            job.status = 'Gagal'
+            job.pesanError = 'Duplikat job aktif.'
+            job.save(update_fields=['status', 'pesanError'])
+        terlihat.add(job.kunci)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_indeks_analitik_penjualan'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='antrianlaporan',
+            name='berkas',
+            field=models.FileField(blank=True, null=True, storage=core.models.penyimpanan_antrian_laporan, upload_to='laporan/'),
+        ),
+        migrations.RunPython(rapikan_antrian, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='antrianlaporan',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['Menunggu', 'Diproses'])), fields=('kunci',), name='antrian_kunci_aktif_unik'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_antrian_laporan_privat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='karyawan',
+            name='diubah',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='pelanggan',
+            name='diubah',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.9 on 2026-10-18 19:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def isi_rekap_awal(apps, schema_editor):
+    DetailPemesanan = apps.get_model('core', 'DetailPemesanan')
+    Pemesanan = apps.get_model('core', 'Pemesanan')
+    RekapPelangganBulanan = apps.get_model('core', 'RekapPelangganBulanan')
+    RekapProdukHarian = apps.get_model('core', 'RekapProdukHarian')
+    produk = (
+        DetailPemesanan.objects
+        .filter(idKoleksiPemesanan__status='Selesai')
+        .values('idKoleksiPemesanan__tanggalPemesanan', 'idProduk')
+        .annotate(kuantiti=Sum('kuantiti'), total=Sum('subTotal'))
+        .order_by()
+    )
+    RekapProdukHarian.objects.bulk_create([
+        RekapProdukHarian(
+            tanggal=bucket['idKoleksiPemesanan__tanggalPemesanan'],
+            idProduk_id=bucket['idProduk'],
+            kuantiti=bucket['kuantiti'],
+            totalPendapatan=bucket['total'],
+        )
+        for bucket in produk
+    ], batch_size=500)
+    pelanggan = (
+        Pemesanan.objects
+        .filter(status='Selesai')
+        .annotate(bulan=TruncMonth('tanggalPemesanan'))
+        .values('bulan', 'idPelanggan')
+        .annotate(jumlah=Count('idPemesanan'), total=Sum('totalPemesanan'))
+        .order_by()
+    )
+    RekapPelangganBulanan.objects.bulk_create([
+        RekapPelangganBulanan(
+            bulan=bucket['bulan'],
+            idPelanggan_id=bucket['idPelanggan'],
+            jumlahPemesanan=bucket['jumlah'],
+            totalPendapatan=bucket['total'] or 0,
+        )
+        for bucket in pelanggan
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_pelanggan_karyawan_diubah'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RekapPelangganBulanan',
+            fields=[
+                ('idRekap', models.AutoField(primary_key=True, serialize=False)),
+                ('bulan', models.DateField()),
+                ('jumlahPemesanan', models.IntegerField(default=0)),
+                ('totalPendapatan', models.BigIntegerField(default=0)),
+                ('idPelanggan', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='core.pelanggan')),
+            ],
+            options={
+                'db_table': 'rekap_pelanggan_bulanan',
+                'constraints': [models.UniqueConstraint(fields=('bulan', 'idPelanggan'), name='rekap_pelanggan_bulan_unik')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RekapProdukHarian',
+            fields=[
+                ('idRekap', models.AutoField(primary_key=True, serialize=False)),
+                ('tanggal', models.DateField()),
+                ('kuantiti', models.BigIntegerField(default=0)),
+                ('totalPendapatan', models.BigIntegerField(default=0)),
+                ('idProduk', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='core.produk')),
+            ],
+            options={
+                'db_table': 'rekap_produk_harian',
+                'constraints': [models.UniqueConstraint(fields=('tanggal', 'idProduk'), name='rekap_produk_tanggal_unik')],
+            },
+        ),
+        migrations.RunPython(isi_rekap_awal, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
 from django.contrib.auth.hashers import make_password
 from django.db.models import Sum
 from django.core.exceptions import ValidationError
@@ -10,6 +14,7 @@ class Karyawan(models.Model):
     nama = models.CharField(max_length=255)
     username = models.CharField(max_length=50, unique=True)
     password = models.CharField(max_length=255)
+    diubah = models.DateTimeField(auto_now=True, db_index=True)  # Nama karyawan tercetak di laporan produksi
 
     class Meta:
         db_table = 'karyawan'
@@ -36,9 +41,16 @@ class Produk(models.Model):
     stok = models.IntegerField()
     satuan = models.CharField(max_length=20)
     foto = models.ImageField(upload_to='produk_images/', null=True, blank=True)
+    diubah = models.DateTimeField(auto_now=True, db_index=True)  # Stempel versi data laporan
 
     class Meta:
         db_table = 'produk'
+        indexes = [
+            # Katalog & dashboard: jenisProduk = ... AND stok > / < ...
+            models.Index(fields=['jenisProduk', 'stok'], name='produk_jenis_stok_idx'),
+            # Peringatan stok menipis lintas jenis: stok < ambang
+            models.Index(fields=['stok'], name='produk_stok_idx'),
+        ]
 
     class Admin:
         verbose_name = 'Produk'
@@ -56,25 +68,35 @@ class Produksi(models.Model):
     satuanHasil = models.CharField(max_length=20)
     keterangan = models.TextField(blank=True, null=True)
     idKaryawan = models.ForeignKey(Karyawan, on_delete=models.CASCADE)
+    diubah = models.DateTimeField(auto_now=True, db_index=True)  # Stempel versi data laporan
+    # Biaya bahan dihitung saat produksi disimpan (core/biaya_produksi.py), dengan harga bahan saat itu
+    biayaBahan = models.BigIntegerField(default=0)
+    biayaStandar = models.BigIntegerField(null=True, blank=True)  # Biaya bahan menurut resep; kosong tanpa resep
+    biayaPerUnit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    ringkasanBahan = models.TextField(blank=True, default='')
 
     class Meta:
         db_table = 'produksi'
+        indexes = [
+            # Dashboard karyawan: produksi terbaru & hitungan per jenis hasil
+            models.Index(fields=['idKaryawan', '-tanggalProduksi'], name='produksi_karyawan_tgl_idx'),
+            models.Index(fields=['idKaryawan', 'jenisHasil'], name='produksi_karyawan_jenis_idx'),
+            # Laporan produksi: filter jenis hasil + rentang tanggal, urut tanggal terbaru
+            models.Index(fields=['jenisHasil', 'tanggalProduksi'], name='produksi_jenis_tgl_idx'),
+            models.Index(fields=['-tanggalProduksi', '-idProduksi'], name='produksi_tgl_idx'),
+        ]
 
     class Admin:
         verbose_name = 'Produksi'
         verbose_name_plural = 'Produksi'  # Menghilangkan pluralisasi default
 
     def save(self, *args, **kwargs):
-        # Check if this is an update to an existing record
-        is_update = self.pk is not None
-        
+        from .stok import tambah_stok
+
         # Get the old quantity if this is an update
         old_jumlah = 0
-        if is_update:
-            old_instance = Produksi.objects.get(pk=self.pk)
-            old_jumlah = old_instance.jumlahHasil
-            
-        super().save(*args, **kwargs)
+        if self.pk is not None:
+            old_jumlah = Produksi.objects.filter(pk=self.pk).values_list('jumlahHasil', flat=True).first() or 0
         
         # Update product stock after saving
         if self.jenisHasil == 'Tahu':
@@ -101,8 +123,11 @@ class Produksi(models.Model):
         # Adjust stock based on the difference
         # Convert to int to ensure proper arithmetic
         stock_difference = int(self.jumlahHasil) - int(old_jumlah)
-        produk.stok += stock_difference
-        produk.save()
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # UPDATE stok = stok + selisih (F()) plus baris jurnal, tanpa read-modify-write
+            tambah_stok({produk.pk: stock_difference}, 'Produksi Masuk', produksi=self)
 
     def __str__(self):
         return f"Produksi {self.jenisHasil} oleh {self.idKaryawan}"
@@ -140,28 +165,39 @@ class DetailProduksi(models.Model):
         super().clean()
 
     def save(self, *args, **kwargs):
-        # Call clean method before saving
-        self.clean()
-        
-        # Check if this is an update to an existing record
-        is_update = self.pk is not None
-        
+        from .stok import kurangi_stok, tambah_stok, StokTidakCukup
+
         # Get the old quantity if this is an update
         old_jumlah = 0
-        if is_update:
-            old_instance = DetailProduksi.objects.get(pk=self.pk)
-            old_jumlah = old_instance.jumlahBahanTerpakai
+        if self.pk is not None:
+            old_jumlah = DetailProduksi.objects.filter(pk=self.pk).values_list(
+                'jumlahBahanTerpakai', flat=True
+            ).first() or 0
             
-        super().save(*args, **kwargs)
-        
         # Adjust stock based on the difference
         # Convert to int to ensure proper arithmetic
         stock_difference = int(self.jumlahBahanTerpakai) - int(old_jumlah)
         
-        # Reduce stock of raw materials
-        if self.idProduk.jenisProduk == 'Bahan Baku':
-            self.idProduk.stok -= stock_difference
-            self.idProduk.save()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            # Reduce stock of raw materials (conditional UPDATE, tidak bisa minus)
+            if self.idProduk.jenisProduk == 'Bahan Baku':
+                try:
+                    if stock_difference > 0:
+                        kurangi_stok({self.idProduk_id: stock_difference}, 'Bahan Keluar', produksi=self.idProduksi)
+                    elif stock_difference < 0:
+                        # Bahan terpakai dikoreksi turun: sisa bahan kembali masuk sebagai penyesuaian
+                        tambah_stok(
+                            {self.idProduk_id: -stock_difference}, 'Penyesuaian', produksi=self.idProduksi,
+                            keterangan='Koreksi bahan terpakai'
+                        )
+                except StokTidakCukup as e:
+                    baris = e.gagal[0]
+                    raise ValidationError(
+                        f"Stok {self.idProduk.namaProduk} (Stok: {baris['tersedia']}) tidak mencukupi untuk bahan terpakai {self.jumlahBahanTerpakai}."
+                    )
+                self.idProduk.stok -= stock_difference
 
     def __str__(self):
         return f"Detail Produksi {self.idProduksi}"
@@ -174,6 +210,7 @@ class Pelanggan(models.Model):
     noTelp = models.CharField(max_length=15)
     username = models.CharField(max_length=50, unique=True)
     password = models.CharField(max_length=255)
+    diubah = models.DateTimeField(auto_now=True, db_index=True)  # Nama pelanggan tercetak di laporan penjualan
 
     class Meta:
         db_table = 'pelanggan'
@@ -209,9 +246,20 @@ class Pemesanan(models.Model):
     buktiBayar = models.ImageField(upload_to='bukti_pembayaran/', null=True, blank=True)
     alamatPengiriman = models.TextField(default='Alamat belum diisi')
     ongkosKirim = models.DecimalField(max_digits=10, decimal_places=0, default=0)  # Diisi Admin
+    diubah = models.DateTimeField(auto_now=True, db_index=True)  # Stempel versi data laporan
 
     class Meta:
         db_table = 'pemesanan'
+        indexes = [
+            # Riwayat & notifikasi pelanggan: idPelanggan = ... urut tanggal terbaru
+            models.Index(fields=['idPelanggan', '-tanggalPemesanan', '-idPemesanan'], name='pemesanan_plg_tgl_idx'),
+            # Badge Jazzmin, laporan per status, rekap harian: status = ... AND rentang tanggal;
+            # pelanggan dan total ikut disimpan supaya analitik pelanggan teratas tidak membaca tabel.
+            # Menggantikan pemesanan_status_tgl_idx (status, tanggalPemesanan) di migrasi 0012; kedua kolomnya prefiks indeks ini
+            models.Index(fields=['status', 'tanggalPemesanan', 'idPelanggan', 'totalPemesanan'], name='pemesanan_status_tgl_cover_idx'),
+            # Laporan penjualan tanpa filter status: rentang tanggal, urut tanggal terbaru
+            models.Index(fields=['-tanggalPemesanan', '-idPemesanan'], name='pemesanan_tgl_idx'),
+        ]
 
     class Admin:
         verbose_name = 'Pemesanan'
@@ -234,6 +282,10 @@ class DetailPemesanan(models.Model):
 
     class Meta:
         db_table = 'detail_pemesanan'
+        indexes = [
+            # Baris per pesanan untuk rekap produk (core/signals.py, core/rekap.py) dibaca dari indeks saja
+            models.Index(fields=['idKoleksiPemesanan', 'idProduk', 'kuantiti', 'subTotal'], name='detail_pesanan_produk_idx'),
+        ]
 
     class Admin:
         verbose_name = 'Detail Pemesanan'
@@ -259,4 +311,293 @@ class DetailPemesanan(models.Model):
         # No stock adjustment here anymore
 
     def __str__(self):
-        return f"Detail Pemesanan {self.idKoleksiPemesanan}"
\ No newline at end of file
+        return f"Detail Pemesanan {self.idKoleksiPemesanan}"
+
+class RekapPenjualanHarian(models.Model):
+    # Rekap harian Pemesanan per status, dijaga oleh signal di core/signals.py
+    idRekap = models.AutoField(primary_key=True)
+    tanggal = models.DateField()
+    status = models.CharField(max_length=50, choices=Pemesanan.STATUS_CHOICES)
+    jumlahPemesanan = models.IntegerField(default=0)
+    totalPendapatan = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'rekap_penjualan_harian'
+        constraints = [
+            models.UniqueConstraint(fields=['tanggal', 'status'], name='rekap_tanggal_status_unik'),
+        ]
+
+    class Admin:
+        verbose_name = 'Rekap Penjualan Harian'
+        verbose_name_plural = 'Rekap Penjualan Harian'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"Rekap {self.tanggal} {self.status}"
+
+
+class RekapProdukHarian(models.Model):
+    # Penjualan harian per produk dari pesanan Selesai (bauran produk core/analitik.py), dijaga oleh signal.
+    # Tanpa FK constraint: baris rekap tidak ikut dihapus berantai, signal detail yang menolkannya
+    idRekap = models.AutoField(primary_key=True)
+    tanggal = models.DateField()
+    idProduk = models.ForeignKey(Produk, on_delete=models.DO_NOTHING, db_constraint=False)
+    kuantiti = models.BigIntegerField(default=0)
+    totalPendapatan = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'rekap_produk_harian'
+        constraints = [
+            models.UniqueConstraint(fields=['tanggal', 'idProduk'], name='rekap_produk_tanggal_unik'),
+        ]
+
+    class Admin:
+        verbose_name = 'Rekap Produk Harian'
+        verbose_name_plural = 'Rekap Produk Harian'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"Rekap {self.tanggal} {self.idProduk_id}"
+
+
+class RekapPelangganBulanan(models.Model):
+    # Belanja bulanan per pelanggan dari pesanan Selesai (pelanggan teratas core/analitik.py), dijaga oleh signal
+    idRekap = models.AutoField(primary_key=True)
+    bulan = models.DateField()  # Tanggal 1 bulan tersebut
+    idPelanggan = models.ForeignKey(Pelanggan, on_delete=models.DO_NOTHING, db_constraint=False)
+    jumlahPemesanan = models.IntegerField(default=0)
+    totalPendapatan = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'rekap_pelanggan_bulanan'
+        constraints = [
+            models.UniqueConstraint(fields=['bulan', 'idPelanggan'], name='rekap_pelanggan_bulan_unik'),
+        ]
+
+    class Admin:
+        verbose_name = 'Rekap Pelanggan Bulanan'
+        verbose_name_plural = 'Rekap Pelanggan Bulanan'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"Rekap {self.bulan} {self.idPelanggan_id}"
+
+
+def penyimpanan_antrian_laporan():
+    # Di luar MEDIA_ROOT (tanpa URL publik): PDF hanya bisa diunduh lewat view khusus staf
+    return FileSystemStorage(
+        location=getattr(settings, 'ANTRIAN_LAPORAN_DIR', os.path.join(settings.BASE_DIR, 'cache', 'antrian')),
+        base_url=None,
+    )
+
+
+class AntrianLaporan(models.Model):
+    # Antrian render PDF laporan, diproses oleh command jalankan_antrian_laporan
+    STATUS_AKTIF = ['Menunggu', 'Diproses']
+    JENIS_CHOICES = [
+        ('penjualan', 'Laporan Penjualan'),
+        ('produk', 'Laporan Produk'),
+        ('produksi', 'Laporan Produksi'),
+    ]
+    STATUS_CHOICES = [
+        ('Menunggu', 'Menunggu'),
+        ('Diproses', 'Diproses'),
+        ('Selesai', 'Selesai'),
+        ('Gagal', 'Gagal'),
+    ]
+
+    idAntrian = models.AutoField(primary_key=True)
+    jenisLaporan = models.CharField(max_length=20, choices=JENIS_CHOICES)
+    parameter = models.JSONField(default=dict, blank=True)
+    kunci = models.CharField(max_length=64)  # sha256 dari jenis + parameter yang dinormalisasi
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Menunggu')
+    berkas = models.FileField(upload_to='laporan/', storage=penyimpanan_antrian_laporan, null=True, blank=True)
+    pesanError = models.TextField(blank=True, null=True)
+    dibuat = models.DateTimeField(auto_now_add=True)
+    dimulai = models.DateTimeField(null=True, blank=True)
+    selesai = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'antrian_laporan'
+        indexes = [
+            models.Index(fields=['status', 'dibuat'], name='antrian_status_dibuat_idx'),
+            models.Index(fields=['kunci', 'status'], name='antrian_kunci_status_idx'),
+        ]
+        constraints = [
+            # Paling banyak satu job aktif per filter + versi data, juga saat dua klik bersamaan
+            models.UniqueConstraint(
+                fields=['kunci'], condition=models.Q(status__in=['Menunggu', 'Diproses']), name='antrian_kunci_aktif_unik'
+            ),
+        ]
+
+    class Admin:
+        verbose_name = 'Antrian Laporan'
+        verbose_name_plural = 'Antrian Laporan'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"Laporan {self.jenisLaporan} #{self.idAntrian} ({self.status})"
+
+
+class StatistikCacheLaporan(models.Model):
+    # Penghitung hit/miss cache PDF laporan (core/cache_laporan.py)
+    jenisLaporan = models.CharField(max_length=20, primary_key=True, choices=AntrianLaporan.JENIS_CHOICES)
+    hit = models.BigIntegerField(default=0)
+    miss = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'statistik_cache_laporan'
+
+    class Admin:
+        verbose_name = 'Statistik Cache Laporan'
+        verbose_name_plural = 'Statistik Cache Laporan'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"Cache {self.jenisLaporan}"
+
+
+class Penghitung(models.Model):
+    # Penghitung yang dijaga incremental (core/penghitung.py), dibaca O(1) oleh badge & dashboard admin
+    nama = models.CharField(max_length=50, primary_key=True)
+    nilai = models.BigIntegerField(default=0)
+    diperbarui = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'penghitung'
+
+    class Admin:
+        verbose_name = 'Penghitung'
+        verbose_name_plural = 'Penghitung'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"{self.nama} = {self.nilai}"
+
+
+class Keranjang(models.Model):
+    # Keranjang belanja per pelanggan; primary key = idPelanggan supaya item bisa ditulis tanpa lookup
+    idPelanggan = models.OneToOneField(Pelanggan, on_delete=models.CASCADE, primary_key=True)
+    dibuat = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'keranjang'
+
+    class Admin:
+        verbose_name = 'Keranjang'
+        verbose_name_plural = 'Keranjang'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"Keranjang {self.idPelanggan}"
+
+
+class KeranjangItem(models.Model):
+    idItem = models.AutoField(primary_key=True)
+    idKeranjang = models.ForeignKey(Keranjang, on_delete=models.CASCADE)
+    idProduk = models.ForeignKey(Produk, on_delete=models.CASCADE)
+    kuantiti = models.IntegerField()
+    hargaSnapshot = models.IntegerField()  # Harga produk saat pertama dimasukkan ke keranjang
+    ditambahkan = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'keranjang_item'
+        constraints = [
+            models.UniqueConstraint(fields=['idKeranjang', 'idProduk'], name='keranjang_item_produk_unik'),
+        ]
+
+    class Admin:
+        verbose_name = 'Item Keranjang'
+        verbose_name_plural = 'Item Keranjang'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"{self.idProduk} x {self.kuantiti}"
+
+
+class MutasiStok(models.Model):
+    # Jurnal pergerakan stok (append-only); Produk.stok adalah saldo yang didenormalisasi dari sini
+    JENIS_CHOICES = [
+        ('Saldo Awal', 'Saldo Awal'),
+        ('Produksi Masuk', 'Produksi Masuk'),
+        ('Bahan Keluar', 'Bahan Keluar'),
+        ('Penjualan', 'Penjualan'),
+        ('Pembatalan', 'Pembatalan'),
+        ('Penyesuaian', 'Penyesuaian'),
+    ]
+
+    idMutasi = models.AutoField(primary_key=True)
+    idProduk = models.ForeignKey(Produk, on_delete=models.CASCADE)
+    jenisMutasi = models.CharField(max_length=20, choices=JENIS_CHOICES)
+    jumlah = models.IntegerField()  # Positif = stok masuk, negatif = stok keluar
+    waktu = models.DateTimeField(auto_now_add=True)
+    # Referensi sumber mutasi; jurnal tetap utuh walau pesanan/produksinya dihapus
+    idPemesanan = models.ForeignKey(Pemesanan, on_delete=models.SET_NULL, null=True, blank=True)
+    idProduksi = models.ForeignKey(Produksi, on_delete=models.SET_NULL, null=True, blank=True)
+    keterangan = models.CharField(max_length=255, blank=True, null=True)
+
+    class Meta:
+        db_table = 'mutasi_stok'
+        indexes = [
+            # Kartu stok per produk & rekonsiliasi saldo
+            models.Index(fields=['idProduk', 'waktu'], name='mutasi_produk_waktu_idx'),
+        ]
+
+    class Admin:
+        verbose_name = 'Mutasi Stok'
+        verbose_name_plural = 'Mutasi Stok'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"{self.jenisMutasi} {self.idProduk} {self.jumlah:+}"
+
+
+class SnapshotStok(models.Model):
+    # Saldo stok per produk di akhir hari, ditulis oleh command snapshot_stok (core/snapshot.py)
+    idSnapshot = models.AutoField(primary_key=True)
+    tanggal = models.DateField()
+    idProduk = models.ForeignKey(Produk, on_delete=models.CASCADE)
+    stok = models.IntegerField()
+
+    class Meta:
+        db_table = 'snapshot_stok'
+        constraints = [
+            # Sekaligus indeks untuk mencari snapshot terakhir <= tanggal tertentu
+            models.UniqueConstraint(fields=['tanggal', 'idProduk'], name='snapshot_stok_tanggal_produk_unik'),
+        ]
+
+    class Admin:
+        verbose_name = 'Snapshot Stok'
+        verbose_name_plural = 'Snapshot Stok'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"Stok {self.idProduk} {self.tanggal} = {self.stok}"
+
+
+class Resep(models.Model):
+    # Resep (bill of materials) per jenis hasil: bahan baku untuk satu takaran sebanyak hasilPerBatch
+    idResep = models.AutoField(primary_key=True)
+    jenisHasil = models.CharField(max_length=50, choices=[('Tahu', 'Tahu'), ('Tempe', 'Tempe')], unique=True)
+    hasilPerBatch = models.PositiveIntegerField()
+    satuanHasil = models.CharField(max_length=20)
+
+    class Meta:
+        db_table = 'resep'
+
+    class Admin:
+        verbose_name = 'Resep'
+        verbose_name_plural = 'Resep'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"Resep {self.jenisHasil} ({self.hasilPerBatch} {self.satuanHasil})"
+
+
+class DetailResep(models.Model):
+    idDetailResep = models.AutoField(primary_key=True)
+    idResep = models.ForeignKey(Resep, on_delete=models.CASCADE)
+    idProduk = models.ForeignKey(Produk, on_delete=models.CASCADE, limit_choices_to={'jenisProduk': 'Bahan Baku'})
+    jumlahBahan = models.DecimalField(max_digits=10, decimal_places=3)  # Per takaran resep
+
+    class Meta:
+        db_table = 'detail_resep'
+        constraints = [
+            models.UniqueConstraint(fields=['idResep', 'idProduk'], name='detail_resep_produk_unik'),
+        ]
+
+    class Admin:
+        verbose_name = 'Detail Resep'
+        verbose_name_plural = 'Detail Resep'  # Menghilangkan pluralisasi default
+
+    def __str__(self):
+        return f"{self.idProduk} x {self.jumlahBahan}"
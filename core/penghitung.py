@@ -0,0 +1,89 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from .basisdata import transaksi_tulis
+from .models import Pemesanan, Penghitung
+
+
+# Status pemesanan yang perlu ditindaklanjuti admin (badge Jazzmin & kartu dashboard)
+STATUS_PERHATIAN = ['Diproses', 'Dikirim']
+
+
+def nama_status(status):
+    """Counter name for the number of orders in a status"""
+    return f'pemesanan:{status}'
+
+
+def tambah_atomik(model, lookup, **delta):
+    """
+    Add ``delta`` to the fields of the row matching ``lookup``, creating it when missing.
+
+    One F() UPDATE in the common case. The row is only created when the
+    UPDATE matched nothing; a concurrent create of the same row fails on its
+    unique constraint and falls back to the UPDATE.
+    """
+    perubahan = {kolom: F(kolom) + nilai for kolom, nilai in delta.items()}
+    if model.objects.filter(**lookup).update(**perubahan):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **delta)
+    except IntegrityError:
+        # Dibuat oleh request lain di antara update dan create
+        model.objects.filter(**lookup).update(**perubahan)
+
+
+def ubah_penghitung(perubahan):
+    """Apply {nama: delta} to the counters with one F() UPDATE each"""
+    for nama, delta in perubahan.items():
+        if delta:
+            tambah_atomik(Penghitung, {'nama': nama}, nilai=delta)
+
+
+def baca_penghitung(*nama):
+    """Current values of the given counters in one primary-key query (missing counters read 0)"""
+    nilai = dict(Penghitung.objects.filter(nama__in=nama).values_list('nama', 'nilai'))
+    return {n: nilai.get(n, 0) for n in nama}
+
+
+def jumlah_pemesanan_per_status():
+    """Order count per status, read from the counters"""
+    nilai = baca_penghitung(*(nama_status(status) for status, _ in Pemesanan.STATUS_CHOICES))
+    return {status: nilai[nama_status(status)] for status, _ in Pemesanan.STATUS_CHOICES}
+
+
+def jumlah_pesanan_perhatian():
+    """Orders waiting for admin action, read from the counters"""
+    return sum(baca_penghitung(*(nama_status(status) for status in STATUS_PERHATIAN)).values())
+
+
+def hitung_pemesanan_per_status():
+    """Order count per status computed from the pemesanan table"""
+    jumlah = dict(Pemesanan.objects.values_list('status').annotate(n=Count('pk')).order_by())
+    return {nama_status(status): jumlah.get(status, 0) for status, _ in Pemesanan.STATUS_CHOICES}
+
+
+def rekonsiliasi_penghitung():
+    """
+    Reset the order counters to the real counts; returns {nama: (tercatat, seharusnya)} for drifted ones.
+
+    The counter rows are locked first, so a concurrent status change either
+    lands before the recount or applies its delta on top of the new value.
+    """
+    with transaksi_tulis():
+        tercatat = dict(
+            Penghitung.objects.select_for_update()
+            .filter(nama__startswith='pemesanan:')
+            .values_list('nama', 'nilai')
+        )
+        seharusnya = hitung_pemesanan_per_status()
+        for nama in tercatat.keys() - seharusnya.keys():
+            seharusnya[nama] = 0
+
+        for nama, nilai in seharusnya.items():
+            if tercatat.get(nama) != nilai:
+                Penghitung.objects.update_or_create(nama=nama, defaults={'nilai': nilai})
+        return {
+            nama: (tercatat.get(nama, 0), nilai)
+            for nama, nilai in seharusnya.items()
+            if tercatat.get(nama, 0) != nilai
+        }
@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# Pengaturan profiler (lihat PROFILER_SQL di settings); middleware hanya terpasang bila PROFILER_SQL=1
+PENGATURAN = {
+    'LOG': os.path.join(settings.BASE_DIR, 'log', 'profiler_sql.jsonl'),
+    'SAMPEL': 1.0,
+    'AMBANG_N1': 5,
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'BACKUP': 5,
+    **getattr(settings, 'PROFILER_SQL', {}),
+}
+
+# Rekaman request yang sedang berjalan; contextvar ikut terbawa ke thread sync_to_async
+_rekaman = ContextVar('profiler_sql', default=None)
+
+_POLA_IN = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_POLA_STRING = re.compile(r"'(?:[^']|'')*'")
+_POLA_ANGKA = re.compile(r'\b\d+\b')
+
+
+def sidik_query(sql):
+    """Fingerprint of a statement: literals and IN-list lengths removed, so only the shape remains"""
+    sql = _POLA_IN.sub('IN (...)', sql)
+    sql = _POLA_STRING.sub('?', sql)
+    return _POLA_ANGKA.sub('?', sql)
+
+
+class RekamanQuery:
+    """Queries executed during one request"""
+
+    def __init__(self):
+        self.jumlah = 0
+        self.durasi = 0.0
+        self.per_sidik = Counter()
+        self.per_query = Counter()
+
+    def catat(self, sql, params, durasi):
+        self.jumlah += 1
+        self.durasi += durasi
+        self.per_sidik[sidik_query(sql)] += 1
+        self.per_query[(sql, repr(params))] += 1
+
+    def duplikat(self):
+        """Identical statements (same SQL and parameters) run more than once"""
+        jumlah = Counter()
+        for (sql, _), n in self.per_query.items():
+            if n > 1:
+                jumlah[sidik_query(sql)] += n
+        return [{'sql': sql, 'jumlah': n} for sql, n in jumlah.most_common()]
+
+    def n_plus_1(self, ambang):
+        """Statement shapes repeated at least ``ambang`` times, the usual sign of a query inside a loop"""
+        return [{'sql': sql, 'jumlah': n} for sql, n in self.per_sidik.most_common() if n >= ambang]
+
+
+def _rekam(execute, sql, params, many, context):
+    rekaman = _rekaman.get()
+    if rekaman is None:
+        return execute(sql, params, many, context)
+    mulai = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        rekaman.catat(sql, params, time.perf_counter() - mulai)
+
+
+def _pasang(sender=None, connection=None, **kwargs):
+    # execute_wrappers bertahan selama objek koneksi hidup, termasuk saat koneksi dibuka ulang
+    if _rekam not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_rekam)
+
+
+# Satu handler per file log per proses, dipakai bersama oleh semua instance middleware
+_log = {}
+
+
+def _log_berkas(path):
+    if path not in _log:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=PENGATURAN['MAX_BYTES'], backupCount=PENGATURAN['BACKUP'], encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        log = logging.Logger(f'core.profiler:{path}')
+        log.addHandler(handler)
+        _log[path] = log
+    return _log[path]
+
+
+class ProfilerQueryMiddleware:
+    """
+    Per-request SQL profiler.
+
+    Counts queries and SQL time, finds duplicate statements and N+1
+    patterns, adds a Server-Timing header and writes a sample of requests
+    (plus every request flagged as N+1) to a rotating JSONL log that
+    ``manage.py laporan_profiler`` aggregates per view.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_pasang, dispatch_uid='core.profiler')
+        for connection in connections.all(initialized_only=True):
+            _pasang(connection=connection)
+        self.log = _log_berkas(PENGATURAN['LOG'])
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        rekaman, token, mulai = self._mulai()
+        try:
+            response = self.get_response(request)
+        finally:
+            _rekaman.reset(token)
+        return self._selesai(request, response, rekaman, mulai)
+
+    async def __acall__(self, request):
+        rekaman, token, mulai = self._mulai()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _rekaman.reset(token)
+        return self._selesai(request, response, rekaman, mulai)
+
+    def _mulai(self):
+        rekaman = RekamanQuery()
+        return rekaman, _rekaman.set(rekaman), time.perf_counter()
+
+    def _selesai(self, request, response, rekaman, mulai):
+        durasi = time.perf_counter() - mulai
+        response['Server-Timing'] = (
+            f'sql;dur={rekaman.durasi * 1000:.1f};desc="{rekaman.jumlah} query", '
+            f'total;dur={durasi * 1000:.1f}'
+        )
+
+        n_plus_1 = rekaman.n_plus_1(PENGATURAN['AMBANG_N1'])
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '-'
+        if n_plus_1:
+            logger.warning('Pola N+1 di %s: %s', view, ', '.join(f"{q['jumlah']}x {q['sql'][:80]}" for q in n_plus_1))
+        if n_plus_1 or random.random() < PENGATURAN['SAMPEL']:
+            self.log.info(json.dumps({
+                'waktu': timezone.now().isoformat(),
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'durasi_ms': round(durasi * 1000, 2),
+                'jumlah_query': rekaman.jumlah,
+                'sql_ms': round(rekaman.durasi * 1000, 2),
+                'duplikat': rekaman.duplikat(),
+                'n_plus_1': n_plus_1,
+            }))
+        return response
+
+
+def baca_log(path=None):
+    """Records of the profiler log and its rotated backups, oldest file first"""
+    path = path or PENGATURAN['LOG']
+    berkas = [f'{path}.{i}' for i in range(PENGATURAN['BACKUP'], 0, -1)] + [path]
+    for nama in berkas:
+        try:
+            with open(nama, encoding='utf-8') as f:
+                for baris in f:
+                    if baris.strip():
+                        yield json.loads(baris)
+        except FileNotFoundError:
+            continue
@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from .models import DetailPemesanan, Pemesanan, RekapPelangganBulanan, RekapPenjualanHarian, RekapProdukHarian
+from .penghitung import tambah_atomik
+
+
+# Rekap produk dan pelanggan hanya memuat pesanan yang sudah selesai (pendapatan)
+STATUS_PENDAPATAN = 'Selesai'
+
+
+def catat_rekap(tanggal, status, jumlah, total):
+    """Apply a delta to the (tanggal, status) bucket of the daily rollup"""
+    if not jumlah and not total:
+        return
+    tambah_atomik(
+        RekapPenjualanHarian, {'tanggal': tanggal, 'status': status},
+        jumlahPemesanan=jumlah, totalPendapatan=total,
+    )
+
+
+def catat_rekap_produk(tanggal, baris, tanda):
+    """Add (``tanda`` 1) or remove (-1) order lines ``(produk_id, kuantiti, subTotal)`` from the daily product rollup"""
+    for produk_id, kuantiti, subtotal in baris:
+        tambah_atomik(
+            RekapProdukHarian, {'tanggal': tanggal, 'idProduk_id': produk_id},
+            kuantiti=tanda * kuantiti, totalPendapatan=tanda * subtotal,
+        )
+
+
+def catat_rekap_pelanggan(tanggal, pelanggan_id, jumlah, total):
+    """Apply a delta to the customer's bucket of the monthly customer rollup"""
+    tambah_atomik(
+        RekapPelangganBulanan, {'bulan': tanggal.replace(day=1), 'idPelanggan_id': pelanggan_id},
+        jumlahPemesanan=jumlah, totalPendapatan=total,
+    )
+
+
+def rebuild_rekap():
+    """Rebuild the daily, product and customer rollups from the pemesanan tables, returns the daily bucket count"""
+    buckets = (
+        Pemesanan.objects
+        .values('tanggalPemesanan', 'status')
+        .annotate(jumlah=Count('idPemesanan'), total=Sum('totalPemesanan'))
+        .order_by()
+    )
+    produk = (
+        DetailPemesanan.objects
+        .filter(idKoleksiPemesanan__status=STATUS_PENDAPATAN)
+        .values('idKoleksiPemesanan__tanggalPemesanan', 'idProduk')
+        .annotate(kuantiti=Sum('kuantiti'), total=Sum('subTotal'))
+        .order_by()
+    )
+    pelanggan = (
+        Pemesanan.objects
+        .filter(status=STATUS_PENDAPATAN)
+        .annotate(bulan=TruncMonth('tanggalPemesanan'))
+        .values('bulan', 'idPelanggan')
+        .annotate(jumlah=Count('idPemesanan'), total=Sum('totalPemesanan'))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        RekapPenjualanHarian.objects.all().delete()
+        RekapPenjualanHarian.objects.bulk_create(
+            [
+                RekapPenjualanHarian(
+                    tanggal=bucket['tanggalPemesanan'],
+                    status=bucket['status'],
+                    jumlahPemesanan=bucket['jumlah'],
+                    totalPendapatan=bucket['total'] or 0,
+                )
+                for bucket in buckets
+            ],
+            batch_size=500,
+        )
+        RekapProdukHarian.objects.all().delete()
+        RekapProdukHarian.objects.bulk_create(
+            [
+                RekapProdukHarian(
+                    tanggal=bucket['idKoleksiPemesanan__tanggalPemesanan'],
+                    idProduk_id=bucket['idProduk'],
+                    kuantiti=bucket['kuantiti'],
+                    totalPendapatan=bucket['total'],
+                )
+                for bucket in produk
+            ],
+            batch_size=500,
+        )
+        RekapPelangganBulanan.objects.all().delete()
+        RekapPelangganBulanan.objects.bulk_create(
+            [
+                RekapPelangganBulanan(
+                    bulan=bucket['bulan'],
+                    idPelanggan_id=bucket['idPelanggan'],
+                    jumlahPemesanan=bucket['jumlah'],
+                    totalPendapatan=bucket['total'] or 0,
+                )
+                for bucket in pelanggan
+            ],
+            batch_size=500,
+        )
+        return RekapPenjualanHarian.objects.count()
+
+
+def rekap_bulanan():
+    """Monthly totals per status, read from the rollup in a single query"""
+    return (
+        RekapPenjualanHarian.objects
+        .annotate(bulan=TruncMonth('tanggal'))
+        .values('bulan', 'status')
+        .annotate(jumlah=Sum('jumlahPemesanan'), total=Sum('totalPendapatan'))
+        .order_by('bulan')
+    )
+
+
+def awal_bulan_mundur(tanggal, n):
+    """First day of the month that lies n calendar months before tanggal"""
+    index = tanggal.year * 12 + tanggal.month - 1 - n
+    return tanggal.replace(year=index // 12, month=index % 12 + 1, day=1)
@@ -0,0 +1,88 @@
+from datetime import date
+
+from django.core import signing
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import DetailPemesanan, Pemesanan
+
+
+# Jumlah pesanan per halaman riwayat pelanggan
+UKURAN_HALAMAN = 20
+
+SALT_CURSOR = 'core.riwayat.cursor'
+
+
+def buat_cursor(pesanan):
+    """Opaque, signed cursor pointing just after ``pesanan`` in the history order"""
+    return signing.dumps([pesanan.tanggalPemesanan.isoformat(), pesanan.idPemesanan], salt=SALT_CURSOR, compress=True)
+
+
+def baca_cursor(cursor):
+    """(tanggal, id) of a cursor, or None if it is missing, tampered with or malformed"""
+    if not cursor:
+        return None
+    try:
+        tanggal, pesanan_id = signing.loads(cursor, salt=SALT_CURSOR)
+        return date.fromisoformat(tanggal), int(pesanan_id)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def _jumlah_item():
+    # Subquery berkorelasi: tetap satu query dan tidak merusak seek di indeks pemesanan_plg_tgl_idx
+    return Coalesce(
+        Subquery(
+            DetailPemesanan.objects
+            .filter(idKoleksiPemesanan=OuterRef('pk'))
+            .order_by()
+            .values('idKoleksiPemesanan')
+            .annotate(n=Count('pk'))
+            .values('n'),
+            output_field=IntegerField()
+        ),
+        Value(0)
+    )
+
+
+def _queryset_riwayat(pelanggan_id, cursor):
+    queryset = (
+        Pemesanan.objects
+        .filter(idPelanggan_id=pelanggan_id)
+        .only('idPemesanan', 'tanggalPemesanan', 'totalPemesanan', 'ongkosKirim', 'status')
+        .annotate(jumlah_item=_jumlah_item())
+        .order_by('-tanggalPemesanan', '-idPemesanan')
+    )
+
+    posisi = baca_cursor(cursor)
+    if posisi:
+        tanggal, pesanan_id = posisi
+        # tanggal <= x memberi rentang pada indeks, sisanya memotong tanggal yang sama
+        queryset = queryset.filter(tanggalPemesanan__lte=tanggal).filter(
+            Q(tanggalPemesanan__lt=tanggal) | Q(idPemesanan__lt=pesanan_id)
+        )
+    return queryset
+
+
+def _potong_halaman(pesanan_list, ukuran):
+    # Satu baris ekstra diambil hanya untuk tahu apakah masih ada halaman berikutnya
+    if len(pesanan_list) > ukuran:
+        pesanan_list = pesanan_list[:ukuran]
+        return pesanan_list, buat_cursor(pesanan_list[-1])
+    return pesanan_list, None
+
+
+def halaman_riwayat(pelanggan_id, cursor=None, ukuran=UKURAN_HALAMAN):
+    """
+    One page of a customer's orders, newest first, with item counts (one query).
+
+    Seeks on (tanggalPemesanan, idPemesanan) instead of OFFSET, so every
+    page costs the same however long the history is. Returns the orders
+    and the cursor of the next page (None on the last page).
+    """
+    return _potong_halaman(list(_queryset_riwayat(pelanggan_id, cursor)[:ukuran + 1]), ukuran)
+
+
+async def ahalaman_riwayat(pelanggan_id, cursor=None, ukuran=UKURAN_HALAMAN):
+    """Async variant of halaman_riwayat for ASGI views"""
+    queryset = _queryset_riwayat(pelanggan_id, cursor)[:ukuran + 1]
+    return _potong_halaman([pesanan async for pesanan in queryset], ukuran)
@@ -0,0 +1,232 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from .models import DetailPemesanan, DetailProduksi, MutasiStok, Pemesanan, Produk, Produksi
+from .analitik import invalidasi_analitik
+from .biaya_produksi import perbarui_biaya
+from .katalog import invalidasi_katalog
+from .rekap import STATUS_PENDAPATAN, catat_rekap, catat_rekap_pelanggan, catat_rekap_produk
+from .thumbnail import buat_thumbnail, hapus_thumbnail
+from .penghitung import nama_status, ubah_penghitung
+from .statistik_karyawan import invalidasi_statistik
+
+
+@receiver(pre_save, sender=Pemesanan)
+def simpan_nilai_lama_pemesanan(sender, instance, raw=False, **kwargs):
+    # Ambil nilai lama dari DB supaya rekap bisa dikoreksi setelah save
+    instance._rekap_lama = None
+    if raw or instance.pk is None:
+        return
+    instance._rekap_lama = (
+        Pemesanan.objects
+        .filter(pk=instance.pk)
+        .values_list('tanggalPemesanan', 'status', 'totalPemesanan', 'idPelanggan')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Pemesanan)
+def perbarui_rekap_pemesanan(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    baru = (instance.tanggalPemesanan, instance.status, int(instance.totalPemesanan or 0), instance.idPelanggan_id)
+    lama = getattr(instance, '_rekap_lama', None)
+    if lama == baru:
+        return
+    if lama is None or lama[:3] != baru[:3]:
+        if lama is not None:
+            catat_rekap(lama[0], lama[1], -1, -int(lama[2] or 0))
+        catat_rekap(baru[0], baru[1], 1, baru[2])
+
+    # Penghitung per status hanya berubah saat pesanan baru atau status berpindah
+    if lama is None:
+        ubah_penghitung({nama_status(baru[1]): 1})
+    elif lama[1] != baru[1]:
+        ubah_penghitung({nama_status(lama[1]): -1, nama_status(baru[1]): 1})
+
+    _perbarui_rekap_selesai(instance.pk, lama, baru)
+
+
+def _perbarui_rekap_selesai(pemesanan_id, lama, baru):
+    # Rekap produk dan pelanggan hanya memuat pesanan Selesai: kontribusi lama dikeluarkan, yang baru dimasukkan
+    selesai_lama = lama is not None and lama[1] == STATUS_PENDAPATAN
+    selesai_baru = baru[1] == STATUS_PENDAPATAN
+    if selesai_lama:
+        catat_rekap_pelanggan(lama[0], lama[3], -1, -int(lama[2] or 0))
+    if selesai_baru:
+        catat_rekap_pelanggan(baru[0], baru[3], 1, baru[2])
+
+    # Perubahan baris detail dicatat oleh signal detail; di sini baris hanya pindah saat status atau tanggal berubah
+    if (selesai_lama and selesai_baru and lama[0] == baru[0]) or not (selesai_lama or selesai_baru):
+        return
+    baris = list(
+        DetailPemesanan.objects.filter(idKoleksiPemesanan=pemesanan_id).values_list('idProduk', 'kuantiti', 'subTotal')
+    )
+    if selesai_lama:
+        catat_rekap_produk(lama[0], baris, -1)
+    if selesai_baru:
+        catat_rekap_produk(baru[0], baris, 1)
+
+
+@receiver(post_delete, sender=Pemesanan)
+def hapus_rekap_pemesanan(sender, instance, **kwargs):
+    # Baris detailnya sudah dihapus lebih dulu (cascade) dan dikeluarkan dari rekap produk oleh signal detail
+    total = int(instance.totalPemesanan or 0)
+    catat_rekap(instance.tanggalPemesanan, instance.status, -1, -total)
+    ubah_penghitung({nama_status(instance.status): -1})
+    if instance.status == STATUS_PENDAPATAN:
+        catat_rekap_pelanggan(instance.tanggalPemesanan, instance.idPelanggan_id, -1, -total)
+
+
+def _tanggal_selesai(pemesanan_ids):
+    # {id pesanan: tanggal} untuk pesanan yang berstatus Selesai
+    return dict(
+        Pemesanan.objects.filter(pk__in=pemesanan_ids, status=STATUS_PENDAPATAN)
+        .values_list('idPemesanan', 'tanggalPemesanan')
+    )
+
+
+@receiver(pre_save, sender=DetailPemesanan)
+def simpan_nilai_lama_detail(sender, instance, raw=False, **kwargs):
+    instance._rekap_lama = None
+    if raw or instance.pk is None:
+        return
+    instance._rekap_lama = (
+        DetailPemesanan.objects
+        .filter(pk=instance.pk)
+        .values_list('idKoleksiPemesanan', 'idProduk', 'kuantiti', 'subTotal')
+        .first()
+    )
+
+
+@receiver(post_save, sender=DetailPemesanan)
+def perbarui_rekap_produk_detail(sender, instance, raw=False, **kwargs):
+    # Detail dari simpan_pemesanan (bulk_create) milik pesanan baru yang belum Selesai
+    if raw:
+        return
+    baru = (instance.idKoleksiPemesanan_id, instance.idProduk_id, int(instance.kuantiti), int(instance.subTotal))
+    lama = getattr(instance, '_rekap_lama', None)
+    if lama == baru:
+        return
+    tanggal = _tanggal_selesai({baru[0], lama[0]} if lama else {baru[0]})
+    if lama is not None and lama[0] in tanggal:
+        catat_rekap_produk(tanggal[lama[0]], [lama[1:]], -1)
+    if baru[0] in tanggal:
+        catat_rekap_produk(tanggal[baru[0]], [baru[1:]], 1)
+
+
+@receiver(post_delete, sender=DetailPemesanan)
+def hapus_rekap_produk_detail(sender, instance, **kwargs):
+    tanggal = _tanggal_selesai({instance.idKoleksiPemesanan_id})
+    if tanggal:
+        baris = (instance.idProduk_id, int(instance.kuantiti), int(instance.subTotal))
+        catat_rekap_produk(tanggal[instance.idKoleksiPemesanan_id], [baris], -1)
+
+
+@receiver(post_save, sender=Pemesanan)
+@receiver(post_delete, sender=Pemesanan)
+@receiver(post_save, sender=DetailPemesanan)
+@receiver(post_delete, sender=DetailPemesanan)
+def invalidasi_analitik_penjualan(sender, raw=False, **kwargs):
+    # Detail yang dibuat lewat bulk_create (core/transaksi.py) ikut tercakup oleh save pesanannya
+    if not raw:
+        invalidasi_analitik()
+
+
+@receiver(post_save, sender=Produk)
+@receiver(post_delete, sender=Produk)
+def invalidasi_katalog_produk(sender, raw=False, **kwargs):
+    # Perubahan stok lewat UPDATE massal (core/stok.py) menginvalidasi sendiri
+    if not raw:
+        invalidasi_katalog()
+
+
+# Field gambar yang punya turunan thumbnail (core/thumbnail.py)
+FIELD_GAMBAR = {Produk: 'foto', Pemesanan: 'buktiBayar'}
+
+
+@receiver(pre_save, sender=Produk)
+@receiver(pre_save, sender=Pemesanan)
+def simpan_gambar_lama(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Nama file lama dibandingkan setelah save; turunan gambar yang diganti dihapus
+    instance._gambar_lama = None
+    nama_field = FIELD_GAMBAR[sender]
+    if raw or instance.pk is None or (update_fields is not None and nama_field not in update_fields):
+        return
+    instance._gambar_lama = sender.objects.filter(pk=instance.pk).values_list(nama_field, flat=True).first()
+
+
+@receiver(post_save, sender=Produk)
+@receiver(post_save, sender=Pemesanan)
+def buat_thumbnail_gambar(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Turunan yang sudah ada dilewati, jadi save biasa hanya memeriksa keberadaan file.
+    # Encode dilakukan setelah commit: tidak menahan write lock SQLite selama checkout,
+    # dan transaksi yang batal (mis. stok kurang) tidak meninggalkan file turunan
+    if raw:
+        return
+    nama_field = FIELD_GAMBAR[sender]
+    if update_fields is not None and nama_field not in update_fields:
+        return
+    berkas = getattr(instance, nama_field)
+    lama = getattr(instance, '_gambar_lama', None)
+    if lama and lama != berkas.name:
+        storage = berkas.storage
+        transaction.on_commit(lambda: hapus_thumbnail(storage, lama))
+    if berkas:
+        transaction.on_commit(lambda: buat_thumbnail(berkas))
+
+
+@receiver(post_delete, sender=Produk)
+@receiver(post_delete, sender=Pemesanan)
+def hapus_thumbnail_gambar(sender, instance, **kwargs):
+    # Turunan tidak ikut dipakai ulang bila file baru kelak disimpan dengan nama yang sama
+    berkas = getattr(instance, FIELD_GAMBAR[sender])
+    if berkas:
+        storage, nama = berkas.storage, berkas.name
+        transaction.on_commit(lambda: hapus_thumbnail(storage, nama))
+
+
+@receiver(post_save, sender=Produk)
+def catat_saldo_awal_produk(sender, instance, created, raw=False, **kwargs):
+    # Stok yang dibawa produk baru masuk jurnal, jadi saldo tetap = SUM(jumlah)
+    if created and not raw and instance.stok:
+        MutasiStok.objects.create(idProduk=instance, jenisMutasi='Saldo Awal', jumlah=instance.stok)
+
+
+@receiver(pre_save, sender=Produksi)
+def simpan_karyawan_lama_produksi(sender, instance, raw=False, **kwargs):
+    # Produksi yang dipindah ke karyawan lain juga mengubah statistik karyawan lama
+    instance._karyawan_lama = None
+    if not raw and instance.pk is not None:
+        instance._karyawan_lama = Produksi.objects.filter(pk=instance.pk).values_list('idKaryawan', flat=True).first()
+
+
+@receiver(post_save, sender=Produksi)
+@receiver(post_delete, sender=Produksi)
+def invalidasi_statistik_produksi(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidasi_statistik(instance.idKaryawan_id, getattr(instance, '_karyawan_lama', None))
+
+
+@receiver(post_save, sender=DetailProduksi)
+@receiver(post_delete, sender=DetailProduksi)
+def invalidasi_statistik_bahan(sender, instance, raw=False, **kwargs):
+    # Detail dari simpan_produksi (bulk_create) sudah tercakup oleh post_save Produksi-nya
+    if not raw:
+        karyawan_id = Produksi.objects.filter(pk=instance.idProduksi_id).values_list('idKaryawan', flat=True).first()
+        invalidasi_statistik(karyawan_id)
+
+
+@receiver(post_save, sender=Produksi)
+def hitung_biaya_produksi(sender, instance, raw=False, **kwargs):
+    # Jumlah hasil atau jenis hasil yang berubah mengubah biaya per unit dan biaya resep;
+    # simpan_produksi menghitungnya sendiri setelah detail bahan tersimpan
+    if not raw and not getattr(instance, '_tunda_biaya', False):
+        perbarui_biaya([instance.pk])
+
+
+@receiver(post_save, sender=DetailProduksi)
+@receiver(post_delete, sender=DetailProduksi)
+def hitung_biaya_detail_produksi(sender, instance, raw=False, **kwargs):
+    if not raw:
+        perbarui_biaya([instance.idProduksi_id])
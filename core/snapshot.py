@@ -0,0 +1,100 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Exists, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import MutasiStok, Produk, SnapshotStok
+
+
+def akhir_hari(tanggal):
+    """Aware datetime at which ``tanggal`` ends (midnight of the next day, local time)"""
+    return timezone.make_aware(datetime.combine(tanggal + timedelta(days=1), time.min))
+
+
+def _total_mutasi(mutasi):
+    # Subquery SUM(jumlah) per produk untuk queryset MutasiStok yang sudah dikorelasikan ke produk
+    total = mutasi.order_by().values('idProduk').annotate(total=Sum('jumlah')).values('total')
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+def _stok_akhir_hari(tanggal, dasar):
+    """
+    Expression for a product's stock at the end of ``tanggal`` and a filter for
+    the products that existed by then, starting from the snapshot of ``dasar``
+    """
+    mutasi = MutasiStok.objects.filter(idProduk=OuterRef('pk'), waktu__lt=akhir_hari(tanggal))
+    if dasar is None:
+        # Belum ada snapshot: putar ulang jurnal dari awal (hanya terjadi untuk tanggal sebelum snapshot pertama)
+        return _total_mutasi(mutasi), Q(Exists(mutasi))
+
+    snapshot = SnapshotStok.objects.filter(tanggal=dasar, idProduk=OuterRef('pk'))
+    mutasi = mutasi.filter(waktu__gte=akhir_hari(dasar))
+    stok = Coalesce(Subquery(snapshot.values('stok')[:1]), Value(0)) + _total_mutasi(mutasi)
+    return stok, Q(Exists(snapshot)) | Q(Exists(mutasi))
+
+
+def _snapshot_terakhir(tanggal, termasuk=True):
+    snapshot = SnapshotStok.objects.filter(**{'tanggal__lte' if termasuk else 'tanggal__lt': tanggal})
+    return snapshot.aggregate(terakhir=Max('tanggal'))['terakhir']
+
+
+def stok_per_tanggal(queryset, tanggal):
+    """
+    Annotate ``stok_laporan`` with each product's stock at the end of ``tanggal``.
+
+    Only the latest snapshot on or before that day and the movements recorded
+    after it are read, so the cost is bounded by the snapshot interval rather
+    than the age of the ledger. Products that did not exist yet are left out.
+    """
+    stok, ada = _stok_akhir_hari(tanggal, _snapshot_terakhir(tanggal))
+    return queryset.annotate(stok_laporan=stok).filter(ada)
+
+
+def pergerakan_stok(date_from, date_to, queryset=None):
+    """
+    Annotate stock movement between two days (inclusive) on Produk rows.
+
+    ``stok_awal`` is the stock at the start of ``date_from``, ``masuk`` and
+    ``keluar`` the incoming and outgoing quantities in the range, and
+    ``stok_akhir`` the stock at the end of ``date_to``.
+    """
+    queryset = Produk.objects.all() if queryset is None else queryset
+    sebelum = date_from - timedelta(days=1)
+    stok_awal, ada = _stok_akhir_hari(sebelum, _snapshot_terakhir(sebelum))
+
+    mutasi = MutasiStok.objects.filter(
+        idProduk=OuterRef('pk'), waktu__gte=akhir_hari(sebelum), waktu__lt=akhir_hari(date_to)
+    )
+    return queryset.annotate(
+        stok_awal=stok_awal,
+        masuk=_total_mutasi(mutasi.filter(jumlah__gt=0)),
+        keluar=-_total_mutasi(mutasi.filter(jumlah__lt=0)),
+    ).annotate(
+        stok_akhir=stok_awal + _total_mutasi(mutasi),
+    ).filter(ada | Q(Exists(mutasi)))
+
+
+def buat_snapshot(tanggal):
+    """
+    Write the end-of-day stock of every product for ``tanggal``; returns the row count.
+
+    Each snapshot is computed from the previous one plus that day's movements.
+    Rerunning a day overwrites its rows. Only finished days can be captured,
+    since later movements of the same day would be missed.
+    """
+    if tanggal >= timezone.localdate():
+        raise ValueError('Snapshot hanya bisa dibuat untuk hari yang sudah lewat.')
+
+    stok, ada = _stok_akhir_hari(tanggal, _snapshot_terakhir(tanggal, termasuk=False))
+    baris = [
+        SnapshotStok(tanggal=tanggal, idProduk_id=produk_id, stok=saldo)
+        for produk_id, saldo in Produk.objects.annotate(saldo=stok).filter(ada).values_list('idProduk', 'saldo')
+    ]
+    SnapshotStok.objects.bulk_create(
+        baris,
+        update_conflicts=True,
+        unique_fields=['tanggal', 'idProduk'],
+        update_fields=['stok'],
+        batch_size=500,
+    )
+    return len(baris)
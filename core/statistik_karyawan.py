@@ -0,0 +1,85 @@
+from django.core.cache import caches
+from django.db.models import Count, Q, Sum
+from .models import DetailProduksi, Produksi
+from .versi_cache import naikkan_versi, versi
+
+
+# Kunci cache memuat nomor versi per karyawan, jadi TTL hanya untuk membuang entri lama
+TTL = 60 * 60
+
+
+def _cache():
+    return caches['statistik']
+
+
+def _kunci_versi(karyawan_id):
+    return f'statistik_karyawan:{karyawan_id}:versi'
+
+
+def _versi(karyawan_id):
+    return versi(_cache(), _kunci_versi(karyawan_id))
+
+
+def _kunci(karyawan_id, nomor):
+    return f'statistik_karyawan:{karyawan_id}:{nomor}'
+
+
+def _jenis_hasil():
+    return [jenis for jenis, _ in Produksi._meta.get_field('jenisHasil').choices]
+
+
+def hitung_statistik(karyawan_id):
+    """
+    Production statistics of one employee, straight from the database.
+
+    All counters and output totals come from one conditional aggregate over
+    the employee's Produksi rows. Raw-material consumption needs its own
+    GROUP BY on DetailProduksi: joining the details into the first query
+    would repeat every batch once per material and inflate the output sums.
+    """
+    agregat = {'total': Count('pk')}
+    for jenis in _jenis_hasil():
+        agregat[f'jumlah_{jenis}'] = Count('pk', filter=Q(jenisHasil=jenis))
+        agregat[f'hasil_{jenis}'] = Sum('jumlahHasil', filter=Q(jenisHasil=jenis))
+    data = Produksi.objects.filter(idKaryawan_id=karyawan_id).aggregate(**agregat)
+
+    bahan = (
+        DetailProduksi.objects
+        .filter(idProduksi__idKaryawan_id=karyawan_id)
+        .values('idProduk', 'idProduk__namaProduk', 'idProduk__satuan')
+        .annotate(jumlah=Sum('jumlahBahanTerpakai'))
+        .order_by('idProduk__namaProduk')
+    )
+    return {
+        'total_produksi': data['total'],
+        'per_jenis': {
+            jenis: {'jumlah': data[f'jumlah_{jenis}'], 'hasil': data[f'hasil_{jenis}'] or 0}
+            for jenis in _jenis_hasil()
+        },
+        'bahan_terpakai': [
+            {'produk_id': b['idProduk'], 'nama': b['idProduk__namaProduk'], 'satuan': b['idProduk__satuan'],
+             'jumlah': b['jumlah']}
+            for b in bahan
+        ],
+    }
+
+
+def statistik_karyawan(karyawan_id):
+    """
+    Production statistics of one employee, served from the per-employee cache.
+
+    Entries are stored under the employee's version number, so a statistic
+    computed from data older than the last commit is written under a key
+    that is no longer read.
+    """
+    kunci = _kunci(karyawan_id, _versi(karyawan_id))
+    data = _cache().get(kunci)
+    if data is None:
+        data = hitung_statistik(karyawan_id)
+        _cache().set(kunci, data, TTL)
+    return data
+
+
+def invalidasi_statistik(*karyawan_ids):
+    """Bump the statistics version of these employees once the current transaction commits"""
+    naikkan_versi(_cache(), *[_kunci_versi(karyawan_id) for karyawan_id in set(karyawan_ids) if karyawan_id])
@@ -0,0 +1,154 @@
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .basisdata import transaksi_tulis
+from .models import MutasiStok, Produk
+from .katalog import invalidasi_katalog
+
+
+class StokTidakCukup(Exception):
+    """Raised when a reservation fails; no product stock has been changed"""
+
+    def __init__(self, gagal):
+        # gagal: list of dict(produk_id, nama, diminta, tersedia)
+        self.gagal = gagal
+        super().__init__(', '.join(
+            f"{baris['nama'] or baris['produk_id']} (diminta {baris['diminta']}, tersedia {baris['tersedia']})"
+            for baris in gagal
+        ))
+
+
+class _ReservasiBatal(Exception):
+    pass
+
+
+def gabungkan_kebutuhan(kebutuhan):
+    """Normalize a dict or (produk_id, jumlah) pairs into {produk_id: total jumlah}"""
+    items = kebutuhan.items() if hasattr(kebutuhan, 'items') else kebutuhan
+    hasil = {}
+    for produk_id, jumlah in items:
+        jumlah = int(jumlah)
+        if jumlah:
+            hasil[int(produk_id)] = hasil.get(int(produk_id), 0) + jumlah
+    return hasil
+
+
+def _jumlah_per_produk(jumlah):
+    return Case(
+        *[When(idProduk=produk_id, then=Value(n)) for produk_id, n in jumlah.items()],
+        output_field=IntegerField(),
+    )
+
+
+def _cari_baris_gagal(jumlah):
+    tersedia = {
+        produk_id: (nama, stok)
+        for produk_id, nama, stok in Produk.objects.filter(idProduk__in=jumlah).values_list('idProduk', 'namaProduk', 'stok')
+    }
+    gagal = []
+    for produk_id, diminta in jumlah.items():
+        nama, stok = tersedia.get(produk_id, (None, 0))
+        if stok < diminta:
+            gagal.append({'produk_id': produk_id, 'nama': nama, 'diminta': diminta, 'tersedia': stok})
+    return gagal
+
+
+def _catat_mutasi(jumlah, jenis, tanda, pemesanan=None, produksi=None, keterangan=None):
+    # Satu INSERT untuk semua baris jurnal, di transaksi yang sama dengan UPDATE saldo
+    MutasiStok.objects.bulk_create([
+        MutasiStok(
+            idProduk_id=produk_id, jenisMutasi=jenis, jumlah=tanda * n,
+            idPemesanan=pemesanan, idProduksi=produksi, keterangan=keterangan
+        )
+        for produk_id, n in jumlah.items()
+    ])
+
+
+def kurangi_stok(kebutuhan, jenis='Penjualan', **referensi):
+    """
+    Reserve stock for a whole cart in one conditional UPDATE.
+
+    Every product is decremented with ``stok = stok - n WHERE stok >= n`` in a
+    single statement. Either all lines succeed or none do, in which case
+    StokTidakCukup lists exactly the lines that could not be served.
+    Successful lines are journaled as ``jenis`` movements; ``referensi`` may
+    carry the ``pemesanan``, ``produksi`` or ``keterangan`` of the movement.
+    """
+    jumlah = gabungkan_kebutuhan(kebutuhan)
+    if not jumlah:
+        return
+
+    try:
+        with transaksi_tulis():
+            diminta = _jumlah_per_produk(jumlah)
+            updated = Produk.objects.filter(idProduk__in=jumlah, stok__gte=diminta).update(
+                stok=F('stok') - diminta, diubah=timezone.now()  # update() melewati auto_now
+            )
+            if updated != len(jumlah):
+                raise _ReservasiBatal
+            _catat_mutasi(jumlah, jenis, -1, **referensi)
+            invalidasi_katalog()
+    except _ReservasiBatal:
+        # Savepoint sudah di-rollback, jadi stok yang dibaca di sini adalah stok asli
+        raise StokTidakCukup(_cari_baris_gagal(jumlah))
+
+
+def tambah_stok(kebutuhan, jenis='Pembatalan', **referensi):
+    """
+    Add stock for a whole cart in one UPDATE and journal it (e.g. cancelled orders).
+
+    Amounts may be negative for corrections that must not be refused, such
+    as a production batch edited down after its output was already sold.
+    """
+    jumlah = gabungkan_kebutuhan(kebutuhan)
+    if not jumlah:
+        return
+    with transaksi_tulis():
+        updated = Produk.objects.filter(idProduk__in=jumlah).update(
+            stok=F('stok') + _jumlah_per_produk(jumlah), diubah=timezone.now()
+        )
+        if updated != len(jumlah):
+            # Produk yang sudah dihapus tidak dicatat di jurnal
+            ada = set(Produk.objects.filter(idProduk__in=jumlah).values_list('idProduk', flat=True))
+            jumlah = {produk_id: n for produk_id, n in jumlah.items() if produk_id in ada}
+        _catat_mutasi(jumlah, jenis, 1, **referensi)
+    invalidasi_katalog()
+
+
+def saldo_jurnal():
+    """Produk annotated with ``saldo_jurnal``, the balance recomputed from the ledger (one query)"""
+    saldo = (
+        MutasiStok.objects
+        .filter(idProduk=OuterRef('pk'))
+        .order_by()
+        .values('idProduk')
+        .annotate(total=Sum('jumlah'))
+        .values('total')
+    )
+    return Produk.objects.annotate(
+        saldo_jurnal=Coalesce(Subquery(saldo, output_field=IntegerField()), Value(0))
+    )
+
+
+def rekonsiliasi_stok(perbaiki=False):
+    """
+    Compare every Produk.stok with its ledger balance.
+
+    Returns ``{produk_id: (nama, stok, saldo_jurnal)}`` for the products that
+    drifted. With ``perbaiki`` the ledger wins and Produk.stok is reset to
+    its balance, under a row lock so no reservation slips in between.
+    """
+    with transaksi_tulis():
+        queryset = saldo_jurnal().exclude(stok=F('saldo_jurnal'))
+        if perbaiki:
+            queryset = queryset.select_for_update()
+        selisih = {
+            produk_id: (nama, stok, saldo)
+            for produk_id, nama, stok, saldo in queryset.values_list('idProduk', 'namaProduk', 'stok', 'saldo_jurnal')
+        }
+        if perbaiki:
+            for produk_id, (_, _, saldo) in selisih.items():
+                Produk.objects.filter(pk=produk_id).update(stok=saldo, diubah=timezone.now())
+            if selisih:
+                invalidasi_katalog()
+    return selisih
@@ -0,0 +1,35 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+from ..thumbnail import url_thumbnail
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail(berkas, lebar=400):
+    """URL of a WebP derivative: ``{{ produk.foto|thumbnail:400 }}``"""
+    return url_thumbnail(berkas, int(lebar))
+
+
+@register.simple_tag
+def gambar_responsif(berkas, lebar, alt='', **atribut):
+    """
+    ``<picture>`` serving the WebP derivative with a JPEG fallback.
+
+    ``lebar`` is the displayed width in CSS pixels; the 2x derivative is
+    offered for high density screens. Extra keyword arguments become
+    attributes of the ``<img>`` (``class_`` for ``class``).
+    """
+    lebar = int(lebar)
+    srcset = {
+        format: f'{url_thumbnail(berkas, lebar, format)} 1x, {url_thumbnail(berkas, lebar * 2, format)} 2x'
+        for format in ('webp', 'jpg')
+    }
+    atribut_img = format_html_join(
+        ' ', '{}="{}"', ((nama.rstrip('_').replace('_', '-'), nilai) for nama, nilai in atribut.items())
+    )
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" srcset="{}" alt="{}" loading="lazy" {}></picture>',
+        srcset['webp'], url_thumbnail(berkas, lebar, 'jpg'), srcset['jpg'], alt, atribut_img
+    )
@@ -1,3 +1,1697 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, close_old_connections, connection, transaction
+from django.db.models import Count, F, Sum
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from . import analitik, antrian, basisdata, cache_laporan, katalog, profiler, unggah
+from .admin import get_pesanan_perhatian_count
+from .models import (
+    Produk, Pelanggan, Pemesanan, DetailPemesanan, Karyawan, Produksi, DetailProduksi,
+    AntrianLaporan, StatistikCacheLaporan, Penghitung, KeranjangItem, MutasiStok, SnapshotStok, RekapPenjualanHarian,
+    RekapProdukHarian, RekapPelangganBulanan, Resep, DetailResep
+)
+from .biaya_produksi import kebutuhan_resep, ringkasan_biaya
+from .data_sintetis import buat_data_sintetis
+from .management.commands.laporan_profiler import ringkas_log
+from .penghitung import jumlah_pemesanan_per_status, rekonsiliasi_penghitung, tambah_atomik
+from .rekap import rebuild_rekap, rekap_bulanan
+from .laporan import dataset_produk, versi_data
+from .riwayat import halaman_riwayat
+from .statistik_karyawan import hitung_statistik, statistik_karyawan
+from .snapshot import akhir_hari, buat_snapshot, pergerakan_stok
+from .keranjang import hitung_keranjang, simpan_item, pastikan_keranjang
+from .thumbnail import buat_thumbnail, nama_thumbnail, url_thumbnail
+from .stok import kurangi_stok, tambah_stok, rekonsiliasi_stok, StokTidakCukup
+from .transaksi import simpan_pemesanan, simpan_produksi
+
+
+GIF_1PX = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00'
+    b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+
+def buat_produk(nama, stok, jenis='Produk Jadi', harga=1000):
+    return Produk.objects.create(namaProduk=nama, jenisProduk=jenis, harga=harga, stok=stok, satuan='buah')
+
+
+class ReservasiStokTest(TestCase):
+    def test_reservasi_berhasil_mengurangi_semua_baris(self):
+        tahu = buat_produk('Tahu', 10)
+        tempe = buat_produk('Tempe', 5)
+
+        kurangi_stok({tahu.pk: 4, tempe.pk: 5})
+
+        tahu.refresh_from_db()
+        tempe.refresh_from_db()
+        self.assertEqual((tahu.stok, tempe.stok), (6, 0))
+
+    def test_reservasi_gagal_tidak_mengubah_stok_dan_melaporkan_baris(self):
+        tahu = buat_produk('Tahu', 10)
+        tempe = buat_produk('Tempe', 2)
+
+        with self.assertRaises(StokTidakCukup) as ctx:
+            kurangi_stok([(tahu.pk, 3), (tempe.pk, 2), (tempe.pk, 1)])
+
+        self.assertEqual(ctx.exception.gagal, [
+            {'produk_id': tempe.pk, 'nama': 'Tempe', 'diminta': 3, 'tersedia': 2},
+        ])
+        tahu.refresh_from_db()
+        tempe.refresh_from_db()
+        self.assertEqual((tahu.stok, tempe.stok), (10, 2))
+
+    def test_tambah_stok(self):
+        tahu = buat_produk('Tahu', 1)
+        tambah_stok({tahu.pk: 4})
+        tahu.refresh_from_db()
+        self.assertEqual(tahu.stok, 5)
+
+
+class AdminPemesananStokTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        self.tahu = buat_produk('Tahu', 5)
+
+    def _tambah(self, kuantiti, status='Diproses'):
+        return self.client.post(reverse('custom_admin:core_pemesanan_add'), {
+            'idPelanggan': self.pelanggan.pk, 'tanggalPemesanan': str(timezone.localdate()), 'status': status,
+            'alamatPengiriman': 'Kupang', 'ongkosKirim': 0,
+            'detailpemesanan_set-TOTAL_FORMS': 1, 'detailpemesanan_set-INITIAL_FORMS': 0,
+            'detailpemesanan_set-MIN_NUM_FORMS': 0, 'detailpemesanan_set-MAX_NUM_FORMS': 1000,
+            'detailpemesanan_set-0-idProduk': self.tahu.pk, 'detailpemesanan_set-0-kuantiti': kuantiti,
+        })
+
+    def test_pesanan_baru_memesan_stok_detail_inline(self):
+        self._tambah(3)
+
+        pemesanan = Pemesanan.objects.get()
+        self.tahu.refresh_from_db()
+        self.assertEqual((pemesanan.status, pemesanan.totalPemesanan, self.tahu.stok), ('Diproses', 3000, 2))
+        self.assertEqual(
+            list(MutasiStok.objects.filter(jenisMutasi='Penjualan').values_list('idPemesanan', 'jumlah')),
+            [(pemesanan.pk, -3)]
+        )
+
+    def test_pesanan_baru_stok_kurang_dibatalkan(self):
+        self._tambah(8)
+
+        self.assertEqual(Pemesanan.objects.get().status, 'Dibatalkan')
+        self.tahu.refresh_from_db()
+        self.assertEqual(self.tahu.stok, 5)
+        self.assertFalse(MutasiStok.objects.filter(jenisMutasi='Penjualan').exists())
+
+
+class ReservasiStokConcurrencyTest(TransactionTestCase):
+    JUMLAH_THREAD = 24
+
+    def _jalankan_bersamaan(self, kebutuhan):
+        hasil = {'berhasil': 0, 'gagal': 0}
+        kunci = threading.Lock()
+        mulai = threading.Barrier(self.JUMLAH_THREAD)
+
+        def pembeli():
+            mulai.wait()
+            try:
+                while True:
+                    try:
+                        kurangi_stok(kebutuhan)
+                        status = 'berhasil'
+                    except StokTidakCukup:
+                        status = 'gagal'
+                    except OperationalError:
+                        # SQLite mengunci tabel saat ada writer lain, coba lagi
+                        continue
+                    break
+                with kunci:
+                    hasil[status] += 1
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=pembeli) for _ in range(self.JUMLAH_THREAD)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return hasil
+
+    def test_tidak_ada_overselling(self):
+        tahu = buat_produk('Tahu', 10)
+
+        hasil = self._jalankan_bersamaan({tahu.pk: 1})
+
+        tahu.refresh_from_db()
+        self.assertEqual(hasil, {'berhasil': 10, 'gagal': self.JUMLAH_THREAD - 10})
+        self.assertEqual(tahu.stok, 0)
+
+    def test_keranjang_gagal_tidak_mengurangi_baris_lain(self):
+        tahu = buat_produk('Tahu', 100)
+        tempe = buat_produk('Tempe', 7)
+
+        hasil = self._jalankan_bersamaan({tahu.pk: 2, tempe.pk: 1})
+
+        tahu.refresh_from_db()
+        tempe.refresh_from_db()
+        self.assertEqual(hasil['berhasil'], 7)
+        self.assertEqual(tempe.stok, 0)
+        self.assertEqual(tahu.stok, 100 - 2 * hasil['berhasil'])
+
+
+class SimpanBatchTest(TestCase):
+    def setUp(self):
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='rahasia'
+        )
+        self.karyawan = Karyawan.objects.create(nama='Sari', username='sari', password='rahasia')
+        self.produk_jadi = [buat_produk(f'Produk {i}', 100) for i in range(12)]
+        self.bahan = [buat_produk(f'Bahan {i}', 100, jenis='Bahan Baku') for i in range(12)]
+
+    def _jumlah_query_pemesanan(self, n):
+        pemesanan = Pemesanan(tanggalPemesanan=timezone.now().date(), idPelanggan=self.pelanggan)
+        with CaptureQueriesContext(connection) as queries:
+            simpan_pemesanan(pemesanan, [(p.pk, 2, p.harga) for p in self.produk_jadi[:n]])
+        self.assertEqual(pemesanan.detailpemesanan_set.count(), n)
+        return len(queries)
+
+    def _jumlah_query_produksi(self, n):
+        produksi = Produksi(
+            tanggalProduksi=timezone.now().date(), jenisHasil='Tahu', jumlahHasil=10,
+            satuanHasil='buah', idKaryawan=self.karyawan
+        )
+        with CaptureQueriesContext(connection) as queries:
+            simpan_produksi(produksi, [(p.pk, 1) for p in self.bahan[:n]])
+        self.assertEqual(produksi.detailproduksi_set.count(), n)
+        return len(queries)
+
+    def test_query_checkout_konstan(self):
+        # Pesanan pertama membuat bucket rekap baru, jadi tidak ikut dibandingkan
+        self._jumlah_query_pemesanan(1)
+        self.assertEqual(self._jumlah_query_pemesanan(1), self._jumlah_query_pemesanan(12))
+
+    def test_query_produksi_konstan(self):
+        # Produksi pertama membuat produk Tahu lewat get_or_create
+        self._jumlah_query_produksi(1)
+        self.assertEqual(self._jumlah_query_produksi(1), self._jumlah_query_produksi(12))
+
+    def test_pemesanan_menghitung_total_dan_stok(self):
+        tahu, tempe = self.produk_jadi[:2]
+        pemesanan = simpan_pemesanan(
+            Pemesanan(tanggalPemesanan=timezone.now().date(), idPelanggan=self.pelanggan),
+            [(tahu.pk, 3, 2000), (tempe.pk, 1, 2500)]
+        )
+        tahu.refresh_from_db()
+        self.assertEqual(pemesanan.totalPemesanan, 8500)
+        self.assertEqual(tahu.stok, 97)
+
+    def test_bahan_bukan_bahan_baku_ditolak_sebelum_menulis(self):
+        produksi = Produksi(
+            tanggalProduksi=timezone.now().date(), jenisHasil='Tahu', jumlahHasil=10,
+            satuanHasil='buah', idKaryawan=self.karyawan
+        )
+        with self.assertRaises(ValidationError):
+            simpan_produksi(produksi, [(self.produk_jadi[0].pk, 1)])
+        self.assertFalse(Produksi.objects.exists())
+
+
+def pakai_cache_sementara(test):
+    # Cache PDF laporan diarahkan ke folder sementara selama test
+    folder = tempfile.TemporaryDirectory()
+    test.addCleanup(folder.cleanup)
+    patcher = mock.patch.object(cache_laporan, 'CACHE_DIR', folder.name)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    return folder.name
+
+
+class AntrianLaporanTest(TestCase):
+    def setUp(self):
+        pakai_cache_sementara(self)
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = folder.name
+        patcher = mock.patch.object(
+            AntrianLaporan._meta.get_field('berkas'), 'storage', FileSystemStorage(location=folder.name, base_url=None)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        buat_produk('Tahu', 5)
+
+    def _jalankan_worker(self):
+        call_command('jalankan_antrian_laporan', '--sekali', stdout=StringIO(), stderr=StringIO())
+
+    def test_filter_sama_memakai_job_yang_sama(self):
+        job = antrian.antrikan_laporan('produk', {'jenis_produk': 'Produk Jadi', 'abaikan': 'x'})
+        self.assertEqual(job.status, 'Menunggu')
+        self.assertEqual(job.parameter, {'jenis_produk': 'Produk Jadi'})
+        self.assertEqual(antrian.antrikan_laporan('produk', {'jenis_produk': 'Produk Jadi'}).pk, job.pk)
+        self.assertNotEqual(antrian.antrikan_laporan('produk', {}).pk, job.pk)
+
+    def test_satu_job_aktif_per_kunci(self):
+        job = antrian.antrikan_laporan('produk', {})
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AntrianLaporan.objects.create(jenisLaporan='produk', parameter={}, kunci=job.kunci)
+
+    def test_klik_bersamaan_mendapat_job_yang_sama(self):
+        pemenang = antrian.antrikan_laporan('produk', {})
+        filter_asli = AntrianLaporan.objects.filter
+        panggilan = []
+
+        def filter_(*args, **kwargs):
+            # Cek job aktif pertama belum melihat job request lain, insert ditolak constraint
+            panggilan.append(kwargs)
+            return AntrianLaporan.objects.none() if len(panggilan) == 1 else filter_asli(*args, **kwargs)
+
+        with mock.patch.object(AntrianLaporan.objects, 'filter', side_effect=filter_):
+            job = antrian.antrikan_laporan('produk', {})
+
+        self.assertEqual(job.pk, pemenang.pk)
+        self.assertEqual(AntrianLaporan.objects.count(), 1)
+
+    def test_worker_merender_ke_penyimpanan_privat(self):
+        job = antrian.antrikan_laporan('produk', {})
+        self._jalankan_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'Selesai')
+        self.assertTrue(os.path.exists(os.path.join(self.folder, job.berkas.name)))
+        self.assertFalse(job.berkas.name.startswith(str(settings.MEDIA_ROOT)))
+        # Job selesai dipakai ulang selama datanya belum berubah
+        self.assertEqual(antrian.antrikan_laporan('produk', {}).pk, job.pk)
+
+        url = reverse('core:report_antrian_unduh', args=[job.pk])
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_render_gagal_dicatat(self):
+        job = antrian.antrikan_laporan('produk', {})
+        with mock.patch.object(cache_laporan, 'render_laporan', side_effect=RuntimeError('printer rusak')):
+            self._jalankan_worker()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.pesanError), ('Gagal', 'printer rusak'))
+        self.assertFalse(job.berkas)
+        # Job gagal tidak menghalangi antrian ulang filter yang sama
+        self.assertNotEqual(antrian.antrikan_laporan('produk', {}).pk, job.pk)
+
+    def test_job_lama_dibersihkan_beserta_berkasnya(self):
+        job = antrian.antrikan_laporan('produk', {})
+        self._jalankan_worker()
+        job.refresh_from_db()
+        path = os.path.join(self.folder, job.berkas.name)
+
+        self.assertEqual(antrian.bersihkan_antrian(), 0)
+        AntrianLaporan.objects.filter(pk=job.pk).update(dibuat=timezone.now() - timedelta(days=2))
+        self.assertEqual(antrian.bersihkan_antrian(), 1)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(AntrianLaporan.objects.exists())
+
+
+class QueryLaporanTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'rahasia')
+        self.client.force_login(self.admin)
+        pakai_cache_sementara(self)
+
+    def _isi_data(self, n):
+        tanggal = timezone.now().date()
+        for i in range(Pelanggan.objects.count(), Pelanggan.objects.count() + n):
+            pelanggan = Pelanggan.objects.create(
+                namaPelanggan=f'Pelanggan {i}', alamat='Kupang', noTelp='0812',
+                username=f'pelanggan{i}', password='pbkdf2_x'
+            )
+            Pemesanan.objects.create(tanggalPemesanan=tanggal, idPelanggan=pelanggan, totalPemesanan=1000, status='Selesai')
+            karyawan = Karyawan.objects.create(nama=f'Karyawan {i}', username=f'karyawan{i}', password='pbkdf2_x')
+            bahan = buat_produk(f'Kedelai {i}', 1000, jenis='Bahan Baku')
+            produksi = Produksi.objects.create(
+                tanggalProduksi=tanggal, jenisHasil='Tahu', jumlahHasil=10, satuanHasil='buah', idKaryawan=karyawan
+            )
+            DetailProduksi.objects.create(idProduksi=produksi, idProduk=bahan, jumlahBahanTerpakai=2)
+
+    def _jumlah_query(self, url, method='get', data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data or {})
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def _jumlah_query_per_ukuran(self, url, method='get', data=None):
+        self._isi_data(2)
+        sedikit = self._jumlah_query(url, method, data)
+        self._isi_data(10)
+        banyak = self._jumlah_query(url, method, data)
+        return sedikit, banyak
+
+    def test_pdf_penjualan_query_tetap(self):
+        # Sesi dan user staf, versi data, dataset, penghitung miss
+        self.assertEqual(self._jumlah_query_per_ukuran(reverse('core:report_penjualan_pdf')), (5, 5))
+
+    def test_pdf_produk_query_tetap(self):
+        # Sesi dan user staf, versi data, dataset, penghitung miss
+        self.assertEqual(self._jumlah_query_per_ukuran(reverse('core:report_produk_pdf')), (5, 5))
+
+    def test_pdf_produksi_query_tetap(self):
+        # Sesi dan user staf, versi data, dataset, penghitung miss
+        self.assertEqual(self._jumlah_query_per_ukuran(reverse('core:report_produksi_pdf')), (5, 5))
+
+    def test_filter_penjualan_query_tetap(self):
+        sedikit, banyak = self._jumlah_query_per_ukuran(reverse('core:filter_penjualan'), 'post', {'status': 'Selesai'})
+        self.assertEqual(sedikit, banyak)
+
+    def test_filter_produk_query_tetap(self):
+        sedikit, banyak = self._jumlah_query_per_ukuran(reverse('core:filter_produk'), 'post', {'jenis_produk': 'Bahan Baku'})
+        self.assertEqual(sedikit, banyak)
+
+    def test_filter_produksi_query_tetap(self):
+        sedikit, banyak = self._jumlah_query_per_ukuran(reverse('core:filter_produksi'), 'post', {'jenis_hasil': 'Tahu'})
+        self.assertEqual(sedikit, banyak)
+
+
+class FilterTanggalTest(TestCase):
+    def setUp(self):
+        pakai_cache_sementara(self)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+
+    def test_tanggal_tidak_valid_ditolak(self):
+        for tanggal in ('2024-13-45', 'kemarin'):
+            response = self.client.post(reverse('core:filter_produk'), {'per_tanggal': tanggal})
+            self.assertContains(response, 'Format tanggal tidak valid', status_code=400)
+
+            response = self.client.get(reverse('core:report_produk_pdf'), {'per_tanggal': tanggal})
+            self.assertEqual(response.status_code, 400)
+
+            response = self.client.post(reverse('core:filter_penjualan'), {'date_from': tanggal})
+            self.assertEqual(response.status_code, 400)
+            response = self.client.post(reverse('core:filter_produksi'), {'date_to': tanggal})
+            self.assertEqual(response.status_code, 400)
+            response = self.client.get(reverse('core:report_penjualan_pdf'), {'date_to': tanggal})
+            self.assertEqual(response.status_code, 400)
+
+            response = self.client.post(reverse('core:report_antrian_tambah', args=['produk']), {'per_tanggal': tanggal})
+            self.assertEqual((response.status_code, response.json()['status']), (400, 'Gagal'))
+        self.assertFalse(AntrianLaporan.objects.exists())
+
+    def test_tanggal_valid_tetap_jalan(self):
+        buat_produk('Tahu', 5)
+        response = self.client.post(reverse('core:filter_produk'), {'per_tanggal': str(timezone.localdate())})
+        self.assertContains(response, 'Tahu')
+
+
+class CacheLaporanTest(TestCase):
+    def setUp(self):
+        self.folder = pakai_cache_sementara(self)
+        buat_produk('Tahu', 5)
+
+    def _statistik(self):
+        statistik = StatistikCacheLaporan.objects.get(jenisLaporan='produk')
+        return statistik.hit, statistik.miss
+
+    def test_hit_tanpa_render_ulang(self):
+        with cache_laporan.buka_laporan('produk', {}) as berkas:
+            isi = berkas.read()
+        with CaptureQueriesContext(connection) as queries:
+            with cache_laporan.buka_laporan('produk', {'stok_menipis': ''}) as berkas:
+                self.assertEqual(berkas.read(), isi)
+        # Versi data + penghitung hit, dataset tidak dibaca
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(self._statistik(), (1, 1))
+
+    def test_perubahan_data_membuat_kunci_baru(self):
+        cache_laporan.buka_laporan('produk', {}).close()
+        kurangi_stok({Produk.objects.get().pk: 1})
+        cache_laporan.buka_laporan('produk', {}).close()
+        self.assertEqual(self._statistik(), (0, 2))
+        self.assertEqual(len(os.listdir(self.folder)), 2)
+
+    def test_ganti_nama_pelanggan_membuat_kunci_baru(self):
+        pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        Pemesanan.objects.create(tanggalPemesanan=timezone.localdate(), idPelanggan=pelanggan, totalPemesanan=1000)
+        cache_laporan.buka_laporan('penjualan', {}).close()
+        versi = versi_data('penjualan')
+
+        pelanggan.namaPelanggan = 'Budi Santoso'
+        pelanggan.save()
+
+        self.assertNotEqual(versi_data('penjualan'), versi)
+        cache_laporan.buka_laporan('penjualan', {}).close()
+        statistik = StatistikCacheLaporan.objects.get(jenisLaporan='penjualan')
+        self.assertEqual((statistik.hit, statistik.miss), (0, 2))
+
+    def test_lru_menghapus_yang_paling_lama_dipakai(self):
+        cache_laporan.buka_laporan('produk', {}).close()
+        cache_laporan.buka_laporan('produk', {'stok_menipis': 'on'}).close()
+        lama, baru = sorted(os.listdir(self.folder), key=lambda nama: os.path.getmtime(os.path.join(self.folder, nama)))
+        os.utime(os.path.join(self.folder, lama), (0, 0))
+        ukuran_baru = os.path.getsize(os.path.join(self.folder, baru))
+
+        self.assertEqual(cache_laporan.bersihkan_cache(batas=ukuran_baru), 1)
+        self.assertEqual(os.listdir(self.folder), [baru])
+
+    def test_anonim_tidak_merender_laporan(self):
+        for nama in ['core:report_penjualan_pdf', 'core:report_produk_pdf', 'core:report_produksi_pdf']:
+            response = self.client.get(reverse(nama), {'date_from': '2024-01-01'})
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(os.listdir(self.folder), [])
+        # Baris statistik per jenis sudah ada sejak migrasi 0005; tidak ada hit maupun miss yang tercatat
+        self.assertEqual(
+            sorted(StatistikCacheLaporan.objects.values_list('jenisLaporan', 'hit', 'miss')),
+            [('penjualan', 0, 0), ('produk', 0, 0), ('produksi', 0, 0)]
+        )
+
+
+class RekapPenjualanTest(TestCase):
+    def setUp(self):
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        self.hari_ini = timezone.localdate()
+
+    def _pesan(self, status, total=1000, hari_lalu=0):
+        return Pemesanan.objects.create(
+            tanggalPemesanan=self.hari_ini - timedelta(days=hari_lalu), idPelanggan=self.pelanggan,
+            totalPemesanan=total, status=status
+        )
+
+    def _rekap(self):
+        # Bucket kosong (0 pesanan) setara dengan bucket yang tidak ada
+        return {
+            (r.tanggal, r.status): (r.jumlahPemesanan, r.totalPendapatan)
+            for r in RekapPenjualanHarian.objects.exclude(jumlahPemesanan=0, totalPendapatan=0)
+        }
+
+    def _agregat_langsung(self):
+        return {
+            (b['tanggalPemesanan'], b['status']): (b['jumlah'], b['total'])
+            for b in Pemesanan.objects.values('tanggalPemesanan', 'status')
+            .annotate(jumlah=Count('pk'), total=Sum('totalPemesanan')).order_by()
+        }
+
+    def test_insert_dan_hapus(self):
+        pesanan = self._pesan('Selesai', 2500)
+        self.assertEqual(self._rekap(), {(self.hari_ini, 'Selesai'): (1, 2500)})
+
+        pesanan.delete()
+        self.assertEqual(self._rekap(), {})
+
+    def test_status_masuk_dan_keluar_selesai(self):
+        pesanan = self._pesan('Diproses', 3000)
+        pesanan.status = 'Selesai'
+        pesanan.save()
+        self.assertEqual(self._rekap(), {(self.hari_ini, 'Selesai'): (1, 3000)})
+
+        pesanan.status = 'Dibatalkan'
+        pesanan.save()
+        self.assertEqual(self._rekap(), {(self.hari_ini, 'Dibatalkan'): (1, 3000)})
+
+    def test_rekap_sama_dengan_agregat_langsung(self):
+        a = self._pesan('Diproses', 1000)
+        b = self._pesan('Selesai', 2000, hari_lalu=3)
+        c = self._pesan('Dikirim', 1500, hari_lalu=40)
+        self._pesan('Selesai', 700, hari_lalu=40)
+
+        a.status = 'Selesai'
+        a.save()
+        b.totalPemesanan = 2600
+        b.tanggalPemesanan = self.hari_ini - timedelta(days=5)
+        b.save()
+        c.status = 'Dibatalkan'
+        c.save()
+        a.status = 'Dikirim'
+        a.save()
+        c.delete()
+
+        self.assertEqual(self._rekap(), self._agregat_langsung())
+        pendapatan_bulanan = sum(baris['total'] for baris in rekap_bulanan().filter(status='Selesai'))
+        self.assertEqual(
+            pendapatan_bulanan, Pemesanan.objects.filter(status='Selesai').aggregate(n=Sum('totalPemesanan'))['n']
+        )
+
+    def test_rebuild_rekap_memperbaiki_tabel(self):
+        self._pesan('Selesai', 1000)
+        self._pesan('Selesai', 500, hari_lalu=2)
+        self._pesan('Dibatalkan', 800)
+        RekapPenjualanHarian.objects.update(totalPendapatan=0)
+        RekapPenjualanHarian.objects.create(tanggal=self.hari_ini - timedelta(days=9), status='Dikirim', jumlahPemesanan=4)
+
+        self.assertEqual(rebuild_rekap(), 3)
+        self.assertEqual(self._rekap(), self._agregat_langsung())
+
+
+class PenghitungPemesananTest(TestCase):
+    def setUp(self):
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+
+    def _pesan(self, status):
+        return Pemesanan.objects.create(
+            tanggalPemesanan=timezone.now().date(), idPelanggan=self.pelanggan, totalPemesanan=1000, status=status
+        )
+
+    def test_penghitung_mengikuti_perubahan_status(self):
+        awal = jumlah_pemesanan_per_status()
+        pesanan = self._pesan('Diproses')
+        self._pesan('Dikirim')
+        self.assertEqual(get_pesanan_perhatian_count(None), awal['Diproses'] + awal['Dikirim'] + 2)
+
+        pesanan.status = 'Selesai'
+        pesanan.save()
+        pesanan.delete()
+        sekarang = jumlah_pemesanan_per_status()
+        self.assertEqual(sekarang['Diproses'], awal['Diproses'])
+        self.assertEqual(sekarang['Dikirim'], awal['Dikirim'] + 1)
+        self.assertEqual(sekarang['Selesai'], awal['Selesai'])
+
+    def test_badge_satu_query(self):
+        with self.assertNumQueries(1):
+            get_pesanan_perhatian_count(None)
+
+    def test_rekonsiliasi_memperbaiki_selisih(self):
+        self._pesan('Diproses')
+        Penghitung.objects.filter(nama='pemesanan:Diproses').update(nilai=99)
+
+        selisih = rekonsiliasi_penghitung()
+
+        self.assertEqual(selisih, {'pemesanan:Diproses': (99, 1)})
+        self.assertEqual(jumlah_pemesanan_per_status()['Diproses'], 1)
+        self.assertEqual(rekonsiliasi_penghitung(), {})
+
+    def test_tambah_atomik_baris_dibuat_request_lain(self):
+        tambah_atomik(Penghitung, {'nama': 'uji'}, nilai=3)
+        self.assertEqual(Penghitung.objects.get(nama='uji').nilai, 3)
+
+        # Request lain membuat baris di antara UPDATE (0 baris) dan INSERT kita
+        filter_asli = Penghitung.objects.filter
+        with mock.patch.object(
+            Penghitung.objects, 'filter', side_effect=[Penghitung.objects.none(), filter_asli(nama='uji')]
+        ):
+            tambah_atomik(Penghitung, {'nama': 'uji'}, nilai=2)
+        self.assertEqual(Penghitung.objects.get(nama='uji').nilai, 5)
+
+
+class RiwayatPesananTest(TestCase):
+    def setUp(self):
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        produk = buat_produk('Tahu', 100)
+        hari_ini = timezone.now().date()
+        # Beberapa pesanan di tanggal yang sama untuk menguji pemotongan berdasarkan id
+        for i in range(7):
+            pesanan = Pemesanan.objects.create(
+                tanggalPemesanan=hari_ini - timedelta(days=i // 3),
+                idPelanggan=self.pelanggan, totalPemesanan=1000, status='Selesai'
+            )
+            DetailPemesanan.objects.bulk_create([
+                DetailPemesanan(idProduk=produk, kuantiti=1, subTotal=1000, idKoleksiPemesanan=pesanan)
+                for _ in range(i % 3)
+            ])
+
+    def test_halaman_berurutan_tanpa_duplikat(self):
+        semua = list(Pemesanan.objects.filter(idPelanggan=self.pelanggan).order_by('-tanggalPemesanan', '-idPemesanan'))
+        hasil, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                halaman, cursor = halaman_riwayat(self.pelanggan.pk, cursor, ukuran=3)
+            hasil.extend(halaman)
+            if cursor is None:
+                break
+        self.assertEqual([p.pk for p in hasil], [p.pk for p in semua])
+        self.assertEqual(
+            {p.pk: p.jumlah_item for p in hasil},
+            {p.pk: p.detailpemesanan_set.count() for p in semua}
+        )
+
+    def test_cursor_rusak_kembali_ke_halaman_pertama(self):
+        pertama, _ = halaman_riwayat(self.pelanggan.pk, ukuran=3)
+        halaman, _ = halaman_riwayat(self.pelanggan.pk, 'bukan-cursor', ukuran=3)
+        self.assertEqual(halaman, pertama)
+
+    def test_endpoint_json(self):
+        session = self.client.session
+        session['pelanggan_id'] = self.pelanggan.pk
+        session.save()
+        _, cursor = halaman_riwayat(self.pelanggan.pk, ukuran=5)
+
+        response = self.client.get(reverse('pelanggan_pesanan_riwayat_json'), {'cursor': cursor})
+
+        data = response.json()
+        self.assertEqual(len(data['pesanan']), 2)
+        self.assertIsNone(data['cursor_berikut'])
+        self.assertIn('jumlah_item', data['pesanan'][0])
+
+    def _login_async_client(self):
+        session = SessionStore()
+        session.update({'pelanggan_id': self.pelanggan.pk, 'keranjang_siap': True})
+        session.create()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+    async def test_view_async(self):
+        await sync_to_async(self._login_async_client)()
+        pesanan = await Pemesanan.objects.filter(idPelanggan=self.pelanggan).alatest('idPemesanan')
+
+        response = await self.async_client.get(reverse('pelanggan_pesanan_riwayat'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['pesanan_list']), 7)
+
+        response = await self.async_client.get(
+            reverse('pelanggan_pesanan_detail_html', kwargs={'pesanan_id': pesanan.pk})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['pemesanan'], pesanan)
+
+        response = await self.async_client.get(reverse('pelanggan_beranda'))
+        self.assertEqual(response.status_code, 200)
+
+    async def test_view_async_tanpa_login(self):
+        response = await self.async_client.get(reverse('pelanggan_produk_list'))
+        self.assertRedirects(response, reverse('pelanggan_login'), fetch_redirect_response=False)
+
+
+class KeranjangDatabaseTest(TestCase):
+    def setUp(self):
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='rahasia123'
+        )
+        self.tahu = buat_produk('Tahu', 10, harga=5000)
+
+    def _login(self, **session_tambahan):
+        session = self.client.session
+        session['pelanggan_id'] = self.pelanggan.pk
+        session.update(session_tambahan)
+        session.save()
+
+    def _tulis_keranjang(self, url, data):
+        # Hitung query tulis ke tabel keranjang_item saja
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse(url), data)
+        return [
+            q['sql'] for q in queries
+            if 'keranjang_item' in q['sql'] and not q['sql'].lstrip().upper().startswith('SELECT')
+        ]
+
+    def test_tambah_ubah_hapus_satu_tulis(self):
+        self._login()
+        self.assertEqual(len(self._tulis_keranjang('pelanggan_keranjang_add', {'produk_id': self.tahu.pk, 'kuantiti': 2})), 1)
+        self.assertEqual(len(self._tulis_keranjang('pelanggan_keranjang_add', {'produk_id': self.tahu.pk, 'kuantiti': 1})), 1)
+        self.assertEqual(KeranjangItem.objects.get().kuantiti, 3)
+
+        self.assertEqual(len(self._tulis_keranjang('pelanggan_keranjang_update', {'produk_id': self.tahu.pk, 'kuantiti': 5})), 1)
+        self.assertEqual(KeranjangItem.objects.get().kuantiti, 5)
+
+        self.assertEqual(len(self._tulis_keranjang('pelanggan_keranjang_delete', {'produk_id': self.tahu.pk})), 1)
+        self.assertFalse(KeranjangItem.objects.exists())
+
+    def test_snapshot_harga_tetap_saat_kuantiti_bertambah(self):
+        self._login()
+        self.client.post(reverse('pelanggan_keranjang_add'), {'produk_id': self.tahu.pk, 'kuantiti': 1})
+        Produk.objects.filter(pk=self.tahu.pk).update(harga=6000)
+        self.client.post(reverse('pelanggan_keranjang_add'), {'produk_id': self.tahu.pk, 'kuantiti': 1})
+        item = KeranjangItem.objects.get()
+        self.assertEqual((item.kuantiti, item.hargaSnapshot), (2, 5000))
+
+    def test_keranjang_bertahan_setelah_logout(self):
+        self._login()
+        self.client.post(reverse('pelanggan_keranjang_add'), {'produk_id': self.tahu.pk, 'kuantiti': 2})
+        self.client.get(reverse('pelanggan_logout'))
+        self.client.post(reverse('pelanggan_login'), {'username': 'budi', 'password': 'rahasia123'})
+
+        response = self.client.get(reverse('pelanggan_keranjang_view'))
+        self.assertEqual([item['kuantiti'] for item in response.context['cart_items']], [2])
+
+    def test_keranjang_session_dipindah_saat_login(self):
+        session = self.client.session
+        session['keranjang'] = {str(self.tahu.pk): {'nama': 'Tahu', 'harga': 5000, 'kuantiti': 4, 'stok': 10}}
+        session.save()
+
+        self.client.post(reverse('pelanggan_login'), {'username': 'budi', 'password': 'rahasia123'})
+
+        self.assertNotIn('keranjang', self.client.session)
+        item = KeranjangItem.objects.get()
+        self.assertEqual((item.idProduk_id, item.kuantiti, item.hargaSnapshot), (self.tahu.pk, 4, 5000))
+
+    def test_checkout_mengosongkan_keranjang(self):
+        self._login()
+        self.client.post(reverse('pelanggan_keranjang_add'), {'produk_id': self.tahu.pk, 'kuantiti': 3})
+        bukti = SimpleUploadedFile('bukti.gif', GIF_1PX, content_type='image/gif')
+
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            self.client.post(
+                reverse('pelanggan_checkout'),
+                {'alamat_pengiriman': 'Kupang', 'bukti_bayar': bukti, 'total_dikonfirmasi': '15000'}
+            )
+
+        self.assertFalse(KeranjangItem.objects.exists())
+        self.assertEqual(Pemesanan.objects.get(idPelanggan=self.pelanggan).totalPemesanan, 15000)
+        self.tahu.refresh_from_db()
+        self.assertEqual(self.tahu.stok, 7)
+
+
+class HargaKeranjangTest(TestCase):
+    def setUp(self):
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        pastikan_keranjang(self.pelanggan.pk)
+        session = self.client.session
+        session['pelanggan_id'] = self.pelanggan.pk
+        session['keranjang_siap'] = True
+        session.save()
+
+    def _isi(self, n):
+        for i in range(n):
+            produk = buat_produk(f'Produk {KeranjangItem.objects.count()}', 10, harga=1000)
+            simpan_item(self.pelanggan.pk, produk.pk, 2, produk.harga)
+
+    def test_satu_query_dengan_tanda_harga_dan_stok(self):
+        self._isi(3)
+        naik, habis, _ = [item.idProduk for item in KeranjangItem.objects.order_by('idItem')]
+        Produk.objects.filter(pk=naik.pk).update(harga=1500)
+        Produk.objects.filter(pk=habis.pk).update(stok=1)
+
+        with self.assertNumQueries(1):
+            keranjang = hitung_keranjang(self.pelanggan.pk)
+
+        self.assertEqual([item['harga_berubah'] for item in keranjang['items']], [True, False, False])
+        self.assertEqual([item['stok_kurang'] for item in keranjang['items']], [False, True, False])
+        self.assertEqual(keranjang['total'], 3000 + 2000 + 2000)
+        self.assertFalse(keranjang['bisa_checkout'])
+
+    def test_halaman_keranjang_query_tetap(self):
+        self._isi(1)
+        with CaptureQueriesContext(connection) as sedikit:
+            self.client.get(reverse('pelanggan_keranjang_view'))
+        self._isi(10)
+        with CaptureQueriesContext(connection) as banyak:
+            response = self.client.get(reverse('pelanggan_keranjang_view'))
+        self.assertEqual(len(response.context['cart_items']), 11)
+        self.assertEqual(len(sedikit), len(banyak))
+
+    def test_checkout_ditolak_jika_harga_berubah(self):
+        self._isi(1)
+        Produk.objects.update(harga=1200)
+
+        response = self.client.post(
+            reverse('pelanggan_checkout'),
+            {'alamat_pengiriman': 'Kupang', 'bukti_bayar': SimpleUploadedFile('b.gif', GIF_1PX), 'total_dikonfirmasi': '2000'}
+        )
+
+        self.assertRedirects(response, reverse('pelanggan_checkout_view'), fetch_redirect_response=False)
+        self.assertFalse(Pemesanan.objects.exists())
+
+
+class KatalogCacheTest(TestCase):
+    def setUp(self):
+        caches['katalog'].clear()
+        self.addCleanup(caches['katalog'].clear)
+        self.tahu = buat_produk('Tahu', 10)
+
+    def _nama(self):
+        return [produk.namaProduk for produk in katalog.produk_tersedia('Produk Jadi')]
+
+    def test_hit_tanpa_query(self):
+        self.assertEqual(self._nama(), ['Tahu'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._nama(), ['Tahu'])
+
+    def test_save_produk_menginvalidasi(self):
+        self._nama()
+        with self.captureOnCommitCallbacks(execute=True):
+            buat_produk('Tempe', 5)
+        self.assertEqual(self._nama(), ['Tahu', 'Tempe'])
+
+    def test_perubahan_stok_menginvalidasi(self):
+        self._nama()
+        with self.captureOnCommitCallbacks(execute=True):
+            kurangi_stok({self.tahu.pk: 10})
+        self.assertEqual(self._nama(), [])
+
+    def test_stok_gagal_tidak_menginvalidasi(self):
+        self._nama()
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(StokTidakCukup):
+                kurangi_stok({self.tahu.pk: 11})
+        self.assertEqual(callbacks, [])
+
+    def test_worker_lain_tidak_membangun_bersamaan(self):
+        kunci = f'katalog:{katalog._versi()}:Produk_Jadi'
+        caches['katalog'].add(f'{kunci}:bangun', 1)
+
+        with mock.patch.object(katalog, 'TUNGGU_BANGUN', 0.1):
+            self.assertEqual(self._nama(), ['Tahu'])
+
+        # Tanpa kunci pembangun, hasil baca langsung tidak disimpan ke cache
+        self.assertIsNone(caches['katalog'].get(kunci))
+
+    def test_async_menunggu_pembangun_tanpa_memblokir_thread(self):
+        kunci = f'katalog:{katalog._versi()}:Produk_Jadi'
+        caches['katalog'].add(f'{kunci}:bangun', 1)
+
+        # Penantian memakai asyncio.sleep, bukan time.sleep di thread ORM bersama
+        with mock.patch.object(katalog, 'TUNGGU_BANGUN', 0.1), \
+                mock.patch.object(katalog.time, 'sleep', side_effect=AssertionError):
+            hasil = async_to_sync(katalog.aproduk_tersedia)('Produk Jadi')
+        self.assertEqual([produk.namaProduk for produk in hasil], ['Tahu'])
+
+        caches['katalog'].delete(f'{kunci}:bangun')
+        async_to_sync(katalog.aproduk_tersedia)('Produk Jadi')
+        with self.assertNumQueries(0):
+            self.assertEqual(self._nama(), ['Tahu'])
+
+    def test_kunci_versi_hilang_tidak_memakai_ulang_nomor_lama(self):
+        self.assertEqual(self._nama(), ['Tahu'])
+        with self.captureOnCommitCallbacks(execute=True):
+            Produk.objects.filter(pk=self.tahu.pk).update(stok=0)
+            katalog.invalidasi_katalog()
+        # Kunci versi terbuang dari cache (mis. eviction), entri versi lama masih ada
+        caches['katalog'].delete(katalog.KUNCI_VERSI)
+        self.assertEqual(self._nama(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Produk.objects.filter(pk=self.tahu.pk).update(stok=5)
+            katalog.invalidasi_katalog()
+        self.assertEqual(self._nama(), ['Tahu'])
+
+
+def png(lebar, tinggi):
+    isi = BytesIO()
+    Image.new('RGBA', (lebar, tinggi), (200, 0, 0, 128)).save(isi, 'PNG')
+    return isi.getvalue()
+
+
+class ThumbnailTest(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        pengaturan = override_settings(MEDIA_ROOT=media.name)
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+        self.media = media.name
+
+    def test_upload_membuat_turunan(self):
+        produk = Produk(namaProduk='Tahu', jenisProduk='Produk Jadi', harga=1000, stok=1, satuan='buah')
+        produk.foto = SimpleUploadedFile('tahu.png', png(1200, 600))
+        with self.captureOnCommitCallbacks(execute=True):
+            produk.save()
+
+        for lebar, tinggi in ((150, 75), (400, 200), (800, 400)):
+            for format in ('webp', 'jpg'):
+                with Image.open(os.path.join(self.media, nama_thumbnail(produk.foto.name, lebar, format))) as turunan:
+                    self.assertEqual(turunan.size, (lebar, tinggi))
+        self.assertTrue(url_thumbnail(produk.foto, 300).endswith('tahu.png_400w.webp'))
+
+    def _produk(self, nama_file, lebar, tinggi):
+        produk = Produk(namaProduk=nama_file, jenisProduk='Produk Jadi', harga=1000, stok=1, satuan='buah')
+        produk.foto = SimpleUploadedFile(nama_file, png(lebar, tinggi))
+        with self.captureOnCommitCallbacks(execute=True):
+            produk.save()
+        return produk
+
+    def _ukuran_turunan(self, nama, lebar=150):
+        with Image.open(os.path.join(self.media, nama_thumbnail(nama, lebar))) as turunan:
+            return turunan.size
+
+    def test_nama_file_sama_beda_ekstensi(self):
+        lebar = self._produk('foto.png', 1200, 600)
+        tinggi = self._produk('foto.jpg', 600, 1200)
+
+        self.assertNotEqual(url_thumbnail(lebar.foto, 150), url_thumbnail(tinggi.foto, 150))
+        self.assertEqual(self._ukuran_turunan(lebar.foto.name), (150, 75))
+        self.assertEqual(self._ukuran_turunan(tinggi.foto.name), (150, 300))
+
+    def test_ganti_dan_hapus_gambar_menghapus_turunan(self):
+        produk = self._produk('tahu.png', 1200, 600)
+        lama = produk.foto.name
+
+        produk.foto = SimpleUploadedFile('tahu_baru.png', png(800, 800))
+        with self.captureOnCommitCallbacks(execute=True):
+            produk.save()
+        self.assertFalse(os.path.exists(os.path.join(self.media, nama_thumbnail(lama, 150))))
+        self.assertEqual(self._ukuran_turunan(produk.foto.name), (150, 150))
+
+        baru = produk.foto.name
+        with self.captureOnCommitCallbacks(execute=True):
+            produk.delete()
+        self.assertFalse(os.path.exists(os.path.join(self.media, nama_thumbnail(baru, 150))))
+
+    def test_asli_lebih_baru_dibuat_ulang(self):
+        produk = self._produk('tahu.png', 1200, 600)
+        asli = os.path.join(self.media, produk.foto.name)
+        with open(asli, 'wb') as berkas:
+            berkas.write(png(600, 1200))
+        waktu = os.path.getmtime(os.path.join(self.media, nama_thumbnail(produk.foto.name, 150))) + 10
+        os.utime(asli, (waktu, waktu))
+
+        self.assertEqual(buat_thumbnail(produk.foto), 6)
+        self.assertEqual(self._ukuran_turunan(produk.foto.name), (150, 300))
+
+    def test_admin_memakai_thumbnail(self):
+        pelanggan = Pelanggan.objects.create(namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='x')
+        with self.captureOnCommitCallbacks(execute=True):
+            Pemesanan.objects.create(
+                idPelanggan=pelanggan, tanggalPemesanan=timezone.now(), totalPemesanan=1000,
+                buktiBayar=SimpleUploadedFile('bukti.png', png(2000, 3000))
+            )
+        self.client.force_login(User.objects.create_superuser('admin', 'a@a.id', 'x'))
+
+        response = self.client.get('/admin/core/pemesanan/')
+
+        self.assertContains(response, 'bukti.png_150w.webp')
+        self.assertNotContains(response, 'src="/media/bukti_pembayaran/bukti.png"')
+
+    def test_turunan_dibuat_setelah_commit(self):
+        pelanggan = Pelanggan.objects.create(namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='x')
+        habis = buat_produk('Tahu', 0)
+        pemesanan = Pemesanan(
+            idPelanggan=pelanggan, tanggalPemesanan=timezone.now().date(),
+            buktiBayar=SimpleUploadedFile('bukti.png', png(1600, 1067))
+        )
+
+        # Checkout batal karena stok kurang: tidak ada encode yang dijadwalkan, tidak ada file turunan
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(StokTidakCukup):
+                simpan_pemesanan(pemesanan, [(habis.pk, 1, 1000)])
+        self.assertEqual(callbacks, [])
+        nama = pemesanan.buktiBayar.name
+        self.assertFalse(os.path.exists(os.path.join(self.media, nama_thumbnail(nama, 150, 'webp'))))
+
+        Produk.objects.filter(pk=habis.pk).update(stok=5)
+        pemesanan.pk = None
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            simpan_pemesanan(pemesanan, [(habis.pk, 1, 1000)])
+        nama = pemesanan.buktiBayar.name
+        # Selama transaksi belum commit belum ada file turunan
+        self.assertFalse(os.path.exists(os.path.join(self.media, nama_thumbnail(nama, 150, 'webp'))))
+        for callback in callbacks:
+            callback()
+        self.assertTrue(os.path.exists(os.path.join(self.media, nama_thumbnail(nama, 150, 'webp'))))
+
+    def test_gambar_rusak_dilewati(self):
+        produk = Produk.objects.create(
+            namaProduk='Tahu', jenisProduk='Produk Jadi', harga=1000, stok=1, satuan='buah',
+            foto=SimpleUploadedFile('rusak.png', b'bukan gambar')
+        )
+        # Tanpa turunan, URL jatuh kembali ke file asli
+        self.assertEqual(url_thumbnail(produk.foto, 150), produk.foto.url)
+
+
+class BuktiBayarTest(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        pengaturan = override_settings(MEDIA_ROOT=media.name)
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        tahu = buat_produk('Tahu', 10, harga=5000)
+        pastikan_keranjang(self.pelanggan.pk)
+        simpan_item(self.pelanggan.pk, tahu.pk, 1, 5000)
+        session = self.client.session
+        session['pelanggan_id'] = self.pelanggan.pk
+        session['keranjang_siap'] = True
+        session.save()
+
+    def _checkout(self, bukti):
+        return self.client.post(
+            reverse('pelanggan_checkout'),
+            {'alamat_pengiriman': 'Kupang', 'bukti_bayar': bukti, 'total_dikonfirmasi': '5000'},
+            follow=True
+        )
+
+    def test_foto_diperkecil_tanpa_exif(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientasi: putar 90 derajat
+        exif[0x010F] = 'Kamera Ponsel'
+        isi = BytesIO()
+        Image.new('RGB', (4000, 3000), (0, 120, 0)).save(isi, 'JPEG', exif=exif)
+
+        self._checkout(SimpleUploadedFile('foto.jpeg', isi.getvalue()))
+
+        bukti = Pemesanan.objects.get().buktiBayar
+        self.assertTrue(bukti.name.endswith('.jpg'))
+        with Image.open(bukti.path) as gambar:
+            self.assertEqual(gambar.size, (1200, 1600))
+            self.assertEqual(dict(gambar.getexif()), {})
+
+    def test_file_terlalu_besar_ditolak(self):
+        with mock.patch.object(unggah, 'BATAS_BUKTI_BAYAR', 1024):
+            response = self._checkout(SimpleUploadedFile('besar.png', png(300, 300) + b'\0' * 4096))
+
+        self.assertContains(response, 'Ukuran bukti pembayaran maksimal')
+        self.assertFalse(Pemesanan.objects.exists())
+
+    def test_batas_di_tengah_unggahan_tidak_memutus_koneksi(self):
+        handler = unggah.BatasUkuranUploadHandler(batas=10)
+        with self.assertRaises(StopUpload) as konteks:
+            handler.receive_data_chunk(b'\0' * 11, 0)
+        self.assertFalse(konteks.exception.connection_reset)
+
+    def test_content_length_terlalu_besar_ditolak_sebelum_dibaca(self):
+        with mock.patch.object(unggah, 'BATAS_BUKTI_BAYAR', 1024), \
+                mock.patch('core.views_pelanggan.handler_bukti_bayar') as handler:
+            response = self._checkout(SimpleUploadedFile('besar.png', png(300, 300) + b'\0' * 100_000))
+
+        handler.assert_not_called()
+        self.assertContains(response, 'Ukuran bukti pembayaran maksimal')
+        self.assertFalse(Pemesanan.objects.exists())
+
+    def test_bukan_gambar_ditolak(self):
+        response = self._checkout(SimpleUploadedFile('bukti.jpg', b'%PDF-1.4 bukan gambar'))
+
+        self.assertContains(response, 'Bukti pembayaran harus berupa gambar')
+        self.assertFalse(Pemesanan.objects.exists())
+
+    def test_csrf_tetap_diperiksa(self):
+        client = Client(enforce_csrf_checks=True)
+        client.cookies = self.client.cookies
+        response = client.post(reverse('pelanggan_checkout'), {'alamat_pengiriman': 'Kupang'})
+        self.assertEqual(response.status_code, 403)
+
+
+class JurnalStokTest(TestCase):
+    def setUp(self):
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        self.karyawan = Karyawan.objects.create(nama='Sari', username='sari', password='rahasia')
+
+    def _jurnal(self, produk):
+        return list(MutasiStok.objects.filter(idProduk=produk).order_by('idMutasi').values_list('jenisMutasi', 'jumlah'))
+
+    def test_penjualan_dan_pembatalan_tercatat(self):
+        tahu = buat_produk('Tahu', 10)
+        pemesanan = simpan_pemesanan(
+            Pemesanan(idPelanggan=self.pelanggan, tanggalPemesanan=timezone.now().date()), [(tahu.pk, 3, 1000)]
+        )
+        tambah_stok({tahu.pk: 3}, 'Pembatalan', pemesanan=pemesanan)
+
+        self.assertEqual(self._jurnal(tahu), [('Saldo Awal', 10), ('Penjualan', -3), ('Pembatalan', 3)])
+        self.assertEqual(MutasiStok.objects.filter(idPemesanan=pemesanan).count(), 2)
+        self.assertEqual(rekonsiliasi_stok(), {})
+
+    def test_produksi_memakai_selisih(self):
+        produksi = Produksi(
+            tanggalProduksi=timezone.now().date(), jenisHasil='Tahu', jumlahHasil=10, satuanHasil='buah',
+            idKaryawan=self.karyawan
+        )
+        produksi.save()
+        produksi.jumlahHasil = 6
+        produksi.save()
+
+        tahu = Produk.objects.get(namaProduk='Tahu')
+        self.assertEqual(tahu.stok, 6)
+        self.assertEqual(self._jurnal(tahu), [('Produksi Masuk', 10), ('Produksi Masuk', -4)])
+        self.assertEqual(rekonsiliasi_stok(), {})
+
+    def test_koreksi_bahan_terpakai(self):
+        kedelai = buat_produk('Kedelai', 10, jenis='Bahan Baku')
+        produksi = Produksi.objects.create(
+            tanggalProduksi=timezone.now().date(), jenisHasil='Tahu', jumlahHasil=10, satuanHasil='buah',
+            idKaryawan=self.karyawan
+        )
+        detail = DetailProduksi.objects.create(idProduksi=produksi, idProduk=kedelai, jumlahBahanTerpakai=4)
+        detail.jumlahBahanTerpakai = 1
+        detail.save()
+
+        kedelai.refresh_from_db()
+        self.assertEqual(kedelai.stok, 9)
+        self.assertEqual(self._jurnal(kedelai), [('Saldo Awal', 10), ('Bahan Keluar', -4), ('Penyesuaian', 3)])
+        self.assertEqual(rekonsiliasi_stok(), {})
+
+    def test_edit_admin_tidak_menimpa_checkout(self):
+        tahu = buat_produk('Tahu', 10)
+        self.client.force_login(User.objects.create_superuser('admin', 'a@a.id', 'x'))
+        # Pelanggan checkout 3 setelah admin membuka form dengan stok 10
+        kurangi_stok({tahu.pk: 3})
+
+        self.client.post(f'/admin/core/produk/{tahu.pk}/change/', {
+            'namaProduk': 'Tahu', 'jenisProduk': 'Produk Jadi', 'harga': 1000, 'satuan': 'buah',
+            'stok': 15, 'initial-stok': 10,
+        })
+
+        tahu.refresh_from_db()
+        self.assertEqual(tahu.stok, 12)
+        self.assertEqual(self._jurnal(tahu)[-1], ('Penyesuaian', 5))
+
+    def test_rekonsiliasi_memperbaiki_stok(self):
+        tahu = buat_produk('Tahu', 10)
+        Produk.objects.filter(pk=tahu.pk).update(stok=99)
+
+        self.assertEqual(rekonsiliasi_stok(), {tahu.pk: ('Tahu', 99, 10)})
+        rekonsiliasi_stok(perbaiki=True)
+
+        tahu.refresh_from_db()
+        self.assertEqual(tahu.stok, 10)
+        self.assertEqual(rekonsiliasi_stok(), {})
+
+
+class SnapshotStokTest(TestCase):
+    def setUp(self):
+        self.hari = [timezone.localdate() - timedelta(days=n) for n in (3, 2, 1)]
+        self.tahu = buat_produk('Tahu', 10)
+        kurangi_stok({self.tahu.pk: 3})
+        tambah_stok({self.tahu.pk: 5}, 'Produksi Masuk')
+        # Satu mutasi per hari: saldo awal, penjualan, produksi
+        for mutasi, hari in zip(MutasiStok.objects.order_by('idMutasi'), self.hari):
+            MutasiStok.objects.filter(pk=mutasi.pk).update(waktu=akhir_hari(hari) - timedelta(hours=1))
+
+    def _stok(self, tanggal):
+        return {produk.namaProduk: produk.stok_laporan for produk in dataset_produk(per_tanggal=tanggal)}
+
+    def test_stok_per_tanggal(self):
+        self.assertEqual(self._stok(self.hari[0] - timedelta(days=1)), {})
+        self.assertEqual(self._stok(self.hari[0]), {'Tahu': 10})
+        self.assertEqual(self._stok(self.hari[1].isoformat()), {'Tahu': 7})
+        self.assertEqual(self._stok(self.hari[2]), {'Tahu': 12})
+
+    def test_query_mulai_dari_snapshot(self):
+        buat_snapshot(self.hari[0])
+        buat_snapshot(self.hari[1])
+        self.assertEqual(SnapshotStok.objects.get(tanggal=self.hari[1]).stok, 7)
+
+        # Jurnal sebelum snapshot tidak dibaca lagi
+        MutasiStok.objects.filter(jenisMutasi='Saldo Awal').delete()
+        self.assertEqual(self._stok(self.hari[2]), {'Tahu': 12})
+
+    def test_pergerakan_antara_dua_tanggal(self):
+        buat_snapshot(self.hari[0])
+        produk = pergerakan_stok(self.hari[1], self.hari[2]).get(pk=self.tahu.pk)
+        self.assertEqual((produk.stok_awal, produk.masuk, produk.keluar, produk.stok_akhir), (10, 5, 3, 12))
+
+    def test_snapshot_hari_ini_ditolak(self):
+        with self.assertRaises(ValueError):
+            buat_snapshot(timezone.localdate())
+
+
+class PragmaSqliteTest(TestCase):
+    def _pragma(self, nama):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {nama}')
+            return cursor.fetchone()[0]
+
+    def test_pragma_dipasang_saat_koneksi(self):
+        self.assertEqual(self._pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self._pragma('busy_timeout'), basisdata.PRAGMA_SQLITE['busy_timeout'])
+        self.assertEqual(self._pragma('temp_store'), 2)  # MEMORY
+
+    def test_journal_mode_tidak_dipasang_per_koneksi(self):
+        # WAL tersimpan di file database; manage.py di lingkungan dev tidak boleh mengubah db.sqlite3
+        self.assertNotIn('journal_mode', basisdata.PRAGMA_SQLITE)
+
+
+
+class TransaksiTulisTest(TransactionTestCase):
+    def _begin(self, fungsi):
+        with CaptureQueriesContext(connection) as query:
+            fungsi()
+        return [q['sql'] for q in query.captured_queries if q['sql'].startswith('BEGIN')]
+
+    def _atomic(self, blok):
+        def fungsi():
+            with blok():
+                Produk.objects.count()
+        return fungsi
+
+    def test_hanya_transaksi_tulis_begin_immediate(self):
+        self.assertEqual(self._begin(self._atomic(basisdata.transaksi_tulis)), ['BEGIN IMMEDIATE'])
+        self.assertEqual(self._begin(self._atomic(transaction.atomic)), ['BEGIN'])
+
+    def test_admin_get_tidak_mengambil_lock_tulis(self):
+        produk = buat_produk('Tahu', 0)  # Tanpa baris jurnal saldo awal yang melindungi produk dari hapus
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+        url = reverse('custom_admin:core_produk_delete', args=[produk.pk])
+
+        self.assertNotIn('BEGIN IMMEDIATE', self._begin(lambda: self.client.get(url)))
+        self.assertEqual(self._begin(lambda: self.client.post(url, {'post': 'yes'}))[0], 'BEGIN IMMEDIATE')
+        self.assertFalse(Produk.objects.filter(pk=produk.pk).exists())
+
+
+class ProfilerQueryTest(TestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.log = os.path.join(folder.name, 'profiler.jsonl')
+        pengaturan = override_settings(MIDDLEWARE=['core.profiler.ProfilerQueryMiddleware', *settings.MIDDLEWARE])
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+        patch = mock.patch.dict(profiler.PENGATURAN, {'LOG': self.log, 'AMBANG_N1': 3})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+        self.pelanggan = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        session = self.client.session
+        session['pelanggan_id'] = self.pelanggan.pk
+        session['keranjang_siap'] = True
+        session.save()
+
+    def test_sidik_query_mengabaikan_literal(self):
+        self.assertEqual(
+            profiler.sidik_query("SELECT * FROM t WHERE a IN (%s, %s, %s) AND b = 'x' LIMIT 21"),
+            'SELECT * FROM t WHERE a IN (...) AND b = ? LIMIT ?'
+        )
+
+    def test_server_timing_dan_log(self):
+        response = self.client.get(reverse('pelanggan_keranjang_view'))
+
+        self.assertRegex(response['Server-Timing'], r'^sql;dur=[\d.]+;desc="\d+ query", total;dur=[\d.]+$')
+        data = list(profiler.baca_log(self.log))
+        self.assertEqual(data[0]['view'], 'pelanggan_keranjang_view')
+        self.assertGreater(data[0]['jumlah_query'], 0)
+
+    def test_n_plus_1_terdeteksi_dan_diringkas(self):
+        rekaman = profiler.RekamanQuery()
+        for produk_id in (1, 2, 3, 3):
+            rekaman.catat('SELECT * FROM core_produk WHERE id = %s', (produk_id,), 0.001)
+
+        self.assertEqual(rekaman.n_plus_1(3), [{'sql': 'SELECT * FROM core_produk WHERE id = %s', 'jumlah': 4}])
+        self.assertEqual(rekaman.duplikat(), [{'sql': 'SELECT * FROM core_produk WHERE id = %s', 'jumlah': 2}])
+
+        ringkasan = ringkas_log([
+            {'view': 'a', 'durasi_ms': 10, 'jumlah_query': 2, 'sql_ms': 1, 'duplikat': [], 'n_plus_1': []},
+            {'view': 'b', 'durasi_ms': 20, 'jumlah_query': 9, 'sql_ms': 8, 'duplikat': [],
+             'n_plus_1': [{'sql': 'SELECT ?', 'jumlah': 7}]},
+        ])
+        self.assertEqual([v['view'] for v in ringkasan], ['b', 'a'])
+        self.assertEqual((ringkasan[0]['n_plus_1'], ringkasan[0]['sidik']), (1, [('SELECT ?', 7)]))
+
+    async def test_view_async_terhitung(self):
+        await sync_to_async(self.client.session.save)()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = self.client.session.session_key
+
+        response = await self.async_client.get(reverse('pelanggan_produk_list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('desc="0 query"', response['Server-Timing'])
+
+
+class DataSintetisTest(TestCase):
+    def test_data_konsisten(self):
+        hasil = buat_data_sintetis(300, pelanggan=10, produk=11, produksi=50, karyawan=2)
+
+        self.assertEqual((hasil['pemesanan'], hasil['produksi']), (300, 50))
+        self.assertEqual(DetailPemesanan.objects.count(), hasil['detail_pemesanan'])
+        # Total pesanan sama dengan jumlah subtotal detailnya
+        self.assertFalse(
+            Pemesanan.objects.annotate(total_detail=Sum('detailpemesanan__subTotal'))
+            .exclude(totalPemesanan=F('total_detail')).exists()
+        )
+        self.assertEqual(
+            RekapPenjualanHarian.objects.aggregate(n=Sum('jumlahPemesanan'))['n'], Pemesanan.objects.count()
+        )
+        self.assertEqual(sum(jumlah_pemesanan_per_status().values()), 300)
+        self.assertEqual(rekonsiliasi_stok(), {})
+
+
+class StatistikKaryawanTest(TestCase):
+    def setUp(self):
+        caches['statistik'].clear()
+        self.addCleanup(caches['statistik'].clear)
+        self.karyawan = Karyawan.objects.create(nama='Sari', username='sari', password='rahasia')
+        self.lain = Karyawan.objects.create(nama='Joko', username='joko', password='rahasia')
+        self.kedelai = buat_produk('Kedelai', 100, jenis='Bahan Baku')
+
+    def _produksi(self, karyawan, jenis, jumlah, bahan=0):
+        with self.captureOnCommitCallbacks(execute=True):
+            return simpan_produksi(
+                Produksi(tanggalProduksi=timezone.localdate(), jenisHasil=jenis, jumlahHasil=jumlah,
+                         satuanHasil='buah', idKaryawan=karyawan),
+                [(self.kedelai.pk, bahan)]
+            )
+
+    def test_satu_query_lalu_dari_cache(self):
+        self._produksi(self.karyawan, 'Tahu', 100, bahan=5)
+        self._produksi(self.karyawan, 'Tahu', 50, bahan=3)
+        self._produksi(self.karyawan, 'Tempe', 80)
+        self._produksi(self.lain, 'Tempe', 999, bahan=9)
+
+        with self.assertNumQueries(2):
+            statistik = statistik_karyawan(self.karyawan.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(statistik_karyawan(self.karyawan.pk), statistik)
+
+        self.assertEqual(statistik['total_produksi'], 3)
+        self.assertEqual(statistik['per_jenis'], {'Tahu': {'jumlah': 2, 'hasil': 150}, 'Tempe': {'jumlah': 1, 'hasil': 80}})
+        self.assertEqual([(b['nama'], b['jumlah']) for b in statistik['bahan_terpakai']], [('Kedelai', 8)])
+
+    def test_produksi_baru_hanya_menginvalidasi_karyawannya(self):
+        statistik_karyawan(self.karyawan.pk)
+        statistik_karyawan(self.lain.pk)
+
+        self._produksi(self.karyawan, 'Tempe', 10)
+
+        self.assertEqual(statistik_karyawan(self.karyawan.pk)['total_produksi'], 1)
+        with self.assertNumQueries(0):
+            statistik_karyawan(self.lain.pk)
+
+    def test_hasil_hitungan_sebelum_commit_tidak_dipakai(self):
+        # Pembaca menghitung dari data lama, commit terjadi, lalu pembaca baru menyimpan hasilnya
+        lama = hitung_statistik(self.karyawan.pk)
+
+        def hitung_lambat(karyawan_id):
+            self._produksi(self.karyawan, 'Tahu', 10)
+            return lama
+
+        with mock.patch('core.statistik_karyawan.hitung_statistik', hitung_lambat):
+            self.assertEqual(statistik_karyawan(self.karyawan.pk)['total_produksi'], 0)
+
+        self.assertEqual(statistik_karyawan(self.karyawan.pk)['total_produksi'], 1)
+
+    def test_pindah_karyawan_menginvalidasi_keduanya(self):
+        produksi = self._produksi(self.karyawan, 'Tahu', 10)
+        statistik_karyawan(self.karyawan.pk)
+        statistik_karyawan(self.lain.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            produksi.idKaryawan = self.lain
+            produksi.save()
+
+        self.assertEqual(statistik_karyawan(self.karyawan.pk)['total_produksi'], 0)
+        self.assertEqual(statistik_karyawan(self.lain.pk)['total_produksi'], 1)
+
+    def test_dashboard(self):
+        self._produksi(self.karyawan, 'Tahu', 100, bahan=5)
+        session = self.client.session
+        session['karyawan_id'] = self.karyawan.pk
+        session.save()
+
+        response = self.client.get(reverse('core:karyawan_dashboard'))
+
+        self.assertEqual((response.context['total_tahu'], response.context['hasil_tahu']), (1, 100))
+        self.assertContains(response, 'Total Bahan Baku Terpakai')
+
+
+class BiayaProduksiTest(TestCase):
+    def setUp(self):
+        self.karyawan = Karyawan.objects.create(nama='Sari', username='sari', password='rahasia')
+        self.kedelai = buat_produk('Kedelai', 100, jenis='Bahan Baku', harga=12000)
+        self.cuka = buat_produk('Cuka', 100, jenis='Bahan Baku', harga=8000)
+        resep = Resep.objects.create(jenisHasil='Tahu', hasilPerBatch=100, satuanHasil='buah')
+        DetailResep.objects.create(idResep=resep, idProduk=self.kedelai, jumlahBahan=5)
+        DetailResep.objects.create(idResep=resep, idProduk=self.cuka, jumlahBahan='0.5')
+
+    def _produksi(self, jenis, jumlah, bahan=None):
+        return simpan_produksi(
+            Produksi(tanggalProduksi=timezone.localdate(), jenisHasil=jenis, jumlahHasil=jumlah,
+                     satuanHasil='buah', idKaryawan=self.karyawan),
+            bahan
+        )
+
+    def test_kebutuhan_resep_dibulatkan_ke_atas(self):
+        self.assertEqual(sorted(kebutuhan_resep('Tahu', 150)), sorted([(self.kedelai.pk, 8), (self.cuka.pk, 1)]))
+        self.assertEqual(kebutuhan_resep('Tempe', 150), [])
+
+    def test_tanpa_bahan_memakai_resep(self):
+        produksi = self._produksi('Tahu', 200)
+
+        self.kedelai.refresh_from_db()
+        produksi.refresh_from_db()
+        self.assertEqual(self.kedelai.stok, 90)
+        self.assertEqual(produksi.biayaBahan, 10 * 12000 + 1 * 8000)
+        self.assertEqual(produksi.biayaStandar, 10 * 12000 + 1 * 8000)
+        self.assertEqual(produksi.biayaPerUnit, 640)
+        self.assertEqual(produksi.ringkasanBahan, '10 buah Kedelai + 1 buah Cuka')
+
+    def test_simpan_produksi_menghitung_biaya_sekali(self):
+        with CaptureQueriesContext(connection) as queries:
+            produksi = self._produksi('Tahu', 100, [(self.kedelai.pk, 5)])
+        self.assertEqual(sum('"biayaBahan" =' in q['sql'] for q in queries.captured_queries), 1)
+
+        # Edit berikutnya tetap dihitung ulang oleh signal
+        produksi.jumlahHasil = 50
+        produksi.save()
+        produksi.refresh_from_db()
+        self.assertEqual((produksi.biayaBahan, produksi.biayaPerUnit), (60000, 1200))
+
+    def test_form_dengan_jumlah_nol_memakai_resep(self):
+        session = self.client.session
+        session['karyawan_id'] = self.karyawan.pk
+        session.save()
+
+        self.client.post(reverse('core:karyawan_produksi_input'), {
+            'tanggalProduksi': str(timezone.localdate()), 'jenisHasil': 'Tahu', 'jumlahHasil': 200,
+            'satuanHasil': 'buah', 'idProduk[]': [self.kedelai.pk, self.cuka.pk], 'jumlahBahanTerpakai[]': ['0', '0'],
+        })
+
+        produksi = Produksi.objects.get()
+        self.kedelai.refresh_from_db()
+        self.assertEqual(self.kedelai.stok, 90)
+        self.assertEqual(produksi.biayaBahan, 10 * 12000 + 1 * 8000)
+        self.assertEqual(produksi.detailproduksi_set.count(), 2)
+
+    def test_biaya_tersimpan_dan_ikut_detail(self):
+        produksi = self._produksi('Tahu', 100, [(self.kedelai.pk, 7)])
+        produksi.refresh_from_db()
+        self.assertEqual((produksi.biayaBahan, produksi.biayaStandar), (84000, 64000))
+
+        DetailProduksi.objects.create(idProduksi=produksi, idProduk=self.cuka, jumlahBahanTerpakai=2)
+        produksi.refresh_from_db()
+        self.assertEqual(produksi.biayaBahan, 100000)
+        self.assertEqual(produksi.ringkasanBahan, '7 buah Kedelai + 2 buah Cuka')
+
+        # Tanpa resep tidak ada biaya standar
+        tempe = self._produksi('Tempe', 10, [(self.kedelai.pk, 1)])
+        tempe.refresh_from_db()
+        self.assertIsNone(tempe.biayaStandar)
+
+    def test_ringkasan_resep_vs_aktual(self):
+        self._produksi('Tahu', 100, [(self.kedelai.pk, 6), (self.cuka.pk, 1)])
+        self._produksi('Tahu', 100, [(self.kedelai.pk, 5)])
+
+        with self.assertNumQueries(3):
+            ringkasan = ringkasan_biaya(Produksi.objects.all())
+
+        self.assertEqual(
+            [(b['jenisHasil'], b['jumlah'], b['biaya'], b['standar']) for b in ringkasan['per_jenis']],
+            [('Tahu', 200, 140000, 128000)]
+        )
+        self.assertEqual(
+            [(b['nama'], b['aktual'], b['standar'], b['selisih']) for b in ringkasan['bahan']],
+            [('Cuka', 1, 1.0, 0.0), ('Kedelai', 11, 10.0, 1.0)]
+        )
+
+    def test_filter_produksi_menampilkan_biaya_tersimpan(self):
+        self._produksi('Tahu', 100, [(self.kedelai.pk, 5)])
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+
+        response = self.client.post(reverse('core:filter_produksi'), {'jenis_hasil': 'Tahu'})
+
+        self.assertContains(response, '5 buah Kedelai')
+        self.assertContains(response, 'Rp 60,000')
+        self.assertContains(response, 'Resep vs Aktual')
+
+
+class AnalitikPenjualanTest(TestCase):
+    def setUp(self):
+        caches['statistik'].clear()
+        self.addCleanup(caches['statistik'].clear)
+        self.hari_ini = timezone.localdate()
+        self.budi = Pelanggan.objects.create(
+            namaPelanggan='Budi', alamat='Kupang', noTelp='0812', username='budi', password='pbkdf2_x'
+        )
+        self.ani = Pelanggan.objects.create(
+            namaPelanggan='Ani', alamat='Kupang', noTelp='0813', username='ani', password='pbkdf2_x'
+        )
+        self.tahu = buat_produk('Tahu', 1000, harga=2000)
+        self.tempe = buat_produk('Tempe', 1000, harga=3000)
+
+    def _pesanan(self, pelanggan, hari_lalu, baris, status='Selesai'):
+        # Rekap harian diisi oleh signal, sama seperti pesanan sungguhan
+        pemesanan = Pemesanan.objects.create(
+            tanggalPemesanan=self.hari_ini - timedelta(days=hari_lalu), idPelanggan=pelanggan,
+            totalPemesanan=sum(produk.harga * n for produk, n in baris), status=status
+        )
+        for produk, n in baris:
+            DetailPemesanan.objects.create(idKoleksiPemesanan=pemesanan, idProduk=produk, kuantiti=n, subTotal=produk.harga * n)
+        return pemesanan
+
+    def test_rata_bergerak(self):
+        self.assertEqual(analitik.rata_bergerak([10, 20, 30, 40], 2), [10.0, 15.0, 25.0, 35.0])
+        self.assertEqual(analitik.rata_bergerak([3, 6, 9], 7), [3.0, 4.5, 6.0])
+
+    def test_deret_dan_bauran(self):
+        self._pesanan(self.budi, 0, [(self.tahu, 2), (self.tempe, 1)])
+        self._pesanan(self.budi, 0, [(self.tahu, 1)])
+        self._pesanan(self.ani, 9, [(self.tempe, 10)])
+        self._pesanan(self.ani, 1, [(self.tempe, 50)], status='Dibatalkan')
+
+        awal = self.hari_ini - timedelta(days=13)
+        data = analitik.hitung_analitik(awal, self.hari_ini)
+
+        self.assertEqual(len(data['harian']['tanggal']), 14)
+        self.assertEqual(data['harian']['pendapatan'][-1], 9000)
+        self.assertEqual(data['harian']['pendapatan'][4], 30000)
+        self.assertEqual(data['ringkasan'], {'pendapatan': 39000, 'pesanan': 3, 'rata_rata_pesanan': 13000.0})
+        self.assertEqual(sum(data['mingguan']['pendapatan']), 39000)
+        self.assertEqual(sum(data['bulanan']['pesanan']), 3)
+        self.assertEqual(
+            data['mingguan']['tanggal'][0],
+            (awal - timedelta(days=awal.weekday())).isoformat()
+        )
+        self.assertEqual(
+            [(p['nama'], p['kuantiti'], p['pendapatan']) for p in data['produk']],
+            [('Tempe', 11, 33000), ('Tahu', 3, 6000)]
+        )
+        self.assertAlmostEqual(sum(p['porsi'] for p in data['produk']), 1, places=3)
+        self.assertEqual(
+            [(p['nama'], p['pesanan'], p['pendapatan']) for p in data['pelanggan_teratas']],
+            [('Ani', 1, 30000), ('Budi', 2, 9000)]
+        )
+
+    def test_cache_mengikuti_versi_data(self):
+        self._pesanan(self.budi, 0, [(self.tahu, 1)])
+        analitik.analitik_penjualan()
+        with self.assertNumQueries(0):
+            data = analitik.analitik_penjualan()
+        self.assertEqual(data['ringkasan']['pesanan'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._pesanan(self.budi, 0, [(self.tahu, 1)])
+        self.assertEqual(analitik.analitik_penjualan()['ringkasan']['pesanan'], 2)
+
+    def _cocokkan_rekap(self):
+        produk = {
+            (r.tanggal, r.idProduk_id): (r.kuantiti, r.totalPendapatan)
+            for r in RekapProdukHarian.objects.exclude(kuantiti=0, totalPendapatan=0)
+        }
+        langsung = {
+            (b['idKoleksiPemesanan__tanggalPemesanan'], b['idProduk']): (b['kuantiti'], b['total'])
+            for b in DetailPemesanan.objects.filter(idKoleksiPemesanan__status='Selesai')
+            .values('idKoleksiPemesanan__tanggalPemesanan', 'idProduk')
+            .annotate(kuantiti=Sum('kuantiti'), total=Sum('subTotal'))
+        }
+        self.assertEqual(produk, langsung)
+
+        pelanggan = {
+            (r.bulan, r.idPelanggan_id): (r.jumlahPemesanan, r.totalPendapatan)
+            for r in RekapPelangganBulanan.objects.exclude(jumlahPemesanan=0, totalPendapatan=0)
+        }
+        langsung = {}
+        for pemesanan in Pemesanan.objects.filter(status='Selesai'):
+            kunci = (pemesanan.tanggalPemesanan.replace(day=1), pemesanan.idPelanggan_id)
+            jumlah, total = langsung.get(kunci, (0, 0))
+            langsung[kunci] = (jumlah + 1, total + pemesanan.totalPemesanan)
+        self.assertEqual(pelanggan, langsung)
+
+    def test_rekap_produk_dan_pelanggan_mengikuti_perubahan(self):
+        pertama = self._pesanan(self.budi, 0, [(self.tahu, 2), (self.tempe, 1)])
+        kedua = self._pesanan(self.ani, 40, [(self.tempe, 3)], status='Diproses')
+        self._cocokkan_rekap()
+
+        kedua.status = 'Selesai'
+        kedua.save()
+        pertama.tanggalPemesanan = self.hari_ini - timedelta(days=35)
+        pertama.save()
+        pertama.idPelanggan = self.ani
+        pertama.save()
+        self._cocokkan_rekap()
+
+        detail = pertama.detailpemesanan_set.get(idProduk=self.tahu)
+        detail.kuantiti, detail.subTotal = 5, 10000
+        detail.save()
+        detail = kedua.detailpemesanan_set.get()
+        detail.idProduk = self.tahu
+        detail.save()
+        pertama.detailpemesanan_set.get(idProduk=self.tempe).delete()
+        self._cocokkan_rekap()
+
+        kedua.status = 'Dibatalkan'
+        kedua.save()
+        self._pesanan(self.budi, 3, [(self.tahu, 1)]).delete()
+        self._cocokkan_rekap()
+
+        RekapProdukHarian.objects.all().delete()
+        RekapPelangganBulanan.objects.all().delete()
+        rebuild_rekap()
+        self._cocokkan_rekap()
+
+    def test_pelanggan_teratas_lintas_bulan(self):
+        for i, hari_lalu in enumerate([0, 5, 20, 33, 45, 61, 75, 100, 130]):
+            pelanggan = self.budi if i % 3 else self.ani
+            self._pesanan(pelanggan, hari_lalu, [(self.tahu, i + 1)])
+        self._pesanan(self.ani, 50, [(self.tempe, 40)], status='Diproses')
+
+        awal_bulan_ini = self.hari_ini.replace(day=1)
+        for awal, akhir in [
+            (self.hari_ini - timedelta(days=120), self.hari_ini - timedelta(days=2)),
+            (self.hari_ini - timedelta(days=10), self.hari_ini - timedelta(days=3)),
+            ((self.hari_ini - timedelta(days=70)).replace(day=1), awal_bulan_ini - timedelta(days=1)),
+            (self.hari_ini - timedelta(days=365), self.hari_ini),
+        ]:
+            langsung = [
+                (b['idPelanggan'], b['pesanan'], b['pendapatan'])
+                for b in Pemesanan.objects.filter(status='Selesai', tanggalPemesanan__range=(awal, akhir))
+                .values('idPelanggan').annotate(pesanan=Count('pk'), pendapatan=Sum('totalPemesanan'))
+                .order_by('-pendapatan', 'idPelanggan')
+            ]
+            self.assertEqual(
+                [(p['pelanggan_id'], p['pesanan'], p['pendapatan']) for p in analitik._pelanggan_teratas(awal, akhir)],
+                langsung
+            )
+
+    def test_bauran_tidak_membaca_detail_pesanan(self):
+        self._pesanan(self.budi, 0, [(self.tahu, 2)])
+        with CaptureQueriesContext(connection) as ctx:
+            data = analitik.hitung_analitik(self.hari_ini - timedelta(days=365), self.hari_ini)
+        self.assertEqual([(p['nama'], p['kuantiti']) for p in data['produk']], [('Tahu', 2)])
+        self.assertFalse(any('detail_pemesanan' in q['sql'] for q in ctx.captured_queries))
+
+    def test_rentang_tidak_valid(self):
+        for date_from, date_to in [
+            ('2024-02-30', None), ('kemarin', None), ('2024-03-01', '2024-02-01'), (None, '2024-13-45'),
+            ('0001-01-01', None), ('2024-01-01', '2025-01-01'),
+        ]:
+            with self.assertRaises(ValidationError):
+                analitik.rentang_tanggal(date_from, date_to)
+
+    def test_rentang_maksimum(self):
+        awal, akhir = analitik.rentang_tanggal('2024-01-01', '2024-12-31')
+        self.assertEqual((akhir - awal).days + 1, analitik.RENTANG_MAKSIMUM)
+
+    def test_halaman_dan_json(self):
+        self._pesanan(self.budi, 0, [(self.tahu, 2)])
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+
+        response = self.client.get(reverse('core:analitik_penjualan'))
+        self.assertContains(response, 'Bauran Produk')
+        self.assertContains(response, 'data-analitik')
+
+        response = self.client.get(reverse('core:analitik_penjualan_json'), {'date_from': str(self.hari_ini)})
+        self.assertEqual(response.json()['ringkasan']['pendapatan'], 4000)
+        self.assertEqual(
+            self.client.get(reverse('core:analitik_penjualan_json'), {'date_from': 'x'}).status_code, 400
+        )
+        response = self.client.get(reverse('core:analitik_penjualan'), {'date_from': '0001-01-01'})
+        self.assertContains(response, 'paling panjang', status_code=400)
@@ -0,0 +1,122 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+# Lebar turunan (px) yang dibuat untuk setiap gambar; tinggi mengikuti rasio asli
+UKURAN_THUMBNAIL = getattr(settings, 'UKURAN_THUMBNAIL', (150, 400, 800))
+
+# Format turunan: WebP untuk browser modern, JPEG sebagai cadangan <picture>
+FORMAT_THUMBNAIL = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def nama_thumbnail(nama, lebar, format='webp'):
+    """
+    Storage name of a derivative, stored next to the original (``foto.png`` -> ``foto.png_400w.webp``).
+
+    The original's extension stays in the name, so ``foto.png`` and
+    ``foto.jpg`` never share a derivative.
+    """
+    return f'{nama}_{lebar}w.{format}'
+
+
+def _usang(storage, nama_asli, nama):
+    # Turunan hilang, atau lebih tua dari file asli (asli diganti dengan nama yang sama)
+    if not storage.exists(nama):
+        return True
+    try:
+        return storage.get_modified_time(nama) < storage.get_modified_time(nama_asli)
+    except (NotImplementedError, OSError):
+        return False
+
+
+def hapus_thumbnail(storage, nama):
+    """Delete every derivative of the original stored as ``nama``; returns the number of files removed"""
+    dihapus = 0
+    for lebar in UKURAN_THUMBNAIL:
+        for format in FORMAT_THUMBNAIL:
+            turunan = nama_thumbnail(nama, lebar, format)
+            if storage.exists(turunan):
+                storage.delete(turunan)
+                dihapus += 1
+    return dihapus
+
+
+def _lebar_terdekat(lebar):
+    # Turunan terkecil yang masih cukup lebar, atau yang terbesar bila tidak ada
+    for ukuran in sorted(UKURAN_THUMBNAIL):
+        if ukuran >= lebar:
+            return ukuran
+    return max(UKURAN_THUMBNAIL)
+
+
+def ke_rgb(gambar):
+    """Flatten any Pillow image to RGB, putting transparent areas on white"""
+    if gambar.mode in ('RGBA', 'LA') or (gambar.mode == 'P' and 'transparency' in gambar.info):
+        gambar = gambar.convert('RGBA')
+        latar = Image.new('RGB', gambar.size, (255, 255, 255))
+        latar.paste(gambar, mask=gambar.getchannel('A'))
+        return latar
+    return gambar.convert('RGB')
+
+
+def buat_thumbnail(berkas, paksa=False):
+    """
+    Write every size/format derivative of an image field next to the original.
+
+    Derivatives that exist and are not older than the original are kept
+    unless ``paksa`` is set. Returns the number of files written; unreadable
+    images are skipped so a bad upload never breaks the save that triggered it.
+    """
+    if not berkas:
+        return 0
+    storage = berkas.storage
+    target = [
+        (lebar, format)
+        for lebar in UKURAN_THUMBNAIL
+        for format in FORMAT_THUMBNAIL
+        if paksa or _usang(storage, berkas.name, nama_thumbnail(berkas.name, lebar, format))
+    ]
+    if not target:
+        return 0
+
+    try:
+        with storage.open(berkas.name, 'rb') as sumber:
+            gambar = Image.open(sumber)
+            gambar.load()
+    except (OSError, Image.DecompressionBombError):
+        return 0
+
+    # Foto ponsel sering menyimpan orientasi di EXIF saja
+    gambar = ke_rgb(ImageOps.exif_transpose(gambar))
+
+    ditulis = 0
+    for lebar, format in target:
+        turunan = gambar.copy()
+        # Tidak pernah memperbesar gambar yang sudah lebih kecil dari ukuran target
+        turunan.thumbnail((lebar, lebar * 10), Image.LANCZOS)
+        isi = BytesIO()
+        nama_format, opsi = FORMAT_THUMBNAIL[format]
+        turunan.save(isi, nama_format, **opsi)
+
+        nama = nama_thumbnail(berkas.name, lebar, format)
+        if storage.exists(nama):
+            storage.delete(nama)
+        storage.save(nama, ContentFile(isi.getvalue()))
+        ditulis += 1
+    return ditulis
+
+
+def url_thumbnail(berkas, lebar, format='webp'):
+    """URL of the derivative closest to ``lebar``, falling back to the original if it was never generated"""
+    if not berkas:
+        return ''
+    nama = nama_thumbnail(berkas.name, _lebar_terdekat(lebar), format)
+    if berkas.storage.exists(nama):
+        return berkas.storage.url(nama)
+    return berkas.url
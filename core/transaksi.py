@@ -0,0 +1,99 @@
+from django.core.exceptions import ValidationError
+from .basisdata import transaksi_tulis
+from .models import Produk, DetailPemesanan, DetailProduksi
+from .biaya_produksi import kebutuhan_resep, perbarui_biaya
+from .stok import kurangi_stok
+
+
+def _produk_valid(produk_ids, jenis, kesalahan):
+    # Satu query untuk semua baris, dipakai untuk validasi di depan
+    produk = Produk.objects.only('idProduk', 'namaProduk', 'jenisProduk').in_bulk(produk_ids)
+    for produk_id in produk_ids:
+        item = produk.get(produk_id)
+        if item is None:
+            kesalahan.append(f"Produk dengan ID {produk_id} tidak ditemukan.")
+        elif item.jenisProduk != jenis:
+            kesalahan.append(f"{item.namaProduk} bukan {jenis}.")
+    return produk
+
+
+def simpan_pemesanan(pemesanan, baris):
+    """
+    Save an unsaved Pemesanan with all of its lines in a constant number of queries.
+
+    ``baris`` is an iterable of (produk_id, kuantiti, harga). The whole order is
+    validated first, stock is reserved in one statement and the detail rows are
+    written with bulk_create. Raises ValidationError or StokTidakCukup.
+    """
+    baris = [(int(produk_id), int(kuantiti), int(harga)) for produk_id, kuantiti, harga in baris]
+    if not baris:
+        raise ValidationError("Keranjang kosong.")
+
+    kesalahan = [f"Kuantiti produk {produk_id} tidak valid." for produk_id, kuantiti, _ in baris if kuantiti <= 0]
+    _produk_valid([produk_id for produk_id, _, _ in baris], 'Produk Jadi', kesalahan)
+    if kesalahan:
+        raise ValidationError(kesalahan)
+
+    with transaksi_tulis():
+        pemesanan.totalPemesanan = sum(kuantiti * harga for _, kuantiti, harga in baris)
+        pemesanan.save()
+
+        # Gagal di sini membatalkan pesanan juga (satu transaksi)
+        kurangi_stok(((produk_id, kuantiti) for produk_id, kuantiti, _ in baris), 'Penjualan', pemesanan=pemesanan)
+
+        DetailPemesanan.objects.bulk_create([
+            DetailPemesanan(
+                idProduk_id=produk_id,
+                kuantiti=kuantiti,
+                subTotal=kuantiti * harga,
+                idKoleksiPemesanan=pemesanan
+            )
+            for produk_id, kuantiti, harga in baris
+        ])
+    return pemesanan
+
+
+def simpan_produksi(produksi, bahan=None):
+    """
+    Save an unsaved Produksi with its raw material lines as one batch.
+
+    ``bahan`` is an iterable of (produk_id, jumlahBahanTerpakai); zero amounts are
+    skipped. Without ``bahan`` the lines come from the recipe of the jenisHasil
+    (core/biaya_produksi.py). Raw material stock is decremented in one statement,
+    the DetailProduksi rows are written with bulk_create and the batch cost is
+    stored on the Produksi.
+    """
+    kesalahan = []
+    if produksi.jenisHasil not in dict(produksi._meta.get_field('jenisHasil').choices):
+        kesalahan.append("Jenis hasil produksi tidak valid.")
+    try:
+        if int(produksi.jumlahHasil) <= 0:
+            kesalahan.append("Jumlah hasil harus lebih dari 0.")
+    except (TypeError, ValueError):
+        kesalahan.append("Jumlah hasil harus berupa angka.")
+    if kesalahan:
+        raise ValidationError(kesalahan)
+
+    if bahan is None:
+        bahan = kebutuhan_resep(produksi.jenisHasil, produksi.jumlahHasil)
+    bahan = [(int(produk_id), int(jumlah)) for produk_id, jumlah in bahan if jumlah and int(jumlah) > 0]
+    if bahan:
+        _produk_valid([produk_id for produk_id, _ in bahan], 'Bahan Baku', kesalahan)
+    if kesalahan:
+        raise ValidationError(kesalahan)
+
+    with transaksi_tulis():
+        # Biaya dihitung sekali setelah detail ada, bukan oleh signal post_save Produksi
+        produksi._tunda_biaya = True
+        try:
+            produksi.save()
+        finally:
+            del produksi._tunda_biaya
+        kurangi_stok(bahan, 'Bahan Keluar', produksi=produksi)
+        DetailProduksi.objects.bulk_create([
+            DetailProduksi(idProduksi=produksi, idProduk_id=produk_id, jumlahBahanTerpakai=jumlah)
+            for produk_id, jumlah in bahan
+        ])
+        # bulk_create tidak memicu signal, jadi biaya dihitung ulang setelah semua detail ada
+        perbarui_biaya([produksi.pk])
+    return produksi
@@ -0,0 +1,125 @@
+import math
+import os
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload, TemporaryFileUploadHandler
+from PIL import Image, ImageOps
+from .thumbnail import ke_rgb
+
+
+# Ukuran maksimal file bukti pembayaran yang diterima (byte)
+BATAS_BUKTI_BAYAR = getattr(settings, 'BATAS_BUKTI_BAYAR', 10 * 1024 * 1024)
+
+# Ruang untuk field form lain dan pembatas multipart di luar file bukti pembayaran (byte)
+SISA_FORM_BUKTI = 64 * 1024
+
+# Sisi terpanjang bukti pembayaran setelah diperkecil (px); struk transfer tetap terbaca
+DIMENSI_MAKS_BUKTI = getattr(settings, 'DIMENSI_MAKS_BUKTI', 1600)
+
+# Gambar dengan piksel lebih banyak dari ini ditolak sebelum didekode (mis. 40 MP)
+PIKSEL_MAKS_BUKTI = getattr(settings, 'PIKSEL_MAKS_BUKTI', 40_000_000)
+
+FORMAT_BUKTI = ('JPEG', 'PNG', 'WEBP', 'GIF')
+
+# Dekode gambar bersamaan per proses; unggahan lain antre sebentar alih-alih menumpuk memori
+_SLOT_DEKODE = threading.BoundedSemaphore(getattr(settings, 'DEKODE_BUKTI_PARALEL', 4))
+
+
+class BatasUkuranUploadHandler(FileUploadHandler):
+    """
+    Stop a multipart upload as soon as its files grow past ``batas`` bytes.
+
+    Nothing more is stored, but the rest of the body is still drained so the
+    client gets the view's response instead of a reset connection; the view
+    finds ``request.unggahan_terlalu_besar`` set instead of a half-received
+    file. Bodies that are clearly too large are rejected earlier from their
+    Content-Length (see melebihi_batas_bukti).
+    """
+
+    def __init__(self, request=None, batas=None):
+        super().__init__(request)
+        self.batas = BATAS_BUKTI_BAYAR if batas is None else batas
+        self.diterima = 0
+        self.ditolak = False
+
+    def _tolak(self):
+        self.ditolak = True
+        if self.request is not None:
+            self.request.unggahan_terlalu_besar = True
+        raise StopUpload(connection_reset=False)
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        # Ukuran yang dikirim browser per file bisa langsung ditolak
+        if self.content_length is not None and self.content_length > self.batas:
+            self._tolak()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.diterima += len(raw_data)
+        if self.diterima > self.batas:
+            self._tolak()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def melebihi_batas_bukti(request):
+    """True when the declared request body cannot fit a payment proof under BATAS_BUKTI_BAYAR"""
+    try:
+        panjang = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return False
+    return panjang > BATAS_BUKTI_BAYAR + SISA_FORM_BUKTI
+
+
+def handler_bukti_bayar(request=None):
+    """Upload handlers for payment proofs: size limit first, then stream every file to a temporary file on disk"""
+    return [BatasUkuranUploadHandler(request), TemporaryFileUploadHandler(request)]
+
+
+def _kompres_ulang(berkas):
+    gambar = Image.open(berkas)
+    # JPEG didekode langsung pada skala 1/2, 1/4 atau 1/8, jadi foto 12 MP tidak pernah utuh di memori.
+    # draft() butuh ukuran dengan rasio asli; kotak persegi membuat foto landscape tidak diperkecil
+    rasio = max(gambar.size) / DIMENSI_MAKS_BUKTI
+    if rasio > 1:
+        gambar.draft('RGB', (math.ceil(gambar.width / rasio), math.ceil(gambar.height / rasio)))
+    # Diperkecil dulu, baru diputar dan dikonversi: salinan perantara jadi seukuran hasil akhir
+    gambar.thumbnail((DIMENSI_MAKS_BUKTI, DIMENSI_MAKS_BUKTI), Image.LANCZOS)
+    gambar = ke_rgb(ImageOps.exif_transpose(gambar))
+
+    isi = BytesIO()
+    gambar.save(isi, 'JPEG', quality=85, optimize=True, progressive=True)
+    nama = os.path.splitext(os.path.basename(berkas.name or 'bukti'))[0]
+    return ContentFile(isi.getvalue(), name=f'{nama}.jpg')
+
+
+def proses_bukti_bayar(berkas):
+    """
+    Validate an uploaded payment proof and re-encode it as a plain JPEG.
+
+    The image is checked before decoding, rotated according to its EXIF
+    orientation, downscaled to DIMENSI_MAKS_BUKTI and saved without any
+    metadata (EXIF, GPS). Raises ValidationError for anything that is not
+    a supported image.
+    """
+    pesan_tidak_valid = 'Bukti pembayaran harus berupa gambar JPG, PNG, WebP, atau GIF.'
+    try:
+        with Image.open(berkas) as gambar:
+            if gambar.format not in FORMAT_BUKTI:
+                raise ValidationError(pesan_tidak_valid)
+            if gambar.width * gambar.height > PIKSEL_MAKS_BUKTI:
+                raise ValidationError('Resolusi bukti pembayaran terlalu besar.')
+            gambar.verify()
+
+        # verify() membuat objek tidak terpakai; buka ulang untuk dekode
+        berkas.seek(0)
+        with _SLOT_DEKODE:
+            return _kompres_ulang(berkas)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        raise ValidationError(pesan_tidak_valid)
@@ -6,7 +6,12 @@ from core.admin import (
     report_produksi_pdf,
     report_filter_penjualan,
     report_filter_produk,
-    report_filter_produksi
+    report_filter_produksi,
+    report_analitik_penjualan,
+    report_analitik_penjualan_json,
+    report_antrian_tambah,
+    report_antrian_status,
+    report_antrian_unduh
 )
 
 app_name = 'core'
@@ -17,10 +22,17 @@ urlpatterns = [
     path('admin/filter/penjualan/', report_filter_penjualan, name='filter_penjualan'),
     path('admin/filter/produk/', report_filter_produk, name='filter_produk'),
     path('admin/filter/produksi/', report_filter_produksi, name='filter_produksi'),
+    # Analitik penjualan: halaman admin dan data JSON yang sama
+    path('admin/analitik/penjualan/', report_analitik_penjualan, name='analitik_penjualan'),
+    path('admin/analitik/penjualan/data/', report_analitik_penjualan_json, name='analitik_penjualan_json'),
     # URL PDF (Target Form Submission)
     path('admin/report/penjualan/pdf/', report_penjualan_pdf, name='report_penjualan_pdf'),
     path('admin/report/produk/pdf/', report_produk_pdf, name='report_produk_pdf'),
     path('admin/report/produksi/pdf/', report_produksi_pdf, name='report_produksi_pdf'),
+    # Antrian PDF (render di latar belakang)
+    path('admin/report/antrian/<str:jenis>/', report_antrian_tambah, name='report_antrian_tambah'),
+    path('admin/report/antrian/<int:antrian_id>/status/', report_antrian_status, name='report_antrian_status'),
+    path('admin/report/antrian/<int:antrian_id>/unduh/', report_antrian_unduh, name='report_antrian_unduh'),
     
     # Karyawan URLs
     path('karyawan/login/', views.karyawan_login, name='karyawan_login'),
@@ -25,6 +25,7 @@ urlpatterns = [
     
     # Orders
     path('pesanan/riwayat/', views_pelanggan.pelanggan_pesanan_riwayat, name='pelanggan_pesanan_riwayat'),
+    path('pesanan/riwayat/json/', views_pelanggan.pelanggan_pesanan_riwayat_json, name='pelanggan_pesanan_riwayat_json'),
     path('pesanan/detail/<int:pesanan_id>/', views_pelanggan.pelanggan_pesanan_detail_html, name='pelanggan_pesanan_detail_html'),
     
     # Account
@@ -0,0 +1,47 @@
+import time
+
+from django.db import transaction
+
+
+def _benih():
+    # Tidak pernah berulang: kunci versi yang hilang dari cache tidak kembali ke nomor yang pernah dipakai,
+    # jadi entri lama dengan nomor itu tidak terbaca lagi
+    return time.time_ns()
+
+
+def versi(cache, kunci):
+    """Current version number stored under ``kunci``, seeded with a fresh token when missing"""
+    nilai = cache.get(kunci)
+    if nilai is None:
+        benih = _benih()
+        cache.add(kunci, benih, timeout=None)
+        nilai = cache.get(kunci, benih)
+    return nilai
+
+
+async def aversi(cache, kunci):
+    """Async variant of versi for async views"""
+    nilai = await cache.aget(kunci)
+    if nilai is None:
+        benih = _benih()
+        await cache.aadd(kunci, benih, timeout=None)
+        nilai = await cache.aget(kunci, benih)
+    return nilai
+
+
+def naikkan_versi(cache, *kunci):
+    """
+    Bump the version numbers under ``kunci`` once the current transaction commits.
+
+    Data is cached under its version number, so a value computed from data
+    older than the commit lands under a key that is no longer read.
+    """
+    def naikkan():
+        for kunci_versi in kunci:
+            try:
+                cache.incr(kunci_versi)
+            except ValueError:
+                cache.set(kunci_versi, _benih(), timeout=None)
+
+    if kunci:
+        transaction.on_commit(naikkan)
@@ -4,10 +4,13 @@ from django.utils import timezone
 from datetime import timedelta
 from django.db.models import Sum
 from django.contrib import messages
-from django.db import transaction
+from django.core.exceptions import ValidationError
 from django.contrib.auth.hashers import check_password  # PENTING: Impor fungsi check_password
-from .models import Produk, Pelanggan, Pemesanan, Produksi, DetailProduksi, Karyawan
+from .models import Produk, Pelanggan, Pemesanan, Produksi, Karyawan
 from .admin import admin_dashboard_context
+from .statistik_karyawan import statistik_karyawan
+from .stok import StokTidakCukup
+from .transaksi import simpan_produksi
 
 
 @staff_member_required
@@ -75,18 +78,19 @@ def karyawan_dashboard(request):
     # Get recent productions by this karyawan
     recent_productions = Produksi.objects.filter(idKaryawan=karyawan).order_by('-tanggalProduksi')[:10]
     
-    # Calculate production statistics
-    total_productions = Produksi.objects.filter(idKaryawan=karyawan).count()
-    total_tahu = Produksi.objects.filter(idKaryawan=karyawan, jenisHasil='Tahu').count()
-    total_tempe = Produksi.objects.filter(idKaryawan=karyawan, jenisHasil='Tempe').count()
+    # Production statistics: satu query agregat, di-cache per karyawan (core/statistik_karyawan.py)
+    statistik = statistik_karyawan(karyawan.idKaryawan)
     
     context = {
         'karyawan': karyawan,
         'bahan_baku': bahan_baku,
         'recent_productions': recent_productions,
-        'total_productions': total_productions,
-        'total_tahu': total_tahu,
-        'total_tempe': total_tempe,
+        'total_productions': statistik['total_produksi'],
+        'total_tahu': statistik['per_jenis']['Tahu']['jumlah'],
+        'total_tempe': statistik['per_jenis']['Tempe']['jumlah'],
+        'hasil_tahu': statistik['per_jenis']['Tahu']['hasil'],
+        'hasil_tempe': statistik['per_jenis']['Tempe']['hasil'],
+        'bahan_terpakai': statistik['bahan_terpakai'],
     }
     
     return render(request, 'karyawan/karyawan_dashboard.html', context)
@@ -112,30 +116,37 @@ def karyawan_produksi_input(request):
         jumlah_terpakai = request.POST.getlist('jumlahBahanTerpakai[]')
         
         try:
-            with transaction.atomic():
-                # 1. Simpan Data Produksi Utama
-                new_produksi = Produksi(
-                    tanggalProduksi=tanggalProduksi,
-                    jenisHasil=jenisHasil,
-                    jumlahHasil=jumlahHasil,
-                    satuanHasil=satuanHasil,
-                    keterangan=keterangan,
-                    idKaryawan_id=karyawan_id  # Hubungkan ke Karyawan yang sedang login
-                )
-                new_produksi.save()
-                
-                # 2. Simpan Detail Produksi (Menggunakan clean/save logic di Model)
-                for prod_id, jml_terpakai in zip(produk_ids, jumlah_terpakai):
-                    if jml_terpakai and int(jml_terpakai) > 0:
-                        DetailProduksi.objects.create(
-                            idProduksi=new_produksi,
-                            idProduk_id=prod_id,
-                            jumlahBahanTerpakai=int(jml_terpakai)
-                        )
+            # 1. Data Produksi Utama
+            new_produksi = Produksi(
+                tanggalProduksi=tanggalProduksi,
+                jenisHasil=jenisHasil,
+                jumlahHasil=jumlahHasil,
+                satuanHasil=satuanHasil,
+                keterangan=keterangan,
+                idKaryawan_id=karyawan_id  # Hubungkan ke Karyawan yang sedang login
+            )
+            
+            # 2. Validasi seluruh batch, lalu simpan produksi + detail bahan sekaligus;
+            #    tanpa bahan yang diisi, jumlah bahan diambil dari resep jenis hasil
+            #    (baris berjumlah 0 dianggap tidak diisi)
+            try:
+                bahan = [
+                    (produk_id, int(jumlah)) for produk_id, jumlah in zip(produk_ids, jumlah_terpakai)
+                    if produk_id and jumlah and int(jumlah) > 0
+                ]
+            except ValueError:
+                raise ValidationError("Jumlah bahan harus berupa angka.")
+            simpan_produksi(new_produksi, bahan or None)
                 
             messages.success(request, f"Produksi {jenisHasil} berhasil dicatat!")
             return redirect('core:karyawan_dashboard')
 
+        except ValidationError as e:
+            messages.error(request, f"Gagal mencatat produksi: {' '.join(e.messages)}")
+            return redirect('core:karyawan_dashboard')
+        except StokTidakCukup as e:
+            messages.error(request, f"Gagal mencatat produksi: stok bahan tidak mencukupi - {e}")
+            return redirect('core:karyawan_dashboard')
         except Exception as e:
             messages.error(request, f"Gagal mencatat produksi: {e}")
             return redirect('core:karyawan_dashboard')
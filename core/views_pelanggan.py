@@ -1,15 +1,38 @@
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth.hashers import check_password
 from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.utils import timezone
-from django.db import transaction
+from django.core.exceptions import ValidationError
 import json
-from .models import Pelanggan, Produk, Pemesanan, DetailPemesanan
+import logging
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from .models import Pelanggan, Produk, Pemesanan
+from .basisdata import transaksi_tulis
+from .stok import StokTidakCukup
+from .transaksi import simpan_pemesanan
+from .riwayat import halaman_riwayat, ahalaman_riwayat
+from .katalog import aproduk_tersedia
+from .unggah import BATAS_BUKTI_BAYAR, handler_bukti_bayar, melebihi_batas_bukti, proses_bukti_bayar
+from .keranjang import (
+    gabungkan_keranjang_sesi,
+    simpan_item,
+    ubah_kuantiti,
+    hapus_item,
+    kosongkan_keranjang,
+    produk_untuk_keranjang,
+    hitung_keranjang,
+    ajumlah_item
+)
 from django.db import models
 
 
+logger = logging.getLogger(__name__)
+
+
 def pelanggan_register(request):
     """Register a new customer"""
     if request.method == 'POST':
@@ -77,6 +100,7 @@ def pelanggan_login(request):
             # Login successful
             request.session['pelanggan_id'] = pelanggan.idPelanggan
             request.session['pelanggan_nama'] = pelanggan.namaPelanggan
+            siapkan_keranjang(request)
             messages.success(request, f"Selamat datang, {pelanggan.namaPelanggan}!")
             return redirect('pelanggan_beranda')
         else:
@@ -91,8 +115,9 @@ def pelanggan_logout(request):
         del request.session['pelanggan_id']
     if 'pelanggan_nama' in request.session:
         del request.session['pelanggan_nama']
-    if 'keranjang' in request.session:
-        del request.session['keranjang']
+    if 'keranjang_siap' in request.session:
+        del request.session['keranjang_siap']
+    # Keranjang tersimpan di database, jadi tetap ada saat login lagi
     messages.info(request, "Anda telah logout.")
     return redirect('pelanggan_login')
 
@@ -108,63 +133,87 @@ def get_pelanggan(request):
         return None
 
 
+def siapkan_keranjang(request):
+    """Create the database cart once per session and move any legacy session cart into it"""
+    gabungkan_keranjang_sesi(request.session['pelanggan_id'], request.session.pop('keranjang', None))
+    request.session['keranjang_siap'] = True
+
+
 def pelanggan_required(view_func):
-    """Decorator to ensure customer is logged in"""
+    """Decorator to ensure customer is logged in (works on sync and async views)"""
+    if iscoroutinefunction(view_func):
+        async def async_wrapper(request, *args, **kwargs):
+            # aget memuat sesi dengan ORM async; akses sesi berikutnya (template, messages) tidak ke database lagi
+            if not await request.session.aget('pelanggan_id'):
+                messages.warning(request, "Anda harus login terlebih dahulu.")
+                return redirect('pelanggan_login')
+            if not await request.session.aget('keranjang_siap'):
+                await sync_to_async(siapkan_keranjang)(request)
+            return await view_func(request, *args, **kwargs)
+        return wraps(view_func)(async_wrapper)
+
     def wrapper(request, *args, **kwargs):
         if not request.session.get('pelanggan_id'):
             messages.warning(request, "Anda harus login terlebih dahulu.")
             return redirect('pelanggan_login')
+        if not request.session.get('keranjang_siap'):
+            # Sesi yang login sebelum keranjang pindah ke database
+            siapkan_keranjang(request)
         return view_func(request, *args, **kwargs)
-    return wrapper
+    return wraps(view_func)(wrapper)
+
+
+async def aget_pelanggan(request):
+    """Async variant of get_pelanggan"""
+    pelanggan_id = await request.session.aget('pelanggan_id')
+    if not pelanggan_id:
+        return None
+    try:
+        return await Pelanggan.objects.aget(idPelanggan=pelanggan_id)
+    except Pelanggan.DoesNotExist:
+        return None
+
+
+async def _konteks_async(request, context):
+    # Context processor keranjang bersifat lazy dan sinkron; di view async jumlahnya dihitung di sini
+    context['jumlah_item_keranjang'] = await ajumlah_item(request.session['pelanggan_id'])
+    return context
 
 
 @pelanggan_required
-def pelanggan_beranda(request):
+async def pelanggan_beranda(request):
     """Customer dashboard/homepage"""
-    pelanggan = get_pelanggan(request)
-    
-    # Get notifications for orders with shipping costs > 0
-    notifications = Pemesanan.objects.filter(
-        idPelanggan=pelanggan,
-        ongkosKirim__gt=0,
-        status__in=['Diproses', 'Menunggu Pembayaran']
-    )
+    # Get notifications for orders with shipping costs > 0 (dievaluasi di sini, template tidak boleh query sinkron)
+    notifications = [
+        pemesanan async for pemesanan in Pemesanan.objects.filter(
+            idPelanggan_id=request.session['pelanggan_id'],
+            ongkosKirim__gt=0,
+            status__in=['Diproses', 'Menunggu Pembayaran']
+        )
+    ]
     
-    # Get products for display
-    bahan_baku = Produk.objects.filter(jenisProduk='Bahan Baku', stok__gt=0)[:4]  # Limit to 4 items
-    produk_jadi = Produk.objects.filter(jenisProduk='Produk Jadi', stok__gt=0)[:4]  # Limit to 4 items
+    # Get products for display (dari cache katalog, core/katalog.py)
+    bahan_baku = (await aproduk_tersedia('Bahan Baku'))[:4]  # Limit to 4 items
+    produk_jadi = (await aproduk_tersedia('Produk Jadi'))[:4]  # Limit to 4 items
     
     context = {
         'bahan_baku': bahan_baku,
         'produk_jadi': produk_jadi,
         'notifications': notifications
     }
-    return render(request, 'pelanggan/beranda.html', context)
+    return render(request, 'pelanggan/beranda.html', await _konteks_async(request, context))
 
 
 @pelanggan_required
-def pelanggan_produk_list(request):
+async def pelanggan_produk_list(request):
     """List all available products"""
     # Get only available products (stok > 0)
-    produk_jadi = Produk.objects.filter(jenisProduk='Produk Jadi', stok__gt=0).order_by('namaProduk')
+    produk_jadi = await aproduk_tersedia('Produk Jadi')
     
     context = {
         'produk_jadi': produk_jadi
     }
-    return render(request, 'pelanggan/produk_list.html', context)
-
-
-def get_cart(request):
-    """Helper function to get cart from session"""
-    if 'keranjang' not in request.session:
-        request.session['keranjang'] = {}
-    return request.session['keranjang']
-
-
-def save_cart(request, cart):
-    """Helper function to save cart to session"""
-    request.session['keranjang'] = cart
-    request.session.modified = True
+    return render(request, 'pelanggan/produk_list.html', await _konteks_async(request, context))
 
 
 @pelanggan_required
@@ -175,10 +224,10 @@ def pelanggan_keranjang_add(request):
             produk_id = int(request.POST.get('produk_id'))
             kuantiti = int(request.POST.get('kuantiti', 1))
             
-            # Validate product
-            try:
-                produk = Produk.objects.get(idProduk=produk_id, jenisProduk='Produk Jadi')
-            except Produk.DoesNotExist:
+            # Validate product (kuantiti yang sudah di keranjang ikut dibaca, satu query)
+            pelanggan_id = request.session['pelanggan_id']
+            produk = produk_untuk_keranjang(pelanggan_id, produk_id)
+            if produk is None:
                 messages.error(request, 'Produk tidak ditemukan.')
                 return redirect('pelanggan_keranjang_view')
                 
@@ -187,27 +236,14 @@ def pelanggan_keranjang_add(request):
                 messages.error(request, f'Stok tidak mencukupi. Tersedia: {produk.stok}')
                 return redirect('pelanggan_keranjang_view')
                 
-            # Get cart
-            cart = get_cart(request)
-            
-            # Add to cart
-            if str(produk_id) in cart:
-                # Check if adding this quantity would exceed stock
-                new_quantity = cart[str(produk_id)]['kuantiti'] + kuantiti
-                if new_quantity > produk.stok:
-                    messages.error(request, f'Stok tidak mencukupi. Maksimal: {produk.stok}')
-                    return redirect('pelanggan_keranjang_view')
-                cart[str(produk_id)]['kuantiti'] = new_quantity
-            else:
-                cart[str(produk_id)] = {
-                    'nama': produk.namaProduk,
-                    'harga': produk.harga,
-                    'kuantiti': kuantiti,
-                    'stok': produk.stok
-                }
+            # Check if adding this quantity would exceed stock
+            new_quantity = produk.di_keranjang + kuantiti
+            if new_quantity > produk.stok:
+                messages.error(request, f'Stok tidak mencukupi. Maksimal: {produk.stok}')
+                return redirect('pelanggan_keranjang_view')
                 
-            # Save cart
-            save_cart(request, cart)
+            # Add to cart (satu upsert, harga dicatat sebagai snapshot)
+            simpan_item(pelanggan_id, produk_id, new_quantity, produk.harga)
             
             messages.success(request, f'{produk.namaProduk} berhasil ditambahkan ke keranjang!')
             return redirect('pelanggan_produk_list')
@@ -223,39 +259,34 @@ def pelanggan_keranjang_update(request):
     """Update cart item quantity"""
     if request.method == 'POST':
         try:
-            produk_id = str(request.POST.get('produk_id'))
+            produk_id = int(request.POST.get('produk_id'))
             kuantiti = int(request.POST.get('kuantiti', 0))
+            pelanggan_id = request.session['pelanggan_id']
             
-            # Get cart
-            cart = get_cart(request)
-            
-            # Validate product exists in cart
-            if produk_id not in cart:
-                messages.error(request, 'Item tidak ditemukan di keranjang.')
+            # Handle removal (juga untuk produk yang sudah tidak dijual)
+            if kuantiti <= 0:
+                if hapus_item(pelanggan_id, produk_id):
+                    messages.success(request, 'Item dihapus dari keranjang.')
+                else:
+                    messages.error(request, 'Item tidak ditemukan di keranjang.')
                 return redirect('pelanggan_keranjang_view')
                 
             # Validate product
             try:
-                produk = Produk.objects.get(idProduk=produk_id, jenisProduk='Produk Jadi')
+                produk = Produk.objects.only('stok').get(idProduk=produk_id, jenisProduk='Produk Jadi')
             except Produk.DoesNotExist:
                 messages.error(request, 'Produk tidak ditemukan.')
                 return redirect('pelanggan_keranjang_view')
                 
-            # Handle removal
-            if kuantiti <= 0:
-                del cart[produk_id]
-                save_cart(request, cart)
-                messages.success(request, 'Item dihapus dari keranjang.')
-                return redirect('pelanggan_keranjang_view')
-                
             # Check stock
             if kuantiti > produk.stok:
                 messages.error(request, f'Stok tidak mencukupi. Tersedia: {produk.stok}')
                 return redirect('pelanggan_keranjang_view')
                 
-            # Update quantity
-            cart[produk_id]['kuantiti'] = kuantiti
-            save_cart(request, cart)
+            # Update quantity (satu UPDATE)
+            if not ubah_kuantiti(pelanggan_id, produk_id, kuantiti):
+                messages.error(request, 'Item tidak ditemukan di keranjang.')
+                return redirect('pelanggan_keranjang_view')
             
             messages.success(request, 'Keranjang diperbarui.')
             return redirect('pelanggan_keranjang_view')
@@ -271,15 +302,10 @@ def pelanggan_keranjang_delete(request):
     """Remove item from cart"""
     if request.method == 'POST':
         try:
-            produk_id = str(request.POST.get('produk_id'))
-            
-            # Get cart
-            cart = get_cart(request)
+            produk_id = int(request.POST.get('produk_id'))
             
-            # Remove item
-            if produk_id in cart:
-                del cart[produk_id]
-                save_cart(request, cart)
+            # Remove item (satu DELETE)
+            if hapus_item(request.session['pelanggan_id'], produk_id):
                 messages.success(request, 'Item dihapus dari keranjang.')
                 return redirect('pelanggan_keranjang_view')
             else:
@@ -295,83 +321,109 @@ def pelanggan_keranjang_delete(request):
 @pelanggan_required
 def pelanggan_keranjang_view(request):
     """View shopping cart"""
-    cart = get_cart(request)
-    
-    # Enrich cart data with product info
-    cart_items = []
-    total_keranjang = 0
-    
-    for produk_id, item in cart.items():
-        try:
-            produk = Produk.objects.get(idProduk=produk_id)
-            subtotal = item['kuantiti'] * item['harga']
-            total_keranjang += subtotal
-            
-            cart_items.append({
-                'produk_id': produk_id,
-                'nama': item['nama'],
-                'harga': item['harga'],
-                'kuantiti': item['kuantiti'],
-                'stok': item['stok'],
-                'subtotal': subtotal,
-                'produk_obj': produk
-            })
-        except Produk.DoesNotExist:
-            # Remove invalid products from cart
-            continue
+    # Harga & stok terkini untuk semua baris dalam satu query (core/keranjang.py)
+    keranjang = hitung_keranjang(request.session['pelanggan_id'])
     
     context = {
-        'cart_items': cart_items,
-        'total_keranjang': total_keranjang
+        'cart_items': keranjang['items'],
+        'total_keranjang': keranjang['total'],
+        'harga_berubah': keranjang['harga_berubah'],
+        'bisa_checkout': keranjang['bisa_checkout'],
+        'jumlah_item_keranjang': len(keranjang['items']),
     }
     return render(request, 'pelanggan/keranjang.html', context)
 
 
+def _pesan_masalah_keranjang(request, keranjang):
+    # Pesan untuk baris yang tidak bisa di-checkout
+    for item in keranjang['items']:
+        if item['tidak_tersedia']:
+            messages.error(request, f"{item['nama']} sudah tidak dijual, hapus dari keranjang.")
+        elif item['stok_kurang']:
+            messages.error(request, f"Stok untuk {item['nama']} tidak mencukupi. Tersedia: {item['stok']}")
+
+
 @pelanggan_required
 def pelanggan_checkout_view(request):
     """Display checkout page"""
     # Get cart items
-    cart = get_cart(request)
-    if not cart:
+    keranjang = hitung_keranjang(request.session['pelanggan_id'])
+    if not keranjang['items']:
         messages.error(request, "Keranjang Anda kosong.")
         return redirect('pelanggan_produk_list')
-    
-    # Calculate total
-    total_keranjang = sum(item['kuantiti'] * item['harga'] for item in cart.values())
+    if not keranjang['bisa_checkout']:
+        _pesan_masalah_keranjang(request, keranjang)
+        return redirect('pelanggan_keranjang_view')
     
     context = {
-        'total_keranjang': total_keranjang
+        'total_keranjang': keranjang['total'],
+        'cart_items': keranjang['items'],
+        'harga_berubah': keranjang['harga_berubah'],
+        'jumlah_item_keranjang': len(keranjang['items']),
+        'batas_bukti_mb': BATAS_BUKTI_BAYAR // (1024 * 1024),
     }
     return render(request, 'pelanggan/checkout.html', context)
 
 
+@csrf_exempt
 @pelanggan_required
 def pelanggan_checkout(request):
     """Process checkout"""
+    # Body yang jelas melebihi batas ditolak dari Content-Length, sebelum satu byte pun dibaca
+    if request.method == 'POST' and melebihi_batas_bukti(request):
+        return _tolak_bukti_terlalu_besar(request)
+    # Handler unggahan harus dipasang sebelum request.POST dibaca, termasuk oleh cek CSRF,
+    # jadi CSRF diperiksa di _proses_checkout
+    request.upload_handlers = handler_bukti_bayar(request)
+    return _proses_checkout(request)
+
+
+def _tolak_bukti_terlalu_besar(request):
+    messages.error(request, f'Ukuran bukti pembayaran maksimal {BATAS_BUKTI_BAYAR // (1024 * 1024)} MB.')
+    return redirect('pelanggan_checkout_view')
+
+
+@csrf_protect
+def _proses_checkout(request):
     if request.method == 'POST':
-        # Debugging: Log received POST data
-        print(f"Received POST data: {request.POST}")
-        print(f"Received FILES data: {request.FILES}")
+        # Debugging: Log received POST data (hanya tampil dengan level DEBUG)
+        logger.debug("Received POST data: %s", request.POST)
+        logger.debug("Received FILES data: %s", request.FILES)
         
         # Get customer
         pelanggan = get_pelanggan(request)
         if not pelanggan:
             messages.error(request, 'Pelanggan tidak ditemukan.')
             return redirect('pelanggan_login')
+        
+        # Unggahan dihentikan di tengah jalan; field setelah file tidak ikut terbaca
+        if getattr(request, 'unggahan_terlalu_besar', False):
+            return _tolak_bukti_terlalu_besar(request)
             
-        # Get cart
-        cart = get_cart(request)
-        if not cart:
+        # Get cart (harga & stok terkini, satu query)
+        keranjang = hitung_keranjang(pelanggan.idPelanggan)
+        if not keranjang['items']:
             messages.error(request, 'Keranjang kosong.')
             return redirect('pelanggan_keranjang_view')
+        if not keranjang['bisa_checkout']:
+            _pesan_masalah_keranjang(request, keranjang)
+            return redirect('pelanggan_keranjang_view')
+        
+        # Total yang ditampilkan di halaman checkout harus sama dengan harga terkini
+        if request.POST.get('total_dikonfirmasi') != str(keranjang['total']):
+            messages.warning(
+                request,
+                f"Harga beberapa produk berubah. Total terbaru Rp {keranjang['total']:,}, silakan periksa kembali."
+            )
+            return redirect('pelanggan_checkout_view')
             
         # Explicit validation for required fields
         alamat_pengiriman = request.POST.get('alamat_pengiriman')
         bukti_bayar = request.FILES.get('bukti_bayar')
         
         # Debugging: Log extracted values
-        print(f"Alamat pengiriman: {alamat_pengiriman}")
-        print(f"Bukti bayar: {bukti_bayar}")
+        logger.debug("Alamat pengiriman: %s", alamat_pengiriman)
+        logger.debug("Bukti bayar: %s", bukti_bayar)
         
         # Validate required fields
         if not alamat_pengiriman or not alamat_pengiriman.strip():
@@ -383,72 +435,42 @@ def pelanggan_checkout(request):
             return redirect('pelanggan_checkout_view')
             
         try:
-            with transaction.atomic():
-                # Calculate total
-                total_pemesanan = sum(item['kuantiti'] * item['harga'] for item in cart.values())
-                
-                # Debugging: Log calculated total
-                print(f"Calculated total: {total_pemesanan}")
-                
-                # Create order
-                pemesanan = Pemesanan.objects.create(
-                    tanggalPemesanan=timezone.now().date(),
-                    totalPemesanan=total_pemesanan,
-                    idPelanggan=pelanggan,
-                    alamatPengiriman=alamat_pengiriman,
-                    buktiBayar=bukti_bayar
+            # Gambar diverifikasi, dibersihkan dari EXIF, diperkecil dan disimpan ulang sebagai JPEG
+            bukti_bayar = proses_bukti_bayar(bukti_bayar)
+            
+            # Validate the whole order, reserve stock and write all detail rows
+            # in a fixed number of queries regardless of the cart size
+            with transaksi_tulis():
+                pemesanan = simpan_pemesanan(
+                    Pemesanan(
+                        tanggalPemesanan=timezone.now().date(),
+                        idPelanggan=pelanggan,
+                        alamatPengiriman=alamat_pengiriman,
+                        buktiBayar=bukti_bayar
+                    ),
+                    [(item['produk_id'], item['kuantiti'], item['harga']) for item in keranjang['items']]
                 )
                 
-                # Debugging: Log created order
-                print(f"Created order: {pemesanan.idPemesanan}")
-                
-                # Create order details and update stock
-                for produk_id, item in cart.items():
-                    produk = Produk.objects.get(idProduk=produk_id)
-                    kuantiti = item['kuantiti']
-                    subtotal = kuantiti * item['harga']
-                    
-                    # Debugging: Log item details
-                    print(f"Processing item - Product ID: {produk_id}, Quantity: {kuantiti}, Subtotal: {subtotal}")
-                    
-                    # Check stock again
-                    if kuantiti > produk.stok:
-                        messages.error(request, f'Stok untuk {produk.namaProduk} tidak mencukupi. Tersedia: {produk.stok}')
-                        return redirect('pelanggan_checkout_view')
-                    
-                    # Create detail
-                    detail = DetailPemesanan.objects.create(
-                        idProduk=produk,
-                        kuantiti=kuantiti,
-                        subTotal=subtotal,
-                        idKoleksiPemesanan=pemesanan
-                    )
-                    
-                    # Debugging: Log created detail
-                    print(f"Created detail: {detail.idDetailPemesanan}")
-                    
-                    # Update stock - Critical business logic
-                    old_stock = produk.stok
-                    produk.stok -= kuantiti
-                    produk.save()
-                    
-                    # Debugging: Log stock update
-                    print(f"Updated stock for {produk.namaProduk}: {old_stock} -> {produk.stok}")
-                
                 # Clear cart only after successful order creation and stock updates
-                request.session['keranjang'] = {}
-                request.session.modified = True
-                
-                # Debugging: Log cart clearance
-                print("Cart cleared successfully")
+                kosongkan_keranjang(pelanggan.idPelanggan)
+            
+            # Debugging: Log created order
+            logger.debug("Created order: %s (total %s)", pemesanan.idPemesanan, pemesanan.totalPemesanan)
                 
             messages.success(request, 'Pesanan berhasil dikirim. Menunggu konfirmasi Admin.')
             return redirect('pelanggan_pesanan_riwayat')
+        except ValidationError as e:
+            for pesan in e.messages:
+                messages.error(request, pesan)
+            return redirect('pelanggan_checkout_view')
+        except StokTidakCukup as e:
+            for baris in e.gagal:
+                nama = baris['nama'] or baris['produk_id']
+                messages.error(request, f"Stok untuk {nama} tidak mencukupi. Tersedia: {baris['tersedia']}")
+            return redirect('pelanggan_checkout_view')
         except Exception as e:
             # Log the full exception for debugging
-            print(f"Exception during checkout: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("Exception during checkout: %s", e)
             
             messages.error(request, f'Gagal memproses pesanan: {str(e)}')
             return redirect('pelanggan_checkout_view')
@@ -458,20 +480,44 @@ def pelanggan_checkout(request):
 
 
 @pelanggan_required
-def pelanggan_pesanan_riwayat(request):
+async def pelanggan_pesanan_riwayat(request):
     """View order history"""
-    pelanggan = get_pelanggan(request)
+    pelanggan = await aget_pelanggan(request)
     if not pelanggan:
         messages.error(request, "Pelanggan tidak ditemukan.")
         return redirect('pelanggan_login')
         
-    # Get all orders for this customer
-    pesanan_list = Pemesanan.objects.filter(idPelanggan=pelanggan).order_by('-tanggalPemesanan')
+    # Satu halaman pesanan dengan keyset cursor (core/riwayat.py)
+    cursor = request.GET.get('cursor')
+    pesanan_list, cursor_berikut = await ahalaman_riwayat(pelanggan.idPelanggan, cursor)
     
     context = {
-        'pesanan_list': pesanan_list
+        'pesanan_list': pesanan_list,
+        'cursor_berikut': cursor_berikut,
+        'halaman_lanjutan': bool(cursor),
     }
-    return render(request, 'pelanggan/pesanan_riwayat.html', context)
+    return render(request, 'pelanggan/pesanan_riwayat.html', await _konteks_async(request, context))
+
+
+@pelanggan_required
+def pelanggan_pesanan_riwayat_json(request):
+    """Next page of the order history as JSON (infinite scroll)"""
+    pesanan_list, cursor_berikut = halaman_riwayat(request.session['pelanggan_id'], request.GET.get('cursor'))
+    
+    data = [
+        {
+            'id': pesanan.idPemesanan,
+            'tanggal': pesanan.tanggalPemesanan.strftime('%d/%m/%Y'),
+            'total': pesanan.totalPemesanan,
+            'ongkos_kirim': int(pesanan.ongkosKirim),
+            'total_akhir': pesanan.totalPemesanan + int(pesanan.ongkosKirim),
+            'status': pesanan.status,
+            'jumlah_item': pesanan.jumlah_item,
+            'url_detail': reverse('pelanggan_pesanan_detail_html', kwargs={'pesanan_id': pesanan.idPemesanan}),
+        }
+        for pesanan in pesanan_list
+    ]
+    return JsonResponse({'pesanan': data, 'cursor_berikut': cursor_berikut})
 
 
 @pelanggan_required
@@ -519,16 +565,16 @@ def pelanggan_pesanan_detail(request, pesanan_id):
 
 
 @pelanggan_required
-def pelanggan_pesanan_detail_html(request, pesanan_id):
+async def pelanggan_pesanan_detail_html(request, pesanan_id):
     """Show order detail page"""
     try:
-        pelanggan = get_pelanggan(request)
+        pelanggan = await aget_pelanggan(request)
         if not pelanggan:
             messages.error(request, "Pelanggan tidak ditemukan.")
             return redirect('pelanggan_login')
             
         # Get order with details
-        pemesanan = Pemesanan.objects.select_related('idPelanggan').prefetch_related('detailpemesanan_set__idProduk').get(
+        pemesanan = await Pemesanan.objects.select_related('idPelanggan').prefetch_related('detailpemesanan_set__idProduk').aget(
             idPemesanan=pesanan_id, 
             idPelanggan=pelanggan
         )
@@ -547,7 +593,7 @@ def pelanggan_pesanan_detail_html(request, pesanan_id):
             'pemesanan': pemesanan,
             'detail_items': detail_items
         }
-        return render(request, 'pelanggan/pesanan_detail.html', context)
+        return render(request, 'pelanggan/pesanan_detail.html', await _konteks_async(request, context))
     except Pemesanan.DoesNotExist:
         messages.error(request, "Pesanan tidak ditemukan.")
         return redirect('pelanggan_pesanan_riwayat')